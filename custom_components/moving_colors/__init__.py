@@ -1,10 +1,11 @@
 """Integration for Moving Colors."""
 
 import logging
-import random
-from collections.abc import Callable
+import secrets
+from collections.abc import Callable, Coroutine, Iterable, Sequence
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import homeassistant.util.dt as dt_util
 import voluptuous as vol
@@ -12,28 +13,53 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_STARTED,
     STATE_ON,
+    STATE_UNAVAILABLE,
     Platform,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry
-from homeassistant.helpers.event import async_track_state_change, async_track_time_interval
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later, async_track_state_change, async_track_state_change_event, async_track_time_interval
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util import slugify
 
+from .batch_engine import BatchChannelView, async_get_batch_engine, is_batch_engine_available
+from .capabilities import CapabilityIndex, build_payload
 from .config_flow import YAML_CONFIG_SCHEMA
 from .const import (
+    ADAPTIVE_INTERVAL,
+    BATCH_ENGINE,
     DEBUG_ENABLED,
+    DISPATCH_DEADLINE,
     DOMAIN,
     DOMAIN_DATA_MANAGERS,
     INTERNAL_TO_DEFAULTS_MAP,
+    KEYFRAME_MODE,
+    LOOKAHEAD_FRAMES,
+    MAX_COMMANDS_PER_SECOND,
     MC_CONF_NAME,
+    MIN_TRIGGER_INTERVAL,
+    MISSED_TICK_POLICY,
+    RANDOM_SEED,
+    SENSOR_UPDATE_INTERVAL,
+    STATISTICS_WINDOW,
     TARGET_LIGHT_ENTITY_ID,
     VERSION,
     MCConfig,
     MCInternal,
     MCInternalDefaults,
+    MissedTickPolicy,
 )
+from .dispatcher import MovingColorsDispatcher, create_command_context, is_command_echo
+from .engine import ChannelEngine, ChannelStatistics, DefaultModeRamp, RandomLimits
+from .frame_buffer import FrameBuffer
+from .latency import ResponseLatencyTracker
+from .light_groups import LightGroupIndex
+from .scheduler import MovingColorsTickJob, async_get_tick_scheduler
+
+if TYPE_CHECKING:
+    import asyncio
 
 _GLOBAL_DOMAIN_LOGGER = logging.getLogger(DOMAIN)
 _LOGGER = logging.getLogger(__name__)
@@ -117,12 +143,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     instance_logger_name = f"{DOMAIN}.{sanitized_instance_name}"
     instance_specific_logger = logging.getLogger(instance_logger_name)
 
-    if entry.options.get(DEBUG_ENABLED, False):
-        instance_specific_logger.setLevel(logging.DEBUG)
-        instance_specific_logger.debug("Debug log for instance '%s' activated.", instance_name)
-    else:
-        instance_specific_logger.debug("Debug log for instance '%s' disabled.", instance_name)
-        instance_specific_logger.setLevel(logging.INFO)
+    _set_debug_log(instance_specific_logger, instance_name, entry.options.get(DEBUG_ENABLED, False))
 
     # The manager can't work without a configuration.
     if not config_data:
@@ -169,6 +190,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # End of SCInternal handling
     # =================================================================
 
+    _async_ensure_random_seed(hass, entry)
+
     # Hand over the combined configuration dictionary to the MovingColorsManager
     manager = MovingColorsManager(hass, entry, instance_specific_logger)
 
@@ -246,6 +269,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Load platforms (like sensors)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # All internal number and switch entities exist now, so resolve their entity IDs once
+    manager.async_build_internal_entity_index()
+
     # Add listeners for update of input values and integration trigger
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
@@ -298,10 +324,84 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     return False
 
 
+@callback
+def _async_ensure_random_seed(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Persist a seed for the random limits, so the animation of an instance can be reproduced."""
+    if entry.options.get(RANDOM_SEED, entry.data.get(RANDOM_SEED)) is not None:
+        return
+    seed = secrets.randbits(32)
+    hass.config_entries.async_update_entry(entry, data={**entry.data, RANDOM_SEED: seed})
+    _LOGGER.debug("[%s] Generated random seed %s for entry %s.", DOMAIN, seed, entry.entry_id)
+
+
+def _set_debug_log(instance_logger: logging.Logger, instance_name: str, enabled: bool) -> None:
+    """Switch the log level of an instance between debug and info."""
+    if enabled:
+        instance_logger.setLevel(logging.DEBUG)
+        instance_logger.debug("Debug log for instance '%s' activated.", instance_name)
+    else:
+        instance_logger.debug("Debug log for instance '%s' disabled.", instance_name)
+        instance_logger.setLevel(logging.INFO)
+
+
+def _is_entity_configured(value: Any) -> bool:
+    """Return True if an external entity option holds an entity ID."""
+    return isinstance(value, str) and value.lower() not in ("none", "")
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update. Will be called if the user modifies the configuration using the OptionsFlow."""
     _LOGGER.debug("[%s] Options update listener triggered for entry %s.", DOMAIN, entry.entry_id)
-    await hass.config_entries.async_reload(entry.entry_id)
+
+    # Apply the changes to the running instance if possible, structural changes need a reload
+    manager: MovingColorsManager | None = hass.data.get(DOMAIN_DATA_MANAGERS, {}).get(entry.entry_id)
+    if manager is None or not manager.async_apply_options(entry):
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
+@dataclass(frozen=True, slots=True)
+class MCConfigSnapshot:
+    """Resolved and typed configuration values of one Moving Colors instance."""
+
+    enabled: bool
+    random_limits: bool
+    default_mode_enabled: bool
+    start_from_current_position: bool
+    start_value: int
+    min_value: int
+    max_value: int
+    stepping: int
+    trigger_interval: float
+    default_value: int
+    steps_to_default: int
+
+
+# Options, which are applied to a running instance. Changes of all other options reload the config entry,
+# except for external entities which are swapped for another entity.
+LIVE_OPTIONS = frozenset(
+    {DEBUG_ENABLED, DISPATCH_DEADLINE, KEYFRAME_MODE, LOOKAHEAD_FRAMES, MAX_COMMANDS_PER_SECOND, MISSED_TICK_POLICY, SENSOR_UPDATE_INTERVAL}
+)
+EXTERNAL_ENTITY_OPTIONS = frozenset(config_enum.value for config_enum in MCConfig)
+
+# Snapshot field -> (external entity option, internal manual entity, hardcoded default, type)
+CONFIG_SNAPSHOT_FIELDS: dict[str, tuple[MCConfig, MCInternal, Any, type]] = {
+    "enabled": (MCConfig.ENABLED_ENTITY, MCInternal.ENABLED_MANUAL, False, bool),
+    "random_limits": (MCConfig.RANDOM_LIMITS_ENTITY, MCInternal.RANDOM_LIMITS_MANUAL, True, bool),
+    "default_mode_enabled": (MCConfig.DEFAULT_MODE_ENABLED_ENTITY, MCInternal.DEFAULT_MODE_ENABLED_MANUAL, False, bool),
+    "start_from_current_position": (
+        MCConfig.START_FROM_CURRENT_POSITION_ENTITY,
+        MCInternal.START_FROM_CURRENT_POSITION_MANUAL,
+        True,
+        bool,
+    ),
+    "start_value": (MCConfig.START_VALUE_ENTITY, MCInternal.START_VALUE_MANUAL, MCInternalDefaults.START_VALUE.value, int),
+    "min_value": (MCConfig.MIN_VALUE_ENTITY, MCInternal.MIN_VALUE_MANUAL, MCInternalDefaults.MIN_VALUE.value, int),
+    "max_value": (MCConfig.MAX_VALUE_ENTITY, MCInternal.MAX_VALUE_MANUAL, MCInternalDefaults.MAX_VALUE.value, int),
+    "stepping": (MCConfig.STEPPING_ENTITY, MCInternal.STEPPING_MANUAL, MCInternalDefaults.STEPPING.value, int),
+    "trigger_interval": (MCConfig.TRIGGER_INTERVAL_ENTITY, MCInternal.TRIGGER_INTERVAL_MANUAL, MCInternalDefaults.TRIGGER_INTERVAL.value, float),
+    "default_value": (MCConfig.DEFAULT_VALUE_ENTITY, MCInternal.DEFAULT_VALUE_MANUAL, MCInternalDefaults.DEFAULT_VALUE.value, int),
+    "steps_to_default": (MCConfig.STEPS_TO_DEFAULT_ENTITY, MCInternal.STEPS_TO_DEFAULT_MANUAL, MCInternalDefaults.STEPS_TO_DEFAULT.value, int),
+}
 
 
 class MovingColorsManager:
@@ -333,7 +433,6 @@ class MovingColorsManager:
             raise ValueError(message)
 
         self._unsub_callbacks: list[Callable[[], None]] = []
-        self._update_listener: Callable[[], None] | None = None  # To store the interval task unlistener
         self._initial_state = None
 
         # 1. Structural Config Helper (fixes repetitive code and ANN202)
@@ -344,25 +443,96 @@ class MovingColorsManager:
         # 2. Structural Config (Things that usually don't change without a reload)
         self._target_light_entity_id = get_conf(TARGET_LIGHT_ENTITY_ID)
         self._debug_enabled = get_conf(DEBUG_ENABLED, False)
+        self._keyframe_mode = get_conf(KEYFRAME_MODE, False)
+        self._batch_engine = get_conf(BATCH_ENGINE, False)
 
         # 3. Runtime State (Tracking variables used by the logic loop)
         self._current_value: int | None = None
         self._current_direction: int = 1  # 1 for up, -1 for down
-        self._update_listener: Callable[[], None] | None = None
 
-        # Initialize the state trackers for the logic
-        self._active_min: dict[str, int] = {}
-        self._active_max: dict[str, int] = {}
-        self._current_values: dict[str, int] = {}
+        # Source of the random limits, reproducible by the seed of this instance
+        seed = get_conf(RANDOM_SEED)
+        self._random_limits = RandomLimits(None if seed is None else int(seed))
+
+        # Channel state of the logic loop, created by the color mode detection
+        self._engine: ChannelEngine | BatchChannelView = ChannelEngine(("brightness",), logger=instance_logger, random_limits=self._random_limits)
         self._color_mode = None
 
-        # Boundaries and Mode Tracking
-        self._steps_since_last_change: int = 0
-        self._is_in_default_mode: bool = False
+        # Capability class of every target light, the payloads are built once per class
+        self._capabilities = CapabilityIndex(hass, self._target_light_entity_id, instance_logger)
+
+        # Frames computed ahead of their tick, refilled by the scheduler after each dispatch pass (0 = computed within the tick).
+        # While frames are buffered, the engine is ahead of the lights and the frame sent last is kept separately.
+        self._lookahead_frames: int = int(get_conf(LOOKAHEAD_FRAMES, 0))
+        self._frames = FrameBuffer(0, 1)
+        self._frame_values: list[int] = []
+        self._frame_lower: list[int | None] = []
+        self._frame_upper: list[int | None] = []
+        self._frame_state: tuple | None = None
+        self._prefetch_key: tuple[int, int, int, bool] | None = None
+
+        # Dispatch stage for the computed frames, which addresses light groups covering several targets at once
+        self._light_groups = LightGroupIndex(hass, self._target_light_entity_id, instance_logger)
+
+        # Response latency of the targets, which stretches the trigger interval and advances the
+        # animation by the same factor per tick, so the lights keep up at the configured speed
+        self._latency: ResponseLatencyTracker | None = ResponseLatencyTracker() if get_conf(ADAPTIVE_INTERVAL, False) else None
+        self._interval_factor: int = 1
+
+        self._dispatcher = MovingColorsDispatcher(
+            hass, instance_logger, self._light_groups, float(get_conf(MAX_COMMANDS_PER_SECOND, 0) or 0), self._latency
+        )
+
+        # Timeline of the periodic updates, driven by the scheduler shared by all instances.
+        # The interval is re-evaluated after every tick.
+        self._scheduler = async_get_tick_scheduler(hass)
+        self._tick_job = MovingColorsTickJob(
+            instance_logger,
+            self.async_step,
+            self.get_effective_trigger_interval,
+            MissedTickPolicy(get_conf(MISSED_TICK_POLICY, MissedTickPolicy.SKIP.value)),
+            self._request_frame,
+            self._store_frame,
+        )
+
+        # Ticks to skip until the next keyframe is due (keyframe mode only)
+        self._keyframe_ticks_remaining: int = 0
+
+        # Way back to the default value after the instance was disabled (default mode only)
+        self._default_ramp = DefaultModeRamp()
 
         # Callback for sensor updates
         self._current_value_update_callback: Callable[[int], None] | None = None
 
+        # Sensor updates are pushed at most once per interval, decoupled from the frame rate (0 = every frame).
+        # Frames within the interval are coalesced into one update with the values of the latest one.
+        self._sensor_update_interval: float = float(get_conf(SENSOR_UPDATE_INTERVAL, 10) or 0)
+        self._last_sensor_update: float | None = None
+        self._unsub_sensor_update: CALLBACK_TYPE | None = None
+
+        # Aggregates of the sent frames, published to the statistics sensors once per window (0 = disabled)
+        self._statistics_window: float = float(get_conf(STATISTICS_WINDOW, 0) or 0)
+        self._statistics: ChannelStatistics | None = None
+        self._statistics_summary: dict[str, dict[str, Any]] = {}
+
+        # Re-evaluation of the controls, requests are coalesced and evaluated by one task at a time
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_requested: bool = False
+        self._refreshed_config: MCConfigSnapshot | None = None
+
+        # Resolved configuration, rebuilt only after one of the tracked entities changed
+        self._config_snapshot: MCConfigSnapshot | None = None
+        self._tracked_config_entity_ids: set[str] = set()
+        self._unsub_config_tracker: Callable[[], None] | None = None
+
+        # Internal entity IDs of this instance, rebuilt only after registry updates for this entry
+        self._internal_entity_ids: dict[MCInternal, str] | None = None
+        self._unsub_callbacks.append(self.hass.bus.async_listen(entity_registry.EVENT_ENTITY_REGISTRY_UPDATED, self._handle_entity_registry_updated))
+        if self._statistics_window > 0:
+            self._unsub_callbacks.append(async_track_time_interval(hass, self._close_statistics_window, timedelta(seconds=self._statistics_window)))
+        if self._target_light_entity_id:
+            self._unsub_callbacks.append(async_track_state_change_event(hass, self._target_light_entity_id, self._handle_target_state_change))
+
         # Detect color mode and initialize values based on the target light entity's state
         self._detect_color_mode_and_init_values()
 
@@ -383,10 +553,23 @@ class MovingColorsManager:
     async def async_stop(self) -> None:
         """Stop the Moving Colors manager's operations."""
         self.logger.debug("Stopping manager lifecycle...")
+        self._refresh_requested = False
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
         await self.stop_update_task()
         for unsub_callback in self._unsub_callbacks:
             unsub_callback()
         self._unsub_callbacks.clear()
+        if self._unsub_config_tracker:
+            self._unsub_config_tracker()
+            self._unsub_config_tracker = None
+        self._tracked_config_entity_ids.clear()
+        self._config_snapshot = None
+        if self._unsub_sensor_update:
+            self._unsub_sensor_update()
+            self._unsub_sensor_update = None
+        self._engine.release()
         self.logger.debug("Listeners unregistered.")
         self.logger.debug("Manager lifecycle stopped.")
 
@@ -434,9 +617,76 @@ class MovingColorsManager:
             self.logger.debug("Enabled state changed to OFF, stopping update task.")
             self.stop_update_task()
 
+    @property
+    def engine(self) -> ChannelEngine | BatchChannelView:
+        """Return the channel state engine of this instance."""
+        return self._engine
+
+    @property
+    def signal_update(self) -> str:
+        """Return the dispatcher signal, which updates the sensors of this instance."""
+        return f"{DOMAIN}_update_{self.name.lower().replace(' ', '_')}"
+
+    @property
+    def signal_statistics(self) -> str:
+        """Return the dispatcher signal, which updates the statistics sensors of this instance."""
+        return f"{self.signal_update}_statistics"
+
+    @property
+    def signal_external_entity(self) -> str:
+        """Return the dispatcher signal, which hands a swapped external entity (config key, entity ID) to its mirror sensor."""
+        return f"{self.signal_update}_external_entity"
+
+    def _record_statistics(self, values: list[int], lower: list[int | None], upper: list[int | None]) -> None:
+        """Add a sent frame and its active boundaries to the statistics of the current window."""
+        if self._statistics_window <= 0:
+            return
+        channels = self._engine.channels
+        if self._statistics is None or self._statistics.channels != channels:
+            self._statistics = ChannelStatistics(channels)
+        self._statistics.add(values, lower, upper, self.hass.loop.time())
+
+    @callback
+    def _close_statistics_window(self, _now: Any = None) -> None:
+        """Publish the statistics of the finished window and start the next one."""
+        if self._statistics is None:
+            return
+        now = self.hass.loop.time()
+        self._statistics_summary = {channel: self._statistics.summary(channel, now) for channel in self._statistics.channels}
+        self._statistics.reset()
+        async_dispatcher_send(self.hass, self.signal_statistics)
+
+    def has_statistics(self) -> bool:
+        """Return True if the statistics sensors are enabled."""
+        return self._statistics_window > 0
+
+    def get_channel_statistics(self, channel: str) -> dict[str, Any] | None:
+        """Return the statistics of a channel in the last finished window."""
+        return self._statistics_summary.get(channel)
+
+    @callback
+    def _schedule_sensor_update(self) -> None:
+        """Push the current values to the sensors, at most once per sensor update interval."""
+        if self._unsub_sensor_update:
+            # Already scheduled, the update will show the values of this frame
+            return
+        wait = 0.0
+        if self._last_sensor_update is not None:
+            wait = self._last_sensor_update + self._sensor_update_interval - self.hass.loop.time()
+        if wait > 0:
+            self._unsub_sensor_update = async_call_later(self.hass, wait, self._publish_sensor_update)
+        else:
+            self._publish_sensor_update()
+
+    @callback
+    def _publish_sensor_update(self, _now: Any = None) -> None:
+        self._unsub_sensor_update = None
+        self._last_sensor_update = self.hass.loop.time()
+        async_dispatcher_send(self.hass, self.signal_update)
+
     def get_current_value(self) -> int:
         """Return the current calculated value (brightness mode only)."""
-        return self._current_values.get("brightness", 0)
+        return self.get_current_channel_value("brightness") or 0
 
     def get_color_mode(self) -> str:
         """Return the detected color mode ('brightness', 'rgb', or 'rgbw')."""
@@ -444,7 +694,10 @@ class MovingColorsManager:
 
     def get_current_channel_value(self, channel: str) -> int | None:
         """Return the current value for a specific color channel (r, g, b, w)."""
-        return self._current_values.get(channel)
+        if self._frame_state is None:
+            return self._engine.value(channel)
+        channels = self._engine.channels
+        return self._frame_values[channels.index(channel)] if channel in channels else None
 
     def set_current_value_update_callback(self, callback_func: Callable[[int], None]) -> None:
         """Set the callback function for current value updates."""
@@ -453,17 +706,21 @@ class MovingColorsManager:
     async def async_start_update_task(self) -> None:
         """Start the periodic update task."""
         # 1. Check if already running
-        if hasattr(self, "_update_listener") and self._update_listener:
+        if self._tick_job.is_running:
             # Already running
             return
 
+        # Frames computed before a stop are dropped, the animation continues from the frame sent last
+        self._discard_frames()
+
         # 2. Check if we have previous loop state to resume from.
         # _loop_has_run is set to True after the first successful update cycle,
         # so on restart we can pick up exactly where we left off.
         if self._loop_has_run:
             # Resume from where we left off - just re-capture initial state for
-            # restore-on-stop, but keep _current_values and directions intact
-            self.logger.debug("Resuming from previous loop state: %s", self._current_values)
+            # restore-on-stop, but keep channel values and directions intact.
+            # Without random limits the engine continues at the phase of its anchor.
+            self.logger.debug("Resuming from previous loop state: %s", self._engine.as_dict())
             await self._capture_initial_state()
         else:
             # First start or after full reset: capture state and sync
@@ -477,24 +734,20 @@ class MovingColorsManager:
                 abs_max = self.get_config_max_value()
                 if self._color_mode in ("rgb", "rgbw"):
                     self._stagger_channel_values(["r", "g", "b"], abs_min, abs_max)
-                    if self._color_mode == "rgbw":
-                        self._current_values["w"] = 0
-                        self._active_min["w"] = 0
-                        self._active_max["w"] = 0
-                        self._count_up_w = True
                 else:
                     # Use brightness from light state (set by _detect_color_mode_and_init_values)
-                    val = self._current_values.get("brightness", abs_min)
-                    self._active_min["brightness"] = abs_min
-                    self._active_max["brightness"] = abs_max
-                    self._count_up_brightness = self._direction_from_position(val, abs_min, abs_max)
+                    val = self._engine.value("brightness")
+                    self._engine.set_channel("brightness", val, abs_min, abs_max, self._direction_from_position(val, abs_min, abs_max))
+
+        # The lights might have been changed in the meantime, so the first frame must be sent in any case.
+        # Light groups might have been added or changed as well.
+        self._dispatcher.reset()
+        self._light_groups.invalidate()
 
-        interval = timedelta(seconds=self.get_config_trigger_interval())
-        self.logger.debug("Starting periodic update task with interval %s.", interval)
+        self.logger.debug("Starting periodic update task with interval %ss.", self.get_config_trigger_interval())
 
         # 4. Start the timer
-        self._update_listener = async_track_time_interval(self.hass, self.async_update_state, interval)
-        self._unsub_callbacks.append(self._update_listener)
+        self._scheduler.async_add_job(self._tick_job)
 
         # Manually trigger the first step AFTER the listener is set
         await self.async_update_state()
@@ -503,14 +756,15 @@ class MovingColorsManager:
     async def stop_update_task(self) -> None:
         """Stop the periodic update task."""
         self.logger.debug("Stopping periodic update task.")
-        if hasattr(self, "_update_listener") and self._update_listener:
-            self._update_listener()  # Stop the timer
-            # Remove it from the list so we don't try to call it again later
-            if self._update_listener in self._unsub_callbacks:
-                self._unsub_callbacks.remove(self._update_listener)
-            self._update_listener = None
+        self._scheduler.async_remove_job(self._tick_job)
+        self._keyframe_ticks_remaining = 0
+        self._default_ramp.reset()
+        self._discard_frames()
+        # Frames held back for a light must not overwrite the restored state
+        self._dispatcher.reset()
 
         await self._restore_initial_state()
+        self._schedule_sensor_update()
 
     def _direction_from_position(self, val: int, abs_min: int, abs_max: int) -> bool:
         """
@@ -540,12 +794,9 @@ class MovingColorsManager:
         value_range = abs_max - abs_min
         for i, channel in enumerate(channels):
             val = int(abs_min + (value_range * i / n))
-            self._current_values[channel] = val
-            self._active_min[channel] = abs_min
-            self._active_max[channel] = abs_max
-            setattr(self, f"_count_up_{channel}", i % 2 == 0)
+            self._engine.set_channel(channel, val, abs_min, abs_max, i % 2 == 0)
 
-        self.logger.debug("Staggered channel init: %s", {c: (self._current_values[c], getattr(self, f"_count_up_{c}")) for c in channels})
+        self.logger.debug("Staggered channel init: %s", {c: (self._engine.value(c), self._engine.is_counting_up(c)) for c in channels})
 
     def _sync_current_values_to_snapshot(self) -> None:
         """Align internal loop values with the physical light state (RGBW or Brightness)."""
@@ -555,101 +806,86 @@ class MovingColorsManager:
         abs_min = self.get_config_min_value()
         abs_max = self.get_config_max_value()
 
-        # Case 1: RGBW Lights
-        if self._color_mode == "rgbw":
-            if self._initial_state.get("rgbw_color"):
-                # Light was on: restore RGB channel values, w always 0
+        # Case 1 + 2: RGBW and RGB Lights
+        if self._color_mode in ("rgb", "rgbw"):
+            color = self._initial_state.get(f"{self._color_mode}_color")
+            if color:
+                # Light was on: restore RGB channel values, w (RGBW only) is held at 0
                 # Derive direction from current position to avoid immediate boundary bounces
                 for i, channel in enumerate(["r", "g", "b"]):
-                    val = self._initial_state["rgbw_color"][i]
-                    self._current_values[channel] = val
-                    self._active_min[channel] = abs_min
-                    self._active_max[channel] = abs_max
-                    setattr(self, f"_count_up_{channel}", self._direction_from_position(val, abs_min, abs_max))
-                self._current_values["w"] = 0
-                self._active_min["w"] = 0
-                self._active_max["w"] = 0
-                self._count_up_w = True
-                self.logger.debug("Sync: RGBW values aligned from current position (w=0): %s", self._current_values)
+                    val = color[i]
+                    self._engine.set_channel(channel, val, abs_min, abs_max, self._direction_from_position(val, abs_min, abs_max))
+                self.logger.debug("Sync: %s values aligned from current position: %s", self._color_mode.upper(), self._engine.as_dict())
             else:
                 # Light was off: stagger channels so they move independently
-                self.logger.debug("Sync: RGBW light was off, staggering channel start values.")
-                self._stagger_channel_values(["r", "g", "b"], abs_min, abs_max)
-                self._current_values["w"] = 0
-                self._active_min["w"] = 0
-                self._active_max["w"] = 0
-                self._count_up_w = True
-
-        # Case 2: RGB Lights
-        elif self._color_mode == "rgb":
-            if self._initial_state.get("rgb_color"):
-                # Light was on: restore actual channel values
-                # Derive direction from current position to avoid immediate boundary bounces
-                for i, channel in enumerate(["r", "g", "b"]):
-                    val = self._initial_state["rgb_color"][i]
-                    self._current_values[channel] = val
-                    self._active_min[channel] = abs_min
-                    self._active_max[channel] = abs_max
-                    setattr(self, f"_count_up_{channel}", self._direction_from_position(val, abs_min, abs_max))
-                self.logger.debug("Sync: RGB values aligned from current position: %s", self._current_values)
-            else:
-                # Light was off: stagger channels so they move independently
-                self.logger.debug("Sync: RGB light was off, staggering channel start values.")
+                self.logger.debug("Sync: %s light was off, staggering channel start values.", self._color_mode.upper())
                 self._stagger_channel_values(["r", "g", "b"], abs_min, abs_max)
 
         # Case 3: Simple Brightness Lights
         elif self._initial_state.get("brightness") is not None:
             val = self._initial_state["brightness"]
-            self._current_values["brightness"] = val
-            self._active_min["brightness"] = abs_min
-            self._active_max["brightness"] = abs_max
-            self._count_up_brightness = self._direction_from_position(val, abs_min, abs_max)
-            self.logger.debug(
-                "Sync: Brightness aligned from current position: %s (count_up=%s)", self._current_values["brightness"], self._count_up_brightness
-            )
+            count_up = self._direction_from_position(val, abs_min, abs_max)
+            self._engine.set_channel("brightness", val, abs_min, abs_max, count_up)
+            self.logger.debug("Sync: Brightness aligned from current position: %s (count_up=%s)", val, count_up)
 
     def _detect_color_mode_and_init_values(self) -> None:
-        """Detect color mode and initialize current values for the target light entity."""
-        entity_id = self._target_light_entity_id[0]
-        state = self.hass.states.get(entity_id)
-
-        # 1. Try to get capabilities from the Entity Registry first (more reliable)
-        registry = entity_registry.async_get(self.hass)
-        entry = registry.async_get(entity_id)
-
-        # Extract capabilities from registry entry if available
-        supported_features = []
-        if entry and entry.capabilities:
-            supported_features = entry.capabilities.get("supported_color_modes", [])
+        """Detect color mode and initialize current values from the target light entities."""
+        # The engine runs in the richest color mode of all targets, the start values are
+        # taken from the first target of that class. Simpler targets get reduced payloads.
+        color_mode, entity_id = self._capabilities.richest_class()
+        state = self.hass.states.get(entity_id) if entity_id else None
 
-        # 2. Fallback to current state attributes if registry is sparse
-        if not supported_features and state:
-            supported_features = state.attributes.get("supported_color_modes", [])
+        self.logger.debug("Capability classes of targets: %s", self._capabilities.groups())
 
-        self.logger.debug("Supported features for %s: %s", entity_id, supported_features)
-
-        # 3. Logic-based detection
-        if "rgbw" in supported_features:
+        if color_mode == "rgbw":
             self._color_mode = "rgbw"
             rgbw = state.attributes.get("rgbw_color") if state else None
             if not isinstance(rgbw, (list, tuple)):
                 rgbw = [0, 0, 0, 0]
-            self._current_values = {"r": rgbw[0], "g": rgbw[1], "b": rgbw[2], "w": 0}  # w always 0
+            self._engine = self._create_engine("rgbw", [*rgbw[:3], 0], held="w")  # w always 0
 
-        elif "rgb" in supported_features or "xy" in supported_features:
+        elif color_mode == "rgb":
             self._color_mode = "rgb"
             rgb = state.attributes.get("rgb_color") if state else None
             if not isinstance(rgb, (list, tuple)):
                 rgb = [0, 0, 0]
-            self._current_values = {"r": rgb[0], "g": rgb[1], "b": rgb[2]}
+            self._engine = self._create_engine("rgb", rgb[:3])
 
         else:
             self._color_mode = "brightness"
             brightness = state.attributes.get("brightness", 0) if state else 0
-            self._current_values = {"brightness": brightness}
+            self._engine = self._create_engine(("brightness",), [brightness or 0])
+
+        self._frames = FrameBuffer(self._lookahead_frames, len(self._engine.channels))
+        self._frame_values = [0] * len(self._engine.channels)
+        self._frame_lower = [None] * len(self._engine.channels)
+        self._frame_upper = [None] * len(self._engine.channels)
+        self._frame_state = None
 
         self.logger.debug("Final detected color mode: %s", self._color_mode)
 
+    @callback
+    def _check_color_mode(self) -> None:
+        """Reload the config entry, if the richest capability class of the targets differs from the detected color mode."""
+        if not self._capabilities.is_resolved():
+            # Unavailable targets count as brightness lights, wait until all of them are known
+            return
+        color_mode, _ = self._capabilities.richest_class()
+        if color_mode == self._color_mode:
+            return
+        # The engine channels and the value sensors depend on the color mode, so they are created anew
+        self.logger.info("Color mode of the target lights changed from %s to %s, reloading.", self._color_mode, color_mode)
+        self.hass.config_entries.async_schedule_reload(self._entry_id)
+
+    def _create_engine(self, channels: Sequence[str], values: Sequence[int], held: Iterable[str] = ()) -> ChannelEngine | BatchChannelView:
+        """Create the channel state, in the shared batch engine if configured and available."""
+        self._engine.release()
+        if self._batch_engine:
+            if is_batch_engine_available():
+                return async_get_batch_engine(self.hass).create_view(channels, values, held, self._random_limits)
+            self.logger.warning("Batch engine requires numpy, which is not installed. Using the regular engine.")
+        return ChannelEngine(channels, values, held, logger=self.logger, random_limits=self._random_limits)
+
     async def _capture_initial_state(self) -> None:
         """Capture current light state before the loop starts."""
         # We take the first target entity as the reference
@@ -664,121 +900,249 @@ class MovingColorsManager:
                 "brightness": state.attributes.get("brightness"),
             }
             self.logger.debug("Snapshot captured for %s: %s", entity_id, self._initial_state)
-            # Note: _current_values are NOT updated here - that is the responsibility
+            # Note: the channel values are NOT updated here - that is the responsibility
             # of _sync_current_values_to_snapshot (called on first start) or the
-            # resume path (which preserves existing _current_values intentionally).
+            # resume path (which preserves the existing channel values intentionally).
 
-    async def async_update_state(self, now: dt_util.dt.datetime | None = None) -> None:
+    async def async_update_state(self, now: dt_util.dt.datetime | None = None, steps: int = 1) -> None:
         """Calculate the next dimming value(s) and update the light entity."""
-        if not self.is_enabled():
+        dispatch = self.async_step(steps)
+        if dispatch is not None:
+            await dispatch
+
+    @callback
+    def async_step(self, steps: int = 1) -> Coroutine[Any, Any, None] | None:
+        """
+        Calculate the next dimming value(s).
+
+        Returns the coroutine, which sends the new frame to the light entities, so the
+        scheduler can step all due instances first and send their frames together.
+        """
+        config = self._get_config_snapshot()
+        # One tick of the stretched interval covers the steps of all configured intervals within it
+        steps *= self._interval_factor
+
+        if not config.enabled:
+            if config.default_mode_enabled and self._tick_job.is_running:
+                return self._step_default_mode(config, steps)
             self.logger.debug("Moving Colors is disabled, skipping update.")
-            self.stop_update_task()
-            return
+            return self.stop_update_task()
+
+        if self._default_ramp.is_active:
+            # Enabled again on the way to the default value, the animation continues from here
+            self.logger.debug("Default mode cancelled at %s.", self._engine.as_dict())
+            self._default_ramp.reset()
 
         # if now is None:
         #     now = dt_util.utcnow()
         # self.logger.debug("Moving Colors update triggered at %s.", now)
 
-        # Configured absolute limits
-        abs_min = self.get_config_min_value()
-        abs_max = self.get_config_max_value()
-        stepping = self.get_config_stepping()
-        use_random = self.is_random_limits_enabled()
+        # In keyframe mode the light interpolates on its own until the next boundary,
+        # so the ticks in between only count down and don't compute or send anything.
+        if self._keyframe_mode and self._keyframe_ticks_remaining > 0:
+            self._keyframe_ticks_remaining -= steps
+            if self._keyframe_ticks_remaining > 0:
+                return None
+            self._keyframe_ticks_remaining = 0
 
-        new_values = self._current_values.copy()
+        if self._keyframe_mode:
+            steps = self._engine.steps_to_next_boundary(config.stepping)
+            self._keyframe_ticks_remaining = steps - 1
 
-        for channel in self._current_values:
-            if channel == "w":
-                # Skip white channel entirely by setting it to 0
-                new_values[channel] = max(0, min(255, 0))
-                continue
+        self._advance_frames(config, steps)
 
-            val = self._current_values[channel]
-
-            # 1. Initialize per-channel state if needed
-            if channel not in self._active_min:
-                self._active_min[channel] = abs_min
-                self._active_max[channel] = abs_max
-                setattr(self, f"_count_up_{channel}", True)
-
-            count_up = getattr(self, f"_count_up_{channel}")
-
-            # 2. Logic for moving UP
-            if count_up:
-                val += stepping
-                # Check if we hit the CURRENT active max for this channel
-                if val >= self._active_max[channel]:
-                    val = self._active_max[channel]
-                    setattr(self, f"_count_up_{channel}", False)
-
-                    # We hit the top, generate new RANDOM MIN for the trip down
-                    if use_random:
-                        # New min is between absolute min and current position
-                        self._active_min[channel] = random.randint(abs_min, int(val))
-                        self.logger.debug("Channel %s: Hit max (%s). New random min border: %s", channel, val, self._active_min[channel])
-                    else:
-                        self._active_min[channel] = abs_min
-                        self.logger.debug("Channel %s: Hit max (%s).", channel, val)
+        return self._async_send_frame(config, steps)
 
-            # 3. Logic for moving DOWN
-            else:
-                val -= stepping
-                # Check if we hit the CURRENT active min for this channel
-                if val <= self._active_min[channel]:
-                    val = self._active_min[channel]
-                    setattr(self, f"_count_up_{channel}", True)
-
-                    # We hit the bottom, generate new RANDOM MAX for the trip up
-                    if use_random:
-                        # New max is between current position and absolute max
-                        self._active_max[channel] = random.randint(int(val), abs_max)
-                        self.logger.debug("Channel %s: Hit min (%s). New random max border: %s", channel, val, self._active_max[channel])
-                    else:
-                        self._active_max[channel] = abs_max
-                        self.logger.debug("Channel %s: Hit min (%s).", channel, val)
+    @callback
+    def _handle_target_state_change(self, event: Event) -> None:
+        """Handle state changes of the targets, complete the latency measurement and adapt the interval factor to it."""
+        entity_id = event.data["entity_id"]
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if (old_state is None or old_state.state == STATE_UNAVAILABLE) and new_state is not None and new_state.state != STATE_UNAVAILABLE:
+            # The supported color modes of a target, which was unavailable so far, are known now
+            self._capabilities.invalidate()
+            self._check_color_mode()
+
+        if not is_command_echo(event):
+            # Changed outside of Moving Colors, so the next frame must be sent even if its payload is unchanged
+            self._dispatcher.invalidate(entity_id)
+            return
+
+        if self._latency is None or self._keyframe_mode:
+            return
+        if self._latency.record_state_change(entity_id, event.context.id, self.hass.loop.time()) is None:
+            return
+        factor = self._latency.get_interval_factor(self.get_config_trigger_interval())
+        if factor != self._interval_factor:
+            # Applies from the next tick on, which is scheduled after the stretched interval
+            self.logger.debug(
+                "Response latency %.3fs, sending every %s trigger intervals with %s steps each.", self._latency.get_latency(), factor, factor
+            )
+            self._interval_factor = factor
+
+    def _step_default_mode(self, config: MCConfigSnapshot, steps: int) -> Coroutine[Any, Any, None] | None:
+        """Move all channels towards the default value and stop the updates once it is reached."""
+        ramp = self._default_ramp
+        if not ramp.is_active:
+            # Start from the values the lights show right now
+            self._discard_frames()
+            self._keyframe_ticks_remaining = 0
+            values = self._engine.values()
+            targets = [0 if channel == "w" else config.default_value for channel in self._engine.channels]
+            ramp.begin(values, targets, config.steps_to_default)
+            self.logger.debug("Default mode: Moving %s to %s within %s steps.", values, config.default_value, ramp.remaining_steps)
+
+        if self._keyframe_mode:
+            # Let the light fade to the default value on its own
+            steps = ramp.remaining_steps
+
+        for channel, value in zip(self._engine.channels, ramp.advance(steps), strict=True):
+            self._engine.set_channel(
+                channel, value, config.min_value, config.max_value, self._direction_from_position(value, config.min_value, config.max_value)
+            )
 
-            new_values[channel] = max(0, min(255, val))
+        if ramp.is_done:
+            self._finish_default_mode()
 
-        self._current_values = new_values
+        return self._async_send_frame(config, steps)
+
+    @callback
+    def _finish_default_mode(self) -> None:
+        """Stop the updates after the default value was reached, the lights keep this value."""
+        self.logger.debug("Default mode: Default value reached, stopping periodic updates.")
+        self._scheduler.async_remove_job(self._tick_job)
+        self._default_ramp.reset()
+        self._initial_state = None
 
-        # val_str = ", ".join([f"{k}: {v:.1f}" if isinstance(v, float) else f"{k}: {v}" for k, v in new_values.items()])
-        # self.logger.debug("Values: %s", val_str)
+    @staticmethod
+    def _frame_key(config: MCConfigSnapshot) -> tuple[int, int, int, bool]:
+        """Return the configuration values a frame depends on."""
+        return config.stepping, config.min_value, config.max_value, config.random_limits
+
+    def _advance_frames(self, config: MCConfigSnapshot, steps: int) -> None:
+        """Advance the animation by the given number of steps, taking precomputed frames first."""
+        frame = self._frames.peek()
+        if frame is not None and frame.key != self._frame_key(config):
+            # Computed with an outdated configuration
+            self._discard_frames()
+
+        while steps and len(self._frames):
+            frame = self._frames.pop()
+            self._frame_values[:] = frame.values
+            self._frame_lower[:] = frame.lower
+            self._frame_upper[:] = frame.upper
+            self._frame_state = frame.state
+            steps -= 1
+
+        if steps:
+            # With the batch engine the step is only recorded here and executed for all instances
+            # stepped in this wakeup together, as soon as the first frame is built.
+            self._engine.step(config.stepping, config.min_value, config.max_value, config.random_limits, steps)
+            self._frame_state = None
 
-        # Prepare service data based on color mode
-        for target_entity in self._target_light_entity_id:
-            if target_entity:
-                if self.is_debug_enabled():
-                    if self._color_mode in ["rgb", "rgbw"]:
-                        # 1. Determine which channels to look up
-                        channels = list(self._color_mode)  # results in ['r', 'g', 'b'] or ['r', 'g', 'b', 'w']
-
-                        # 2. Build strings for current values and active ranges
-                        vals_str = "/".join([str(int(self._current_values.get(c, 0))) for c in channels])
-                        ranges_str = " | ".join([f"{c}:{self._active_min.get(c)}-{self._active_max.get(c)}" for c in channels])
-
-                        self.logger.debug(
-                            "Update %s [%s]: Values=%s (Active Ranges: %s)", target_entity, self._color_mode.upper(), vals_str, ranges_str
-                        )
-                    else:
-                        # 3. Fallback for simple Brightness mode
-                        brightness = int(self._current_values.get("brightness", 0))
-                        b_min = self._active_min.get("brightness")
-                        b_max = self._active_max.get("brightness")
-
-                        self.logger.debug("Update %s: Brightness=%s (Range: %s-%s)", target_entity, brightness, b_min, b_max)
-
-                if self._color_mode == "rgbw":
-                    rgbw = [self._current_values[c] for c in "rgbw"]
-                    service_data = {"entity_id": target_entity, "brightness_pct": 100, "rgbw_color": rgbw}
-                elif self._color_mode == "rgb":
-                    rgb = [self._current_values[c] for c in "rgb"]
-                    service_data = {"entity_id": target_entity, "brightness_pct": 100, "rgb_color": rgb}
-                else:
-                    brightness = self._current_values["brightness"]
-                    service_data = {"entity_id": target_entity, "brightness": brightness}
-                await self.hass.services.async_call("light", "turn_on", service_data)
+    @callback
+    def _request_frame(self) -> bool:
+        """
+        Step the engine one frame ahead of the buffer, return False if the buffer needs no more frames.
+
+        Called by the scheduler after the dispatch pass, together with all other instances of
+        the wakeup. The frame is stored by _store_frame() once all of them requested their step,
+        so the batch engine executes these steps in one operation.
+        """
+        if self._keyframe_mode or self._frames.is_full() or not self._tick_job.is_running:
+            return False
+
+        config = self._get_config_snapshot()
+        if not config.enabled:
+            return False
+
+        if self._frame_state is None:
+            # The engine is about to run ahead, so keep the state of the frame sent last
+            self._frame_values[:] = self._engine.values()
+            self._frame_lower[:], self._frame_upper[:] = self._engine_bounds()
+            self._frame_state = self._engine.snapshot()
+
+        self._prefetch_key = self._frame_key(config)
+        self._engine.step(config.stepping, config.min_value, config.max_value, config.random_limits)
+        return True
+
+    @callback
+    def _store_frame(self) -> None:
+        """Append the frame requested last to the buffer."""
+        frame = self._frames.push()
+        frame.values[:] = self._engine.values()
+        frame.lower[:], frame.upper[:] = self._engine_bounds()
+        frame.state = self._engine.snapshot()
+        frame.key = self._prefetch_key
+
+    def _discard_frames(self) -> None:
+        """Drop all precomputed frames and set the engine back to the frame sent last."""
+        if self._frame_state is not None:
+            self._engine.restore(self._frame_state)
+            self._frame_state = None
+        self._frames.clear()
+
+    def _current_values(self) -> list[int]:
+        """Return the channel values of the frame sent last."""
+        return self._engine.values() if self._frame_state is None else list(self._frame_values)
+
+    def _engine_bounds(self) -> tuple[list[int | None], list[int | None]]:
+        """Return the active lower and upper boundaries of all channels at the current engine position."""
+        channels = self._engine.channels
+        return [self._engine.lower_bound(c) for c in channels], [self._engine.upper_bound(c) for c in channels]
+
+    def _current_bounds(self) -> tuple[list[int | None], list[int | None]]:
+        """Return the active lower and upper boundaries of all channels of the frame sent last."""
+        return self._engine_bounds() if self._frame_state is None else (list(self._frame_lower), list(self._frame_upper))
+
+    async def _async_send_frame(self, config: MCConfigSnapshot, steps: int) -> None:
+        """Build the frame of the current channel values and send it to the light entities."""
+        if self.is_debug_enabled():
+            if self._color_mode in ["rgb", "rgbw"]:
+                # 1. Determine which channels to look up
+                channels = list(self._color_mode)  # results in ['r', 'g', 'b'] or ['r', 'g', 'b', 'w']
+
+                # 2. Build strings for current values and active ranges
+                vals_str = "/".join([str(int(self.get_current_channel_value(c) or 0)) for c in channels])
+                lower, upper = self._current_bounds()
+                ranges_str = " | ".join([f"{c}:{lo}-{up}" for c, lo, up in zip(self._engine.channels, lower, upper, strict=True) if c in channels])
+
+                self.logger.debug("Update [%s]: Values=%s (Active Ranges: %s)", self._color_mode.upper(), vals_str, ranges_str)
             else:
-                self.logger.error("No target light entity ID configured for Moving Colors instance.")
+                # 3. Fallback for simple Brightness mode
+                brightness = self.get_current_value()
+                b_min = self.get_current_lower_boundary()
+                b_max = self.get_current_upper_boundary()
+
+                self.logger.debug("Update: Brightness=%s (Range: %s-%s)", brightness, b_min, b_max)
+
+        # Prepare service data once per capability class and hand it over to the dispatch stage,
+        # which sends all targets with identical payloads in one service call
+        values = self._current_values()
+        lower, upper = self._current_bounds()
+        payloads: dict[str, dict[str, Any]] = {}
+        for capability, target_entities in self._capabilities.groups().items():
+            payload = self._build_payload(values, capability)
+            if self._keyframe_mode:
+                # Let the light fade to the keyframe during the ticks until the next one
+                payload["transition"] = round(steps * config.trigger_interval, 3)
+            for target_entity in target_entities:
+                payloads[target_entity] = payload
+
+        await self._dispatcher.async_dispatch(payloads, self._get_dispatch_deadline(config))
+
+        self._record_statistics(values, lower, upper)
+        self._schedule_sensor_update()
+
+    def _get_dispatch_deadline(self, config: MCConfigSnapshot) -> float:
+        """Return how long one frame may wait for its service calls, defaults to one trigger interval."""
+        deadline = float(self._config.get(DISPATCH_DEADLINE) or 0)
+        return deadline if deadline > 0 else max(MIN_TRIGGER_INTERVAL, config.trigger_interval * self._interval_factor)
+
+    def _build_payload(self, values: list[int], capability: str | None = None) -> dict[str, Any]:
+        """Build the light.turn_on service data (without entity_id) for the given channel values and capability class."""
+        return build_payload(self._color_mode, capability or self._color_mode, values)
 
     async def _restore_initial_state(self) -> None:
         """Restore the light to its pre-loop state."""
@@ -788,7 +1152,7 @@ class MovingColorsManager:
         for target_entity in self._target_light_entity_id:
             # If the light was originally off, turn it back off
             if self._initial_state["state"] == "off":
-                await self.hass.services.async_call("light", "turn_off", {"entity_id": target_entity})
+                await self.hass.services.async_call("light", "turn_off", {"entity_id": target_entity}, context=create_command_context())
                 continue
 
             # Otherwise, restore the values
@@ -802,20 +1166,69 @@ class MovingColorsManager:
                 data["brightness"] = self._initial_state["brightness"]
 
             self.logger.debug("Restoring %s to initial state.", target_entity)
-            await self.hass.services.async_call("light", "turn_on", data)
+            await self.hass.services.async_call("light", "turn_on", data, context=create_command_context())
 
         # Clear the snapshot so we don't restore it twice
         self._initial_state = None
+        self._dispatcher.reset()
+
+    @callback
+    def async_request_refresh(self) -> None:
+        """
+        Request a re-evaluation of the controls, e.g. after a switch was toggled.
+
+        The request is evaluated in the next loop iteration, so changes within the same
+        iteration are evaluated together. Requests arriving while an evaluation waits for
+        the lights are coalesced into one more evaluation afterwards, so a burst of control
+        changes sends at most one immediate frame.
+        """
+        self._refresh_requested = True
+        if self._refresh_task is None:
+            self._refresh_task = self.hass.async_create_task(self._async_run_refresh(), f"{DOMAIN} refresh {self.name}", eager_start=False)
+
+    async def _async_run_refresh(self) -> None:
+        """Evaluate the pending refresh requests one after another until none is left."""
+        frame_sent = False
+        try:
+            while self._refresh_requested:
+                self._refresh_requested = False
+                frame_sent = await self.async_refresh(send_frame=not frame_sent) or frame_sent
+        finally:
+            self._refresh_task = None
+
+    async def async_refresh(self, send_frame: bool = True) -> bool:
+        """
+        Start, update or stop the periodic task according to the controls.
+
+        A running loop only gets an immediate frame if the configuration changed since the
+        last evaluation and send_frame is set, otherwise the next tick picks up the changes.
+        Returns True if a frame was sent.
+        """
+        # State change events are dispatched one loop iteration later, so the
+        # tracker may not have invalidated the snapshot yet. Re-resolve it now.
+        self._config_snapshot = None
+        config = self._get_config_snapshot()
+        changed = config != self._refreshed_config
+        self._refreshed_config = config
+
+        if changed:
+            # Changed settings take effect with a new keyframe
+            self._keyframe_ticks_remaining = 0
 
-    async def async_refresh(self) -> None:
-        """Handle a state change from the switches."""
         # Check if we need to start or stop the periodic task
-        if self.is_enabled():
-            if not self._update_listener:
-                await self.async_start_update_task()
+        if config.enabled and not self._tick_job.is_running:
+            # Starting the task sends the first frame
+            await self.async_start_update_task()
+            return True
+        if config.enabled or (config.default_mode_enabled and self._tick_job.is_running):
+            # The periodic task keeps running, in default mode until the default value is reached
+            if not changed or not send_frame:
+                return False
             await self.async_update_state()
-        else:
+            return True
+        if self._tick_job.is_running:
             await self.stop_update_task()
+        return False
 
     def is_debug_enabled(self) -> bool:
         """Check if the debug switch for this instance is ON."""
@@ -824,12 +1237,40 @@ class MovingColorsManager:
     ### =========================================================
     ### Helpers for sensors
     def get_current_lower_boundary(self) -> int | None:
-        """Return the current lower boundary."""
-        return -1
+        """Return the lowest active lower boundary of the moving channels in the frame sent last."""
+        lower, _ = self._current_bounds()
+        bounds = [bound for channel, bound in zip(self._engine.channels, lower, strict=True) if channel != "w"]
+        return min((bound for bound in bounds if bound is not None), default=None)
 
     def get_current_upper_boundary(self) -> int | None:
-        """Return the current upper boundary."""
-        return 256
+        """Return the highest active upper boundary of the moving channels in the frame sent last."""
+        _, upper = self._current_bounds()
+        bounds = [bound for channel, bound in zip(self._engine.channels, upper, strict=True) if channel != "w"]
+        return max((bound for bound in bounds if bound is not None), default=None)
+
+    def get_suppressed_frames(self) -> int:
+        """Return the number of target updates, which were skipped because the frame didn't change."""
+        return self._dispatcher.get_suppressed_frames()
+
+    def get_dropped_frames(self) -> dict[str, int]:
+        """Return the number of frames per target, which were replaced by a newer frame before being sent."""
+        return self._dispatcher.get_dropped_frames()
+
+    def get_coalesced_frames(self) -> dict[str, int]:
+        """Return the number of frames per target, which were held back and sent later."""
+        return self._dispatcher.get_coalesced_frames()
+
+    def get_missed_deadlines(self) -> dict[str, int]:
+        """Return the number of frames per target, which were not confirmed within the dispatch deadline."""
+        return self._dispatcher.get_missed_deadlines()
+
+    def get_tick_lateness(self) -> float:
+        """Return how many milliseconds the last tick fired after its due time."""
+        return self._tick_job.get_last_lateness() * 1000
+
+    def get_missed_ticks(self) -> int:
+        """Return the number of ticks, which could not be executed in time."""
+        return self._tick_job.get_missed_ticks()
 
     ### =========================================================
     ### Getters for all configuration values
@@ -837,54 +1278,159 @@ class MovingColorsManager:
     ### Boolean getters
     def is_enabled(self) -> bool:
         """Return if the instance is enabled."""
-        return self._get_composed_config_value(MCConfig.ENABLED_ENTITY, MCInternal.ENABLED_MANUAL, False, bool)
+        return self._get_config_snapshot().enabled
 
     def is_random_limits_enabled(self) -> bool:
-        """Return the current stepping value."""
-        return self._get_composed_config_value(MCConfig.RANDOM_LIMITS_ENTITY, MCInternal.RANDOM_LIMITS_MANUAL, True, bool)
+        """Return if random limits are enabled."""
+        return self._get_config_snapshot().random_limits
 
     def is_default_mode_enabled(self) -> bool:
-        """Return the current stepping value."""
-        return self._get_composed_config_value(MCConfig.DEFAULT_MODE_ENABLED_ENTITY, MCInternal.DEFAULT_MODE_ENABLED_MANUAL, False, bool)
+        """Return if the default mode is enabled."""
+        return self._get_config_snapshot().default_mode_enabled
 
     def is_start_from_current_position_enabled(self) -> bool:
-        """Return the current stepping value."""
-        return self._get_composed_config_value(MCConfig.START_FROM_CURRENT_POSITION_ENTITY, MCInternal.START_FROM_CURRENT_POSITION_MANUAL, True, bool)
+        """Return if the animation should start from the current light position."""
+        return self._get_config_snapshot().start_from_current_position
 
     ### Integer getters
     def get_config_start_value(self) -> int:
         """Return the current start value."""
-        return self._get_composed_config_value(MCConfig.START_VALUE_ENTITY, MCInternal.START_VALUE_MANUAL, MCInternalDefaults.START_VALUE.value, int)
+        return self._get_config_snapshot().start_value
 
     def get_config_min_value(self) -> int:
         """Return the current min value."""
-        return self._get_composed_config_value(MCConfig.MIN_VALUE_ENTITY, MCInternal.MIN_VALUE_MANUAL, MCInternalDefaults.MIN_VALUE.value, int)
+        return self._get_config_snapshot().min_value
 
     def get_config_max_value(self) -> int:
         """Return the current max value."""
-        return self._get_composed_config_value(MCConfig.MAX_VALUE_ENTITY, MCInternal.MAX_VALUE_MANUAL, MCInternalDefaults.MAX_VALUE.value, int)
+        return self._get_config_snapshot().max_value
 
     def get_config_stepping(self) -> int:
         """Return the current stepping value."""
-        return self._get_composed_config_value(MCConfig.STEPPING_ENTITY, MCInternal.STEPPING_MANUAL, MCInternalDefaults.STEPPING.value, int)
+        return self._get_config_snapshot().stepping
 
-    def get_config_trigger_interval(self) -> int:
+    def get_config_trigger_interval(self) -> float:
         """Return the current trigger interval."""
-        return self._get_composed_config_value(
-            MCConfig.TRIGGER_INTERVAL_ENTITY, MCInternal.TRIGGER_INTERVAL_MANUAL, MCInternalDefaults.TRIGGER_INTERVAL.value, int
-        )
+        return self._get_config_snapshot().trigger_interval
+
+    def get_effective_trigger_interval(self) -> float:
+        """Return the trigger interval stretched by the factor adapted to the response latency of the targets."""
+        return self.get_config_trigger_interval() * self._interval_factor
 
     def get_config_default_value(self) -> int:
-        """Return the current stepping value."""
-        return self._get_composed_config_value(
-            MCConfig.DEFAULT_VALUE_ENTITY, MCInternal.DEFAULT_VALUE_MANUAL, MCInternalDefaults.DEFAULT_VALUE.value, int
-        )
+        """Return the current default value."""
+        return self._get_config_snapshot().default_value
 
     def get_config_steps_to_default(self) -> int:
-        """Return the current stepping value."""
-        return self._get_composed_config_value(
-            MCConfig.STEPS_TO_DEFAULT_ENTITY, MCInternal.STEPS_TO_DEFAULT_MANUAL, MCInternalDefaults.STEPS_TO_DEFAULT.value, int
-        )
+        """Return the current number of steps to the default value."""
+        return self._get_config_snapshot().steps_to_default
+
+    ### =========================================================
+    ### Options handling
+    @callback
+    def async_apply_options(self, config_entry: ConfigEntry) -> bool:
+        """
+        Apply changed options to the running instance, return False if the config entry must be reloaded instead.
+
+        The debug log, the dispatch and tick options and external entities, which are swapped
+        for another entity, are applied in place. Changes of the target lights, the engine or
+        external entities which are added or removed change the entities of the instance and
+        require a reload.
+        """
+        config = {**config_entry.data, **config_entry.options}
+        changed = {key for key in config.keys() | self._config.keys() if config.get(key) != self._config.get(key)}
+        swapped = {
+            key
+            for key in changed & EXTERNAL_ENTITY_OPTIONS
+            if _is_entity_configured(config.get(key)) and _is_entity_configured(self._config.get(key))
+        }
+        structural = changed - LIVE_OPTIONS - swapped
+        if structural:
+            self.logger.debug("Changed options %s require a reload.", sorted(structural))
+            return False
+
+        self._config = config
+        self.logger.debug("Applying changed options %s in place.", sorted(changed))
+
+        if DEBUG_ENABLED in changed:
+            self._debug_enabled = bool(config.get(DEBUG_ENABLED, False))
+            _set_debug_log(self.logger, self.name, self._debug_enabled)
+        if MAX_COMMANDS_PER_SECOND in changed:
+            self._dispatcher.set_rate_limit(float(config.get(MAX_COMMANDS_PER_SECOND) or 0))
+        if MISSED_TICK_POLICY in changed:
+            self._tick_job.set_policy(MissedTickPolicy(config.get(MISSED_TICK_POLICY) or MissedTickPolicy.SKIP.value))
+        if SENSOR_UPDATE_INTERVAL in changed:
+            self._sensor_update_interval = float(config.get(SENSOR_UPDATE_INTERVAL, 10) or 0)
+        if changed & {KEYFRAME_MODE, LOOKAHEAD_FRAMES}:
+            # Frames computed ahead were built for the previous mode, continue from the frame sent last
+            self._discard_frames()
+            self._keyframe_mode = bool(config.get(KEYFRAME_MODE, False))
+            self._keyframe_ticks_remaining = 0
+            self._lookahead_frames = int(config.get(LOOKAHEAD_FRAMES) or 0)
+            self._frames = FrameBuffer(self._lookahead_frames, len(self._engine.channels))
+        if KEYFRAME_MODE in changed:
+            # The interval is only adapted outside of keyframe mode, start over with fresh measurements
+            self._interval_factor = 1
+            if self._latency is not None:
+                self._latency.reset()
+
+        if swapped:
+            # The snapshot subscribes to the new entities as soon as it is rebuilt
+            self._config_snapshot = None
+            for key in swapped:
+                async_dispatcher_send(self.hass, self.signal_external_entity, key, config[key])
+            self.async_request_refresh()
+        return True
+
+    ### =========================================================
+    ### Config snapshot handling
+    def _get_config_snapshot(self) -> MCConfigSnapshot:
+        """Return the resolved configuration, rebuilding it if it was invalidated."""
+        if self._config_snapshot is None:
+            self._config_snapshot = self._build_config_snapshot()
+        return self._config_snapshot
+
+    def _build_config_snapshot(self) -> MCConfigSnapshot:
+        """Resolve all configuration values and (re-)subscribe to the entities they depend on."""
+        values: dict[str, Any] = {}
+        tracked_entity_ids: set[str] = set()
+
+        for field, (config_enum, internal_enum, default_value, value_type) in CONFIG_SNAPSHOT_FIELDS.items():
+            values[field] = self._get_composed_config_value(config_enum, internal_enum, default_value, value_type)
+
+            external_id = self._config.get(config_enum.value)
+            if isinstance(external_id, str) and external_id.lower() not in ("none", ""):
+                tracked_entity_ids.add(external_id)
+
+            # Entities which don't exist yet are picked up through the registry listener,
+            # which invalidates both the internal entity index and this snapshot.
+            internal_id = self.get_internal_entity_id(internal_enum)
+            if internal_id:
+                tracked_entity_ids.add(internal_id)
+
+        self._track_config_entities(tracked_entity_ids)
+        return MCConfigSnapshot(**values)
+
+    def _track_config_entities(self, entity_ids: set[str]) -> None:
+        """Subscribe to state changes of all entities the config snapshot depends on."""
+        if entity_ids == self._tracked_config_entity_ids and self._unsub_config_tracker:
+            return
+
+        if self._unsub_config_tracker:
+            self._unsub_config_tracker()
+            self._unsub_config_tracker = None
+
+        self._tracked_config_entity_ids = entity_ids
+        if entity_ids:
+            self._unsub_config_tracker = async_track_state_change_event(self.hass, list(entity_ids), self._handle_config_entity_change)
+
+    @callback
+    def _handle_config_entity_change(self, event: Event) -> None:
+        """Invalidate the config snapshot after one of the tracked entities changed."""
+        if is_command_echo(event):
+            # A target light is also used as config entity, its frames don't change the configuration
+            return
+        self._config_snapshot = None
 
     ### =========================================================
     ### Helper methods for getters
@@ -911,13 +1457,67 @@ class MovingColorsManager:
 
         return value_type(final_value)
 
-    def get_internal_entity_id(self, internal_enum: MCInternal) -> str:
+    def get_internal_entity_id(self, internal_enum: MCInternal) -> str | None:
         """Get the internal entity_id for this instance."""
+        if self._internal_entity_ids is None:
+            self._internal_entity_ids = self._build_internal_entity_index()
+        return self._internal_entity_ids.get(internal_enum)
+
+    def _build_internal_entity_index(self) -> dict[MCInternal, str]:
+        """Resolve the entity IDs of all internal entities of this instance from the entity registry."""
         registry = entity_registry.async_get(self.hass)
-        unique_id = f"{self._entry_id}_{internal_enum.value}"
-        entity_id = registry.async_get_entity_id(internal_enum.domain, "moving_colors", unique_id)
-        # self.logger.debug("Looking up internal entity_id for unique_id: %s -> %s", unique_id, entity_id)
-        return entity_id  # noqa: RET504
+        index: dict[MCInternal, str] = {}
+        for internal_member in MCInternal:
+            unique_id = f"{self._entry_id}_{internal_member.value}"
+            entity_id = registry.async_get_entity_id(internal_member.domain, DOMAIN, unique_id)
+            if entity_id:
+                index[internal_member] = entity_id
+        self.logger.debug("Internal entity index built: %s", {member.value: entity_id for member, entity_id in index.items()})
+        return index
+
+    @callback
+    def async_build_internal_entity_index(self) -> None:
+        """(Re-)build the internal entity index, e.g. after all platforms have been set up."""
+        self._internal_entity_ids = self._build_internal_entity_index()
+        self._config_snapshot = None
+
+    @callback
+    def async_register_internal_entity(self, internal_enum: MCInternal, entity_id: str) -> None:
+        """Register an internal entity, which was just added to Home Assistant."""
+        if self._internal_entity_ids is None:
+            self._internal_entity_ids = self._build_internal_entity_index()
+        if self._internal_entity_ids.get(internal_enum) != entity_id:
+            self._internal_entity_ids[internal_enum] = entity_id
+            self._config_snapshot = None
+
+    @callback
+    def _handle_entity_registry_updated(self, event: Event) -> None:
+        """Invalidate the capability and light group indexes for updated lights and the internal entity index of this entry."""
+        if event.data["entity_id"] in self._capabilities or event.data.get("old_entity_id") in self._capabilities:
+            # Supported color modes of a target might have changed
+            self.logger.debug("Entity registry updated for target %s, invalidating capability index.", event.data["entity_id"])
+            self._capabilities.invalidate()
+            self._check_color_mode()
+        if event.data["entity_id"].startswith("light."):
+            # A light group covering targets might have been added, removed or renamed
+            self._light_groups.invalidate()
+
+        if self._internal_entity_ids is None:
+            # Not built yet, will be resolved on next access anyway
+            return
+
+        known_entity_ids = self._internal_entity_ids.values()
+        entity_id = event.data["entity_id"]
+        if entity_id not in known_entity_ids and event.data.get("old_entity_id") not in known_entity_ids:
+            if event.data["action"] != "create":
+                return
+            registry_entry = entity_registry.async_get(self.hass).async_get(entity_id)
+            if registry_entry is None or registry_entry.config_entry_id != self._entry_id:
+                return
+
+        self.logger.debug("Entity registry updated for %s (%s), invalidating internal entity index.", entity_id, event.data["action"])
+        self._internal_entity_ids = None
+        self._config_snapshot = None
 
     def _get_internal_entity_state_value(self, entity_id: str, default: Any, expected_type: type, log_warning: bool = True) -> Any:
         """Extract dynamic value from an entity state."""
@@ -0,0 +1,383 @@
+"""Vectorized channel state engine of Moving Colors, which steps the channels of all instances at once."""
+
+import logging
+import math
+from collections.abc import Iterable, Sequence
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN_DATA_BATCH_ENGINE
+from .engine import RANDOM_BLOCK_SIZE, RandomLimits
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the batch engine is just not available without it
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Initial number of rows (instance x channel) of the shared arrays, grows by doubling
+INITIAL_CAPACITY = 64
+
+
+def is_batch_engine_available() -> bool:
+    """Return True if numpy is installed and the batch engine can be used."""
+    return np is not None
+
+
+class BatchChannelEngine:
+    """
+    State of the channels of all Moving Colors instances using the batch engine.
+
+    Every channel of every instance is one row of shared numpy arrays. Steps requested
+    by the instances are only recorded and executed together for all pending rows on
+    the next read, i.e. when the first instance of a scheduler wakeup builds its frame.
+    Random limits of all channels, which bounced in such a batch, are taken at once from
+    blocks of random numbers, pre-generated by the RandomLimits of the instances.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        """Initialize the shared arrays."""
+        self._capacity = 0
+        self._free: list[int] = []
+
+        # Channel state
+        self.values = np.zeros(0, dtype=np.int64)
+        self.lower = np.zeros(0, dtype=np.int64)
+        self.upper = np.zeros(0, dtype=np.int64)
+        self.count_up = np.zeros(0, dtype=bool)
+        self.ready = np.zeros(0, dtype=bool)
+
+        # Recorded step requests
+        self._pending = np.zeros(0, dtype=bool)
+        self._stepping = np.zeros(0, dtype=np.int64)
+        self._steps = np.zeros(0, dtype=np.int64)
+        self._abs_min = np.zeros(0, dtype=np.int64)
+        self._abs_max = np.zeros(0, dtype=np.int64)
+        self._use_random = np.zeros(0, dtype=bool)
+        self._has_pending = False
+
+        # Pre-generated random numbers per row and their source
+        self._fractions = np.zeros((0, RANDOM_BLOCK_SIZE), dtype=np.float64)
+        self._cursor = np.zeros(0, dtype=np.int64)
+        self._row_random: list[tuple[RandomLimits, str] | None] = []
+
+        self._grow(capacity)
+
+    @property
+    def row_count(self) -> int:
+        """Return the number of allocated rows."""
+        return self._capacity - len(self._free)
+
+    def _grow(self, capacity: int) -> None:
+        """Enlarge all arrays to the given capacity."""
+        extra = capacity - self._capacity
+        for name in ("values", "lower", "upper", "_stepping", "_steps", "_abs_min", "_abs_max"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.int64)]))
+        for name in ("count_up", "ready", "_pending", "_use_random"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=bool)]))
+        self._fractions = np.concatenate([self._fractions, np.zeros((extra, RANDOM_BLOCK_SIZE), dtype=np.float64)])
+        self._cursor = np.concatenate([self._cursor, np.zeros(extra, dtype=np.int64)])
+        self._row_random.extend([None] * extra)
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+
+    def create_view(
+        self,
+        channels: Sequence[str],
+        values: Sequence[int] | None = None,
+        held: Iterable[str] = (),
+        random_limits: RandomLimits | None = None,
+    ) -> "BatchChannelView":
+        """Allocate rows for the non-held channels of one instance."""
+        held_channels = set(held)
+        stepped = [channel for channel in channels if channel not in held_channels]
+        while len(self._free) < len(stepped):
+            self._grow(self._capacity * 2)
+        rows = np.array([self._free.pop() for _ in stepped], dtype=np.intp)
+
+        start_values = list(values) if values is not None else [0] * len(channels)
+        by_channel = dict(zip(channels, start_values, strict=True))
+        self.values[rows] = [by_channel[channel] for channel in stepped]
+        self.lower[rows] = 0
+        self.upper[rows] = 0
+        self.count_up[rows] = True
+        self.ready[rows] = False
+        self._pending[rows] = False
+
+        # The first random limit of a row generates its first block
+        random_limits = random_limits or RandomLimits()
+        self._cursor[rows] = RANDOM_BLOCK_SIZE
+        for row, channel in zip(rows, stepped, strict=True):
+            self._row_random[row] = (random_limits, channel)
+        return BatchChannelView(self, channels, rows, held_channels)
+
+    def release(self, view: "BatchChannelView") -> None:
+        """Free the rows of an instance."""
+        self._pending[view.rows] = False
+        for row in view.rows:
+            self._row_random[row] = None
+        self._free.extend(int(row) for row in view.rows)
+        view.rows = np.zeros(0, dtype=np.intp)
+
+    def request_step(self, rows: "np.ndarray", stepping: int, abs_min: int, abs_max: int, use_random: bool, steps: int = 1) -> None:
+        """Record a step for the given rows, which is executed with the next flush."""
+        if self._pending[rows].any():
+            # A second step before the first one was read, keep the order
+            self.flush()
+        self._pending[rows] = True
+        self._stepping[rows] = stepping
+        self._steps[rows] = steps
+        self._abs_min[rows] = abs_min
+        self._abs_max[rows] = abs_max
+        self._use_random[rows] = use_random
+        self._has_pending = True
+
+    def flush_rows(self, rows: "np.ndarray") -> None:
+        """Execute all recorded steps, if one of them is pending for the given rows."""
+        # Steps of other instances stay recorded, so they are executed together with the next ones
+        if self._has_pending and self._pending[rows].any():
+            self.flush()
+
+    def flush(self) -> None:
+        """Execute all recorded steps in one batched operation."""
+        if not self._has_pending:
+            return
+        self._has_pending = False
+        rows = np.flatnonzero(self._pending)
+        self._pending[rows] = False
+
+        # Channels, whose boundaries weren't set yet, start with the absolute limits
+        new_rows = rows[~self.ready[rows]]
+        self.lower[new_rows] = self._abs_min[new_rows]
+        self.upper[new_rows] = self._abs_max[new_rows]
+        self.count_up[new_rows] = True
+        self.ready[new_rows] = True
+
+        # Without random limits the new position is calculated directly from the number of steps
+        fixed = rows[~self._use_random[rows]]
+        self._step_fixed(fixed)
+
+        rows_random = rows[self._use_random[rows]]
+        distance = self._stepping * self._steps
+        up = rows_random[self.count_up[rows_random]]
+        down = rows_random[~self.count_up[rows_random]]
+
+        # 1. Moving UP, clamp at the active max and turn around
+        moved_up = self.values[up] + distance[up]
+        hit_max = moved_up >= self.upper[up]
+        moved_up[hit_max] = self.upper[up][hit_max]
+        self.values[up] = moved_up
+        bounced_up = up[hit_max]
+        self.count_up[bounced_up] = False
+
+        # 2. Moving DOWN, clamp at the active min and turn around
+        moved_down = self.values[down] - distance[down]
+        hit_min = moved_down <= self.lower[down]
+        moved_down[hit_min] = self.lower[down][hit_min]
+        self.values[down] = moved_down
+        bounced_down = down[hit_min]
+        self.count_up[bounced_down] = True
+
+        # 3. New random boundaries for the way back, drawn for all bounced channels at once:
+        # after a max bounce between absolute min and position, after a min bounce between position and absolute max
+        if len(bounced_up) or len(bounced_down):
+            low = np.concatenate([self._abs_min[bounced_up], self.values[bounced_down]])
+            high = np.concatenate([self.values[bounced_up], self._abs_max[bounced_down]])
+            drawn = low + (self._next_fractions(np.concatenate([bounced_up, bounced_down])) * np.maximum(0, high - low + 1)).astype(np.int64)
+            self.lower[bounced_up] = drawn[: len(bounced_up)]
+            self.upper[bounced_down] = drawn[len(bounced_up) :]
+
+        self.values[rows] = np.clip(self.values[rows], 0, 255)
+
+        if len(bounced_up) or len(bounced_down):
+            _LOGGER.debug("Batch step of %s channels, %s bounced at a random max, %s at a random min.", len(rows), len(bounced_up), len(bounced_down))
+
+    def _hold_still(self, rows: "np.ndarray") -> None:
+        """Keep the given rows without stepping in place, values beyond their boundaries are moved onto them."""
+        if not len(rows):
+            return
+        lower = self.lower[rows]
+        upper = self.upper[rows]
+        values = np.clip(self.values[rows], lower, upper)
+        count_up = self.count_up[rows]
+        at_upper = count_up & (values >= upper)
+        at_lower = ~count_up & (values <= lower)
+        self.values[rows] = values
+        self.count_up[rows] = np.where(at_upper | at_lower, ~count_up, count_up)
+        self.lower[rows] = np.where(at_upper, self._abs_min[rows], lower)
+        self.upper[rows] = np.where(at_lower, self._abs_max[rows], upper)
+
+    def _next_fractions(self, rows: "np.ndarray") -> "np.ndarray":
+        """Return the next pre-generated random number of each row, refill exhausted blocks first."""
+        for row in rows[self._cursor[rows] >= RANDOM_BLOCK_SIZE]:
+            random_limits, channel = self._row_random[row]
+            self._fractions[row] = random_limits.next_block(channel)
+            self._cursor[row] = 0
+        fractions = self._fractions[rows, self._cursor[rows]]
+        self._cursor[rows] += 1
+        return fractions
+
+    def _step_fixed(self, rows: "np.ndarray") -> None:
+        """Advance the given rows without random limits, vectorized version of triangle_position()."""
+        rows = rows[self._steps[rows] > 0]
+        self._hold_still(rows[self._stepping[rows] <= 0])
+        rows = rows[self._stepping[rows] > 0]
+        if not len(rows):
+            return
+        values = self.values[rows]
+        count_up = self.count_up[rows]
+        lower = self.lower[rows]
+        upper = self.upper[rows]
+        abs_min = self._abs_min[rows]
+        abs_max = self._abs_max[rows]
+        stepping = self._stepping[rows]
+        steps = self._steps[rows]
+        sign = np.where(count_up, 1, -1)
+
+        def leg_steps(distance: "np.ndarray") -> "np.ndarray":
+            return np.maximum(1, -(-distance // stepping))
+
+        # 1. Leg to the current active boundary
+        first = np.where(count_up, upper, lower)
+        first_steps = leg_steps(sign * (first - values))
+        in_first = steps < first_steps
+
+        # 2. Leg back to the absolute limit on the other side
+        second = np.where(count_up, abs_min, abs_max)
+        second_offset = steps - first_steps
+        second_steps = leg_steps(np.maximum(0, sign * (first - second)))
+        in_second = ~in_first & (second_offset < second_steps)
+
+        # 3. Periodic cycle between the absolute limits, starting at the second boundary
+        cycle_steps = leg_steps(np.maximum(0, abs_max - abs_min))
+        cycle_offset = (second_offset - second_steps) % (2 * cycle_steps)
+        in_cycle_forward = ~in_first & ~in_second & (cycle_offset < cycle_steps)
+        third = np.where(count_up, abs_max, abs_min)
+
+        conditions = [in_first, in_second, in_cycle_forward]
+        self.values[rows] = np.select(
+            conditions,
+            [
+                values + sign * steps * stepping,
+                first - sign * second_offset * stepping,
+                second + sign * cycle_offset * stepping,
+            ],
+            default=third - sign * (cycle_offset - cycle_steps) * stepping,
+        )
+        self.count_up[rows] = np.select(conditions, [count_up, ~count_up, count_up], default=~count_up)
+        self.lower[rows] = np.where(in_first | (in_second & ~count_up), lower, abs_min)
+        self.upper[rows] = np.where(in_first | (in_second & count_up), upper, abs_max)
+
+
+class BatchChannelView:
+    """Channel state of one instance backed by rows of the BatchChannelEngine, with the API of ChannelEngine."""
+
+    __slots__ = ("_batch", "_channels", "_held", "_row_by_channel", "rows")
+
+    def __init__(self, batch: BatchChannelEngine, channels: Sequence[str], rows: "np.ndarray", held: set[str]) -> None:
+        """Initialize the view."""
+        self._batch = batch
+        self._channels: tuple[str, ...] = tuple(channels)
+        self._held = held
+        self.rows = rows
+        stepped = [channel for channel in self._channels if channel not in held]
+        self._row_by_channel: dict[str, int] = {channel: int(row) for channel, row in zip(stepped, rows, strict=True)}
+
+    @property
+    def channels(self) -> tuple[str, ...]:
+        """Return the channel names in payload order."""
+        return self._channels
+
+    def _row(self, channel: str) -> int | None:
+        self._batch.flush_rows(self.rows)
+        return self._row_by_channel.get(channel)
+
+    def value(self, channel: str) -> int | None:
+        """Return the current value of a channel or None if the channel doesn't exist."""
+        if channel in self._held:
+            return 0
+        row = self._row(channel)
+        return None if row is None else int(self._batch.values[row])
+
+    def lower_bound(self, channel: str) -> int | None:
+        """Return the current active lower boundary of a channel."""
+        if channel in self._held:
+            return 0
+        row = self._row(channel)
+        return None if row is None or not self._batch.ready[row] else int(self._batch.lower[row])
+
+    def upper_bound(self, channel: str) -> int | None:
+        """Return the current active upper boundary of a channel."""
+        if channel in self._held:
+            return 0
+        row = self._row(channel)
+        return None if row is None or not self._batch.ready[row] else int(self._batch.upper[row])
+
+    def is_counting_up(self, channel: str) -> bool:
+        """Return True if the channel is currently moving up."""
+        if channel in self._held:
+            return True
+        return bool(self._batch.count_up[self._row(channel)])
+
+    def values(self) -> list[int]:
+        """Return the current values of all channels in payload order."""
+        return [self.value(channel) for channel in self._channels]
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the current values of all channels by channel name."""
+        return dict(zip(self._channels, self.values(), strict=True))
+
+    def set_channel(self, channel: str, value: int, lower: int, upper: int, count_up: bool) -> None:
+        """Set the complete state of one channel."""
+        if channel in self._held:
+            return
+        row = self._row(channel)
+        self._batch.values[row] = value
+        self._batch.lower[row] = lower
+        self._batch.upper[row] = upper
+        self._batch.count_up[row] = count_up
+        self._batch.ready[row] = True
+
+    def snapshot(self) -> tuple:
+        """Return a copy of the state of all channels, which can be set again with restore()."""
+        batch = self._batch
+        batch.flush_rows(self.rows)
+        rows = self.rows
+        return batch.values[rows], batch.lower[rows], batch.upper[rows], batch.count_up[rows], batch.ready[rows]
+
+    def restore(self, state: tuple) -> None:
+        """Set the state of all channels to a snapshot taken before."""
+        batch = self._batch
+        batch.flush_rows(self.rows)
+        rows = self.rows
+        batch.values[rows], batch.lower[rows], batch.upper[rows], batch.count_up[rows], batch.ready[rows] = state
+
+    def step(self, stepping: int, abs_min: int, abs_max: int, use_random: bool, steps: int = 1) -> None:
+        """Record the steps of all channels, which are executed together with all other instances."""
+        self._batch.request_step(self.rows, stepping, abs_min, abs_max, use_random, steps)
+
+    def steps_to_next_boundary(self, stepping: int) -> int:
+        """Return the number of steps until the first channel reaches its active boundary."""
+        if stepping <= 0:
+            return 1
+        self._batch.flush_rows(self.rows)
+        rows = self.rows[self._batch.ready[self.rows]]
+        if not len(rows):
+            return 1
+        distance = np.where(
+            self._batch.count_up[rows], self._batch.upper[rows] - self._batch.values[rows], self._batch.values[rows] - self._batch.lower[rows]
+        )
+        return max(1, math.ceil(int(distance.min()) / stepping))
+
+    def release(self) -> None:
+        """Free the rows of this instance in the batch engine."""
+        self._batch.release(self)
+
+
+@callback
+def async_get_batch_engine(hass: HomeAssistant) -> BatchChannelEngine:
+    """Return the batch engine shared by all Moving Colors instances."""
+    if DOMAIN_DATA_BATCH_ENGINE not in hass.data:
+        hass.data[DOMAIN_DATA_BATCH_ENGINE] = BatchChannelEngine()
+    return hass.data[DOMAIN_DATA_BATCH_ENGINE]
@@ -0,0 +1,133 @@
+"""Capability index of Moving Colors, which groups the target lights by the payload they can process."""
+
+import logging
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry
+
+# Capability classes, ordered from the richest to the simplest payload
+CAPABILITY_RGBW = "rgbw"
+CAPABILITY_RGB = "rgb"
+CAPABILITY_BRIGHTNESS = "brightness"
+CAPABILITY_CLASSES = (CAPABILITY_RGBW, CAPABILITY_RGB, CAPABILITY_BRIGHTNESS)
+
+# Color modes, which HA converts from an RGB color without loss of the animation
+_RGB_COLOR_MODES = {"rgb", "rgbww", "xy", "hs"}
+
+
+def capability_class(supported_color_modes: Iterable[str]) -> str:
+    """Return the capability class of a light with the given supported color modes."""
+    modes = set(supported_color_modes or ())
+    if "rgbw" in modes:
+        return CAPABILITY_RGBW
+    if modes & _RGB_COLOR_MODES:
+        return CAPABILITY_RGB
+    return CAPABILITY_BRIGHTNESS
+
+
+def build_payload(color_mode: str, capability: str, values: Sequence[int]) -> dict[str, Any]:
+    """
+    Build the light.turn_on service data (without entity_id) for a capability class.
+
+    The values are the channel values of an engine in the given color mode. Lights which
+    support less channels than the engine get the RGB part or the brightest channel.
+    """
+    if color_mode == CAPABILITY_BRIGHTNESS:
+        return {"brightness": values[0]}
+    rgb = list(values[:3])
+    if capability == CAPABILITY_RGBW:
+        white = values[3] if color_mode == CAPABILITY_RGBW else 0
+        return {"brightness_pct": 100, "rgbw_color": [*rgb, white]}
+    if capability == CAPABILITY_RGB:
+        return {"brightness_pct": 100, "rgb_color": rgb}
+    return {"brightness": max(rgb)}
+
+
+class CapabilityIndex:
+    """
+    Capability class of every target light of one Moving Colors instance.
+
+    The classes are resolved from the supported color modes in the entity registry,
+    falling back to the state attributes, and cached until one of the targets is
+    updated in the registry. Targets without any information yet (e.g. during startup)
+    count as brightness lights and are resolved again on the next access.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_ids: Sequence[str], logger: logging.Logger) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self.logger = logger
+        self._entity_ids: list[str] = list(entity_ids or [])
+        self._classes: dict[str, str] | None = None
+        self._groups: dict[str, list[str]] | None = None
+
+    def __contains__(self, entity_id: str) -> bool:
+        """Return True if the entity is one of the targets."""
+        return entity_id in self._entity_ids
+
+    def get(self, entity_id: str) -> str:
+        """Return the capability class of a target."""
+        return self._get_classes().get(entity_id, CAPABILITY_BRIGHTNESS)
+
+    def groups(self) -> dict[str, list[str]]:
+        """Return the targets by capability class."""
+        if self._groups is not None:
+            return self._groups
+        groups: dict[str, list[str]] = {}
+        for entity_id, capability in self._get_classes().items():
+            groups.setdefault(capability, []).append(entity_id)
+        if self._classes is not None:
+            self._groups = groups
+        return groups
+
+    def richest_class(self) -> tuple[str, str | None]:
+        """Return the richest capability class of all targets and the first target of this class."""
+        groups = self.groups()
+        for capability in CAPABILITY_CLASSES:
+            if groups.get(capability):
+                return capability, groups[capability][0]
+        return CAPABILITY_BRIGHTNESS, None
+
+    def is_resolved(self) -> bool:
+        """Return True if the classes of all targets are known, i.e. none of them counts as brightness light only for lack of information."""
+        self._get_classes()
+        return self._classes is not None
+
+    @callback
+    def invalidate(self) -> None:
+        """Drop the cached classes, they are resolved again on next access."""
+        self._classes = None
+        self._groups = None
+
+    def _get_classes(self) -> dict[str, str]:
+        if self._classes is not None:
+            return self._classes
+
+        registry = entity_registry.async_get(self.hass)
+        classes: dict[str, str] = {}
+        complete = True
+        for entity_id in self._entity_ids:
+            if not entity_id:
+                self.logger.error("No target light entity ID configured for Moving Colors instance.")
+                continue
+            modes = self._supported_color_modes(registry, entity_id)
+            complete = complete and modes is not None
+            classes[entity_id] = capability_class(modes or ())
+
+        if complete:
+            self.logger.debug("Capability classes of the target lights: %s", classes)
+            self._classes = classes
+        return classes
+
+    def _supported_color_modes(self, registry: entity_registry.EntityRegistry, entity_id: str) -> list[str] | None:
+        """Return the supported color modes from the entity registry or, if it is sparse, from the state."""
+        entry = registry.async_get(entity_id)
+        if entry and entry.capabilities and entry.capabilities.get("supported_color_modes"):
+            return entry.capabilities["supported_color_modes"]
+        state = self.hass.states.get(entity_id)
+        if state and state.state != STATE_UNAVAILABLE:
+            return state.attributes.get("supported_color_modes", [])
+        return None
@@ -13,13 +13,25 @@ from homeassistant.helpers import selector
 from voluptuous import Any
 
 from .const import (
+    ADAPTIVE_INTERVAL,
+    BATCH_ENGINE,
     DEBUG_ENABLED,
+    DISPATCH_DEADLINE,
     DOMAIN,
+    KEYFRAME_MODE,
+    LOOKAHEAD_FRAMES,
+    MAX_COMMANDS_PER_SECOND,
     MC_CONF_NAME,
+    MIN_TRIGGER_INTERVAL,
+    MISSED_TICK_POLICY,
+    RANDOM_SEED,
+    SENSOR_UPDATE_INTERVAL,
+    STATISTICS_WINDOW,
     TARGET_LIGHT_ENTITY_ID,
     VERSION,
     MCConfig,
     MCInternal,
+    MissedTickPolicy,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -67,6 +79,34 @@ def get_cfg_options() -> vol.Schema:
             vol.Optional(MCConfig.STEPS_TO_DEFAULT_ENTITY.value): selector.EntitySelector(
                 selector.EntitySelectorConfig(domain=["sensor", "input_number"])
             ),
+            vol.Optional(KEYFRAME_MODE, default=False): selector.BooleanSelector(),
+            vol.Optional(MISSED_TICK_POLICY, default=MissedTickPolicy.SKIP.value): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[policy.value for policy in MissedTickPolicy],
+                    translation_key=MISSED_TICK_POLICY,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Optional(DISPATCH_DEADLINE, default=0): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=60, step=0.1, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(MAX_COMMANDS_PER_SECOND, default=0): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=50, step=0.1, unit_of_measurement="1/s", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(ADAPTIVE_INTERVAL, default=False): selector.BooleanSelector(),
+            vol.Optional(SENSOR_UPDATE_INTERVAL, default=10): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=3600, step=1, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(STATISTICS_WINDOW, default=0): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=86400, step=1, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(LOOKAHEAD_FRAMES, default=0): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=64, step=1, mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(RANDOM_SEED): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=4294967295, step=1, mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(BATCH_ENGINE, default=False): selector.BooleanSelector(),
             vol.Optional(DEBUG_ENABLED, default=False): selector.BooleanSelector(),
         }
     )
@@ -94,7 +134,7 @@ YAML_CONFIG_SCHEMA = vol.Schema(
         vol.Optional(MCConfig.STEPPING_ENTITY.value): cv.entity_id,
         vol.Optional(MCInternal.STEPPING_MANUAL.value): vol.Coerce(float),
         vol.Optional(MCConfig.TRIGGER_INTERVAL_ENTITY.value): cv.entity_id,
-        vol.Optional(MCInternal.TRIGGER_INTERVAL_MANUAL.value): vol.Coerce(float),
+        vol.Optional(MCInternal.TRIGGER_INTERVAL_MANUAL.value): vol.All(vol.Coerce(float), vol.Range(min=MIN_TRIGGER_INTERVAL)),
         vol.Optional(MCConfig.RANDOM_LIMITS_ENTITY.value): cv.entity_id,
         vol.Optional(MCInternal.RANDOM_LIMITS_MANUAL.value): cv.boolean,
         vol.Optional(MCConfig.DEFAULT_VALUE_ENTITY.value): cv.entity_id,
@@ -105,6 +145,16 @@ YAML_CONFIG_SCHEMA = vol.Schema(
         vol.Optional(MCInternal.START_FROM_CURRENT_POSITION_MANUAL.value): cv.boolean,
         vol.Optional(MCConfig.STEPS_TO_DEFAULT_ENTITY.value): cv.entity_id,
         vol.Optional(MCInternal.STEPS_TO_DEFAULT_MANUAL.value): vol.Coerce(float),
+        vol.Optional(KEYFRAME_MODE, default=False): cv.boolean,
+        vol.Optional(MISSED_TICK_POLICY, default=MissedTickPolicy.SKIP.value): vol.In([policy.value for policy in MissedTickPolicy]),
+        vol.Optional(DISPATCH_DEADLINE): vol.Coerce(float),
+        vol.Optional(MAX_COMMANDS_PER_SECOND, default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ADAPTIVE_INTERVAL, default=False): cv.boolean,
+        vol.Optional(SENSOR_UPDATE_INTERVAL, default=10): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(STATISTICS_WINDOW, default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(LOOKAHEAD_FRAMES, default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=64)),
+        vol.Optional(RANDOM_SEED): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(BATCH_ENGINE, default=False): cv.boolean,
         vol.Optional(DEBUG_ENABLED, default=False): cv.boolean,
     }
 )
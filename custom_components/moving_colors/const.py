@@ -6,6 +6,8 @@ from homeassistant.components.sensor import SensorStateClass
 
 DOMAIN = "moving_colors"
 DOMAIN_DATA_MANAGERS = f"{DOMAIN}_managers"  # A good practice for unique keys
+DOMAIN_DATA_SCHEDULER = f"{DOMAIN}_scheduler"  # Tick scheduler shared by all managers
+DOMAIN_DATA_BATCH_ENGINE = f"{DOMAIN}_batch_engine"  # numpy channel engine shared by all managers
 DEFAULT_NAME = "Moving Colors"
 MC_CONF_COVERS = "lights"  # Constant for 'lights' key within configuration
 
@@ -15,6 +17,17 @@ VERSION = 1
 MC_CONF_NAME = "name"
 DEBUG_ENABLED = "debug_enabled"
 TARGET_LIGHT_ENTITY_ID = "target_light_entity"
+DISPATCH_DEADLINE = "dispatch_deadline"  # Seconds, 0 = one trigger interval
+KEYFRAME_MODE = "keyframe_mode"
+MIN_TRIGGER_INTERVAL = 0.1  # Seconds, shortest supported frame interval
+MISSED_TICK_POLICY = "missed_tick_policy"
+BATCH_ENGINE = "batch_engine"
+RANDOM_SEED = "random_seed"
+LOOKAHEAD_FRAMES = "lookahead_frames"
+MAX_COMMANDS_PER_SECOND = "max_commands_per_second"  # Per light, 0 = unlimited
+ADAPTIVE_INTERVAL = "adaptive_interval"
+SENSOR_UPDATE_INTERVAL = "sensor_update_interval"  # Seconds, 0 = every frame
+STATISTICS_WINDOW = "statistics_window"  # Seconds, 0 = no statistics sensors
 
 
 class MCInternal(Enum):
@@ -84,6 +97,22 @@ class MCInternalDefaults(Enum):
     STEPS_TO_DEFAULT = 5
 
 
+class MissedTickPolicy(Enum):
+    """Enum for the handling of ticks, which could not be executed in time."""
+
+    SKIP = "skip"  # Drop missed ticks, the animation keeps its pace
+    COALESCE = "coalesce"  # Advance by all missed steps with the next frame
+    CATCH_UP = "catch_up"  # Send one frame per missed tick right away
+
+
+class DefaultModeState(Enum):
+    """Enum for the state of a channel on its way back to the default value."""
+
+    IDLE = "idle"  # Default mode not active
+    RAMPING = "ramping"  # Moving towards the default value
+    REACHED = "reached"  # Default value reached
+
+
 class SensorEntries(Enum):
     """Enum for the possible sensor entries."""
 
@@ -99,6 +128,20 @@ class SensorEntries(Enum):
     CURRENT_MIN_VALUE = "current_min_value"
     CURRENT_MAX_VALUE = "current_max_value"
 
+    # Statistics per window (optional)
+    VALUE_STATISTICS = "value_statistics"
+    RED_STATISTICS = "red_statistics"
+    GREEN_STATISTICS = "green_statistics"
+    BLUE_STATISTICS = "blue_statistics"
+
+    # Diagnostics
+    SUPPRESSED_FRAMES = "suppressed_frames"
+    DROPPED_FRAMES = "dropped_frames"
+    COALESCED_FRAMES = "coalesced_frames"
+    MISSED_DEADLINES = "missed_deadlines"
+    TICK_LATENESS = "tick_lateness"
+    MISSED_TICKS = "missed_ticks"
+
 
 INTERNAL_TO_DEFAULTS_MAP = {
     MCInternal.ENABLED_MANUAL: False,
@@ -0,0 +1,299 @@
+"""Dispatch stage of Moving Colors, which sends computed frames to the target lights."""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Context, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.ulid import ulid_now
+
+from .latency import ResponseLatencyTracker
+from .light_groups import LightGroupIndex
+
+# Parent of the contexts of all light commands sent by Moving Colors, which identifies the resulting state changes
+_COMMAND_PARENT_ID = ulid_now()
+
+
+def create_command_context() -> Context:
+    """Return a new context for a light command of Moving Colors."""
+    return Context(parent_id=_COMMAND_PARENT_ID)
+
+
+def is_command_echo(event: Event) -> bool:
+    """Return True if the event was caused by a light command of Moving Colors."""
+    return event.context.parent_id == _COMMAND_PARENT_ID
+
+
+def payload_key(payload: dict[str, Any]) -> tuple:
+    """Return a hashable representation of a light.turn_on payload."""
+    return tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in payload.items()))
+
+
+def group_targets_by_payload(payloads: dict[str, dict[str, Any]]) -> list[tuple[dict[str, Any], list[str]]]:
+    """
+    Group target entities, which should receive the same payload.
+
+    Returns a list of (payload, [entity_id, ...]) tuples in order of first appearance,
+    so that targets with identical payloads can be handled by one service call.
+    """
+    groups: dict[tuple, tuple[dict[str, Any], list[str]]] = {}
+    for entity_id, payload in payloads.items():
+        key = payload_key(payload)
+        if key in groups:
+            groups[key][1].append(entity_id)
+        else:
+            groups[key] = (payload, [entity_id])
+    return list(groups.values())
+
+
+class TokenBucket:
+    """Command budget of one target, refilled with `rate` tokens per second up to one token."""
+
+    __slots__ = ("_rate", "_tokens", "_updated")
+
+    def __init__(self, rate: float, now: float) -> None:
+        """Initialize a full bucket."""
+        self._rate = rate
+        self._tokens = 1.0
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(1.0, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def try_take(self, now: float) -> bool:
+        """Take one token, return False if the budget is exhausted."""
+        self._refill(now)
+        # Allow for rounding errors of ticks running exactly at the rate
+        if self._tokens < 1.0 - 1e-6:
+            return False
+        self._tokens = max(0.0, self._tokens - 1.0)
+        return True
+
+    def wait_time(self, now: float) -> float:
+        """Return the seconds until the next token is available."""
+        self._refill(now)
+        return max(0.0, (1.0 - self._tokens) / self._rate)
+
+
+class MovingColorsDispatcher:
+    """Send frames to the target lights using as few service calls as possible."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        light_groups: LightGroupIndex | None = None,
+        rate_limit: float = 0,
+        latency: ResponseLatencyTracker | None = None,
+    ) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self.logger = logger
+
+        # Response latency measurement, started with each call
+        self._latency = latency
+
+        # Group entities, which replace their members in the service calls
+        self._light_groups = light_groups
+
+        # Number of frames per target, which were not confirmed within the per-tick deadline
+        self._missed_deadlines: dict[str, int] = {}
+
+        # Last payload sent to each target and number of target updates skipped because of it
+        self._last_payloads: dict[str, tuple] = {}
+        self._suppressed_frames: int = 0
+
+        # Commands per second and target (0 = unlimited). Frames exceeding the budget are held back,
+        # only the newest one per target is kept and sent as soon as the next token is available.
+        self._rate_limit: float = rate_limit
+        self._buckets: dict[str, TokenBucket] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+        # Outstanding call of each target, newer frames are held back until it is finished
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+        # Frames per target, which were replaced by a newer one before being sent,
+        # and held back frames, which were sent later in place of the replaced ones
+        self._dropped_frames: dict[str, int] = {}
+        self._coalesced_frames: dict[str, int] = {}
+
+    async def async_dispatch(self, payloads: dict[str, dict[str, Any]], deadline: float | None = None) -> None:
+        """
+        Send one frame to the target lights.
+
+        `payloads` maps each target entity_id to its light.turn_on service data (without
+        entity_id). Targets with identical payloads are addressed with one service call,
+        the call is only split if targets need different payloads. Light groups, whose
+        members all get the same payload, are addressed instead of their members. All resulting calls
+        are sent concurrently. Calls which are not finished after `deadline` seconds keep
+        running in the background, but their targets are recorded and no longer awaited,
+        so one slow light can't delay the next frame.
+
+        Targets, whose payload is identical to the last one sent to them, are skipped
+        and counted as suppressed. Targets, which still wait for their last call or have
+        no command budget left, keep only this frame as pending and get it as soon as
+        the call is finished and the budget allows.
+        """
+        now = self._now()
+        changed: dict[str, dict[str, Any]] = {}
+        for entity_id, payload in payloads.items():
+            key = payload_key(payload)
+            if self._last_payloads.get(entity_id) == key:
+                # The light already shows or gets the newest frame, a held back one is obsolete
+                self._drop_pending(entity_id)
+                self._suppressed_frames += 1
+                continue
+            self._drop_pending(entity_id)
+            if entity_id in self._in_flight or not self._try_take_token(entity_id, now):
+                self._pending[entity_id] = payload
+                continue
+            self._last_payloads[entity_id] = key
+            changed[entity_id] = payload
+
+        if self._pending:
+            self._schedule_flush(now)
+        await self._async_send_frame(changed, deadline)
+
+    async def _async_send_frame(self, payloads: dict[str, dict[str, Any]], deadline: float | None) -> None:
+        """Send the payloads with as few concurrent service calls as possible and wait at most `deadline` seconds."""
+        groups = group_targets_by_payload(payloads)
+        if not groups:
+            return
+
+        tasks = {self.hass.async_create_task(self._async_send(payload, entity_ids)): entity_ids for payload, entity_ids in groups}
+        for task, entity_ids in tasks.items():
+            for entity_id in entity_ids:
+                self._in_flight[entity_id] = task
+            task.add_done_callback(partial(self._handle_send_done, entity_ids))
+        _, pending = await asyncio.wait(tasks, timeout=deadline if deadline and deadline > 0 else None)
+
+        for task in pending:
+            for entity_id in tasks[task]:
+                self._missed_deadlines[entity_id] = self._missed_deadlines.get(entity_id, 0) + 1
+            self.logger.debug("Service call for %s missed the dispatch deadline of %ss, skipping it for this frame.", tasks[task], deadline)
+
+    @callback
+    def _handle_send_done(self, entity_ids: list[str], task: asyncio.Task) -> None:
+        """Release the targets of a finished call and send the frames queued for them in the meantime."""
+        for entity_id in entity_ids:
+            if self._in_flight.get(entity_id) is task:
+                del self._in_flight[entity_id]
+
+        if task.cancelled() or (err := task.exception()) is not None:
+            if not task.cancelled():
+                self.logger.error("Unexpected error while updating %s: %r", entity_ids, err)
+            # Unknown light state, so the next frame must not be suppressed
+            for entity_id in entity_ids:
+                self._last_payloads.pop(entity_id, None)
+        if any(entity_id in self._pending for entity_id in entity_ids):
+            self._schedule_flush(self._now())
+
+    def _now(self) -> float:
+        """Return the loop time for the token buckets, which is only needed with a rate limit."""
+        return self.hass.loop.time() if self._rate_limit > 0 else 0.0
+
+    def _try_take_token(self, entity_id: str, now: float) -> bool:
+        if self._rate_limit <= 0:
+            return True
+        bucket = self._buckets.get(entity_id)
+        if bucket is None:
+            bucket = self._buckets[entity_id] = TokenBucket(self._rate_limit, now)
+        return bucket.try_take(now)
+
+    def _wait_time(self, entity_id: str, now: float) -> float:
+        bucket = self._buckets.get(entity_id)
+        return bucket.wait_time(now) if bucket else 0.0
+
+    def _drop_pending(self, entity_id: str) -> None:
+        """Drop the frame held back for a target, because a newer one replaces it."""
+        if self._pending.pop(entity_id, None) is not None:
+            self._dropped_frames[entity_id] = self._dropped_frames.get(entity_id, 0) + 1
+
+    def _schedule_flush(self, now: float) -> None:
+        """
+        Arm the timer for the held back frame, which gets the next token.
+
+        Frames of targets with a call in flight are sent when the call is finished.
+        """
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+        waiting = [self._wait_time(entity_id, now) for entity_id in self._pending if entity_id not in self._in_flight]
+        if not waiting:
+            return
+        delay = min(waiting)
+        if delay > 0:
+            self._unsub_flush = async_call_later(self.hass, delay, self._async_flush_pending)
+        else:
+            self.hass.async_create_task(self._async_flush_pending(None))
+
+    async def _async_flush_pending(self, _now: Any) -> None:
+        """Send the held back frames of all targets, which are not waiting for a call and got new command budget."""
+        self._unsub_flush = None
+        now = self._now()
+        payloads: dict[str, dict[str, Any]] = {}
+        for entity_id, payload in list(self._pending.items()):
+            if entity_id in self._in_flight or not self._try_take_token(entity_id, now):
+                continue
+            del self._pending[entity_id]
+            self._coalesced_frames[entity_id] = self._coalesced_frames.get(entity_id, 0) + 1
+            self._last_payloads[entity_id] = payload_key(payload)
+            payloads[entity_id] = payload
+
+        if self._pending:
+            self._schedule_flush(now)
+        await self._async_send_frame(payloads, None)
+
+    async def _async_send(self, payload: dict[str, Any], entity_ids: list[str]) -> None:
+        """Send one light.turn_on call and wait until the light platform handled it."""
+        addresses = self._light_groups.resolve(entity_ids) if self._light_groups else entity_ids
+        context = create_command_context()
+        if self._latency is not None:
+            self._latency.record_command(entity_ids, context.id, self.hass.loop.time())
+        try:
+            await self.hass.services.async_call("light", "turn_on", {**payload, "entity_id": addresses}, blocking=True, context=context)
+        except HomeAssistantError as err:
+            self.logger.warning("Failed to update %s: %s", entity_ids, err)
+            # Unknown light state, so the next frame must not be suppressed
+            for entity_id in entity_ids:
+                self._last_payloads.pop(entity_id, None)
+
+    def invalidate(self, entity_id: str) -> None:
+        """Forget the last payload of a target, e.g. after it was changed outside of the dispatch stage, so the next frame is sent."""
+        self._last_payloads.pop(entity_id, None)
+
+    def set_rate_limit(self, rate_limit: float) -> None:
+        """Change the command budget per target, held back frames are sent with the new budget."""
+        self._rate_limit = rate_limit
+        self._buckets.clear()
+        if self._pending:
+            self._schedule_flush(self._now())
+
+    def reset(self) -> None:
+        """Forget the last payloads and drop held back frames, e.g. after the lights were changed outside of the dispatch stage."""
+        self._last_payloads.clear()
+        self._pending.clear()
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    def get_missed_deadlines(self) -> dict[str, int]:
+        """Return the number of missed dispatch deadlines per target."""
+        return dict(self._missed_deadlines)
+
+    def get_suppressed_frames(self) -> int:
+        """Return the number of target updates, which were skipped because nothing changed."""
+        return self._suppressed_frames
+
+    def get_dropped_frames(self) -> dict[str, int]:
+        """Return the number of frames per target, which were replaced by a newer frame before being sent."""
+        return dict(self._dropped_frames)
+
+    def get_coalesced_frames(self) -> dict[str, int]:
+        """Return the number of frames per target, which were held back and sent later."""
+        return dict(self._coalesced_frames)
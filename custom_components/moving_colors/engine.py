@@ -0,0 +1,531 @@
+"""Channel state engine of Moving Colors, which moves all channels between their active boundaries."""
+
+import logging
+import math
+import random
+from collections.abc import Iterable, Sequence
+
+from .const import DefaultModeState
+
+# State of one channel: value, count_up, active lower boundary, active upper boundary
+ChannelState = tuple[int, bool, int, int]
+
+# Number of random numbers, which are generated at once per channel
+RANDOM_BLOCK_SIZE = 64
+
+
+def scale_fraction(fraction: float, low: int, high: int) -> int:
+    """Map a random number of [0, 1) to an integer of [low, high], like random.randint() does."""
+    return low + int(fraction * max(0, high - low + 1))
+
+
+class RandomLimits:
+    """
+    Source of the random limits of one Moving Colors instance.
+
+    Every channel has its own generator, derived from the seed of the instance, which
+    generates its random numbers in blocks ahead of time. So the limits of a channel
+    only depend on the seed and its own bounces, and a run can be reproduced.
+    """
+
+    def __init__(self, seed: int | None = None, block_size: int = RANDOM_BLOCK_SIZE) -> None:
+        """Initialize the random source, without seed the limits are not reproducible."""
+        self.seed = seed
+        self.block_size = block_size
+        self._generators: dict[str, random.Random] = {}
+        self._blocks: dict[str, list[float]] = {}
+        self._cursors: dict[str, int] = {}
+
+    def next_block(self, channel: str) -> list[float]:
+        """Generate the next block of random numbers of [0, 1) of a channel."""
+        generator = self._generators.get(channel)
+        if generator is None:
+            generator = random.Random(None if self.seed is None else f"{self.seed}:{channel}")
+            self._generators[channel] = generator
+        return [generator.random() for _ in range(self.block_size)]
+
+    def randint(self, channel: str, low: int, high: int) -> int:
+        """Return the next random limit of [low, high] of a channel."""
+        cursor = self._cursors.get(channel, self.block_size)
+        if cursor >= self.block_size:
+            self._blocks[channel] = self.next_block(channel)
+            cursor = 0
+        self._cursors[channel] = cursor + 1
+        return scale_fraction(self._blocks[channel][cursor], low, high)
+
+
+def _leg_steps(distance: int, stepping: int) -> int:
+    """Return the number of steps to cover the distance to a boundary, the bounce itself takes at least one."""
+    return max(1, -(-distance // stepping))
+
+
+def triangle_position(state: ChannelState, abs_min: int, abs_max: int, stepping: int, steps: int) -> ChannelState:
+    """
+    Return the state of a channel after the given number of steps without random limits.
+
+    Without random limits a channel is a triangle wave: it runs to its active boundary,
+    bounces back to the absolute limit on the other side and cycles between the
+    absolute limits from then on. The result is calculated directly, so it doesn't
+    matter if the steps are done one by one or all at once.
+    """
+    value, count_up, lower, upper = state
+    if steps <= 0:
+        return state
+    if stepping <= 0:
+        # The channel stands still, a value beyond its boundaries (e.g. after they were narrowed) is moved onto them
+        value = min(max(value, lower), upper)
+        if count_up and value >= upper:
+            return upper, False, abs_min, upper
+        if not count_up and value <= lower:
+            return lower, True, lower, abs_max
+        return value, count_up, lower, upper
+
+    sign = 1 if count_up else -1
+
+    # 1. Leg to the current active boundary
+    first = upper if count_up else lower
+    first_steps = _leg_steps(sign * (first - value), stepping)
+    if steps < first_steps:
+        return value + sign * steps * stepping, count_up, lower, upper
+    steps -= first_steps
+
+    # 2. Leg back to the absolute limit on the other side
+    if count_up:
+        second, lower = abs_min, abs_min
+    else:
+        second, upper = abs_max, abs_max
+    second_steps = _leg_steps(max(0, sign * (first - second)), stepping)
+    if steps < second_steps:
+        return first - sign * steps * stepping, not count_up, lower, upper
+    steps -= second_steps
+
+    # 3. Periodic cycle between the absolute limits, starting at the second boundary
+    cycle_steps = _leg_steps(max(0, abs_max - abs_min), stepping)
+    steps %= 2 * cycle_steps
+    if steps < cycle_steps:
+        return second + sign * steps * stepping, count_up, abs_min, abs_max
+    third = abs_max if count_up else abs_min
+    return third - sign * (steps - cycle_steps) * stepping, not count_up, abs_min, abs_max
+
+
+class ChannelEngine:
+    """
+    State of all channels of one Moving Colors instance.
+
+    Values, active boundaries and directions are stored in flat lists indexed by
+    channel position and are updated in place, so stepping doesn't allocate.
+    Held channels (e.g. the white channel of RGBW lights) always stay at 0.
+
+    Without random limits the position is calculated from an anchor, i.e. the state
+    at the last configuration change, and the number of steps since then. So the
+    position can be set to any step directly with seek().
+    """
+
+    __slots__ = (
+        "_anchor",
+        "_anchor_params",
+        "_channels",
+        "_count_up",
+        "_held",
+        "_index",
+        "_logger",
+        "_lower",
+        "_random",
+        "_ready",
+        "_tick",
+        "_upper",
+        "_values",
+    )
+
+    def __init__(
+        self,
+        channels: Sequence[str],
+        values: Sequence[int] | None = None,
+        held: Iterable[str] = (),
+        logger: logging.Logger | None = None,
+        random_limits: RandomLimits | None = None,
+    ) -> None:
+        """Initialize the engine with the given channels and start values."""
+        count = len(channels)
+        self._channels: tuple[str, ...] = tuple(channels)
+        self._index: dict[str, int] = {channel: i for i, channel in enumerate(self._channels)}
+        self._values: list[int] = list(values) if values is not None else [0] * count
+        self._lower: list[int] = [0] * count
+        self._upper: list[int] = [0] * count
+        self._count_up: list[bool] = [True] * count
+        held_channels = set(held)
+        self._held: list[bool] = [channel in held_channels for channel in self._channels]
+        # Channels, whose boundaries weren't set yet, are initialized with the absolute limits on their first step
+        self._ready: list[bool] = [False] * count
+        self._logger = logger or logging.getLogger(__name__)
+        self._random = random_limits or RandomLimits()
+
+        # Anchor of the closed-form position: channel states, (stepping, abs_min, abs_max) and steps since then
+        self._anchor: list[ChannelState] = []
+        self._anchor_params: tuple[int, int, int] | None = None
+        self._tick: int = 0
+
+        for i, is_held in enumerate(self._held):
+            if is_held:
+                self._values[i] = 0
+                self._ready[i] = True
+
+    # ----------------------------------------------------------------------
+    # Read access
+    # ----------------------------------------------------------------------
+    @property
+    def channels(self) -> tuple[str, ...]:
+        """Return the channel names in payload order."""
+        return self._channels
+
+    def value(self, channel: str) -> int | None:
+        """Return the current value of a channel or None if the channel doesn't exist."""
+        i = self._index.get(channel)
+        return None if i is None else self._values[i]
+
+    def lower_bound(self, channel: str) -> int | None:
+        """Return the current active lower boundary of a channel."""
+        i = self._index.get(channel)
+        return None if i is None or not self._ready[i] else self._lower[i]
+
+    def upper_bound(self, channel: str) -> int | None:
+        """Return the current active upper boundary of a channel."""
+        i = self._index.get(channel)
+        return None if i is None or not self._ready[i] else self._upper[i]
+
+    def is_counting_up(self, channel: str) -> bool:
+        """Return True if the channel is currently moving up."""
+        return self._count_up[self._index[channel]]
+
+    def values(self) -> list[int]:
+        """Return the current values of all channels in payload order."""
+        return list(self._values)
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the current values of all channels by channel name."""
+        return dict(zip(self._channels, self._values, strict=True))
+
+    @property
+    def tick(self) -> int:
+        """Return the number of steps since the anchor of the closed-form position."""
+        return self._tick
+
+    # ----------------------------------------------------------------------
+    # Write access
+    # ----------------------------------------------------------------------
+    def set_channel(self, channel: str, value: int, lower: int, upper: int, count_up: bool) -> None:
+        """Set the complete state of one channel."""
+        i = self._index[channel]
+        if self._held[i]:
+            return
+        self._values[i] = value
+        self._lower[i] = lower
+        self._upper[i] = upper
+        self._count_up[i] = count_up
+        self._ready[i] = True
+        self._anchor_params = None
+
+    def release(self) -> None:
+        """Free resources of the engine, nothing to do as the state is owned by this object."""
+
+    def snapshot(self) -> tuple:
+        """Return a copy of the state of all channels, which can be set again with restore()."""
+        return (
+            list(self._values),
+            list(self._lower),
+            list(self._upper),
+            list(self._count_up),
+            list(self._ready),
+            self._anchor,
+            self._anchor_params,
+            self._tick,
+        )
+
+    def restore(self, state: tuple) -> None:
+        """Set the state of all channels to a snapshot taken before."""
+        values, lower, upper, count_up, ready, self._anchor, self._anchor_params, self._tick = state
+        self._values[:] = values
+        self._lower[:] = lower
+        self._upper[:] = upper
+        self._count_up[:] = count_up
+        self._ready[:] = ready
+
+    def _init_channels(self, abs_min: int, abs_max: int) -> None:
+        """Initialize channels, whose boundaries weren't set yet, with the absolute limits."""
+        for i, ready in enumerate(self._ready):
+            if not ready:
+                self._lower[i] = abs_min
+                self._upper[i] = abs_max
+                self._count_up[i] = True
+                self._ready[i] = True
+
+    def step(self, stepping: int, abs_min: int, abs_max: int, use_random: bool, steps: int = 1) -> None:
+        """
+        Move all channels by the given number of steps and bounce at their active boundaries.
+
+        At a bounce, the boundary of the way back is reset to the absolute limit or,
+        with random limits, drawn between the absolute limit and the current position.
+        With random limits, multiple steps are done as one move over the whole distance.
+        """
+        self._init_channels(abs_min, abs_max)
+        if not use_random:
+            self.seek(self._tick + steps, stepping, abs_min, abs_max)
+            return
+
+        # Random boundaries can't be calculated in advance, a new anchor is needed afterwards
+        self._anchor_params = None
+        distance = steps * stepping
+        values = self._values
+        lower = self._lower
+        upper = self._upper
+        count_up = self._count_up
+        for i in range(len(values)):
+            if self._held[i]:
+                continue
+
+            val = values[i]
+
+            # 1. Logic for moving UP
+            if count_up[i]:
+                val += distance
+                # Check if we hit the CURRENT active max for this channel
+                if val >= upper[i]:
+                    val = upper[i]
+                    count_up[i] = False
+
+                    # We hit the top, generate new RANDOM MIN for the trip down.
+                    # New min is between absolute min and current position.
+                    lower[i] = self._random.randint(self._channels[i], abs_min, int(val))
+                    self._logger.debug("Channel %s: Hit max (%s). New random min border: %s", self._channels[i], val, lower[i])
+
+            # 2. Logic for moving DOWN
+            else:
+                val -= distance
+                # Check if we hit the CURRENT active min for this channel
+                if val <= lower[i]:
+                    val = lower[i]
+                    count_up[i] = True
+
+                    # We hit the bottom, generate new RANDOM MAX for the trip up.
+                    # New max is between current position and absolute max.
+                    upper[i] = self._random.randint(self._channels[i], int(val), abs_max)
+                    self._logger.debug("Channel %s: Hit min (%s). New random max border: %s", self._channels[i], val, upper[i])
+
+            values[i] = max(0, min(255, val))
+
+    def seek(self, tick: int, stepping: int, abs_min: int, abs_max: int) -> None:
+        """
+        Set all channels to their position the given number of steps after the anchor, without random limits.
+
+        If the parameters differ from the ones of the anchor, the current state becomes the new anchor first.
+        """
+        self._init_channels(abs_min, abs_max)
+        params = (stepping, abs_min, abs_max)
+        if self._anchor_params != params:
+            self._anchor = list(zip(self._values, self._count_up, self._lower, self._upper, strict=True))
+            self._anchor_params = params
+            tick -= self._tick
+            self._tick = 0
+
+        tick = max(0, tick)
+        for i, anchor in enumerate(self._anchor):
+            if self._held[i]:
+                continue
+            value, count_up, lower, upper = triangle_position(anchor, abs_min, abs_max, stepping, tick)
+            if count_up != self._count_up[i]:
+                self._logger.debug("Channel %s: Hit %s (%s).", self._channels[i], "min" if count_up else "max", value)
+            self._values[i] = max(0, min(255, value))
+            self._count_up[i] = count_up
+            self._lower[i] = lower
+            self._upper[i] = upper
+        self._tick = tick
+
+    def steps_to_next_boundary(self, stepping: int) -> int:
+        """
+        Return the number of steps until the first channel reaches its active boundary.
+
+        All channels move linearly until then, so this point is the next keyframe.
+        """
+        if stepping <= 0:
+            return 1
+
+        steps: int | None = None
+        for i, val in enumerate(self._values):
+            if self._held[i] or not self._ready[i]:
+                continue
+            distance = self._upper[i] - val if self._count_up[i] else val - self._lower[i]
+            channel_steps = max(1, math.ceil(distance / stepping))
+            steps = channel_steps if steps is None else min(steps, channel_steps)
+
+        return steps or 1
+
+
+class DefaultModeRamp:
+    """
+    State machine, which returns the channels of one instance to the default value.
+
+    Every channel has its own state and step count. All channels move at the speed of the
+    channel with the longest way, which reaches its target within the configured number of
+    steps, so channels with a shorter way reach their target earlier and keep it from then
+    on. The values are calculated from the start value and the step count of each channel,
+    so every step costs the same, regardless of the engine.
+    """
+
+    __slots__ = ("_delta", "_start", "_states", "_steps", "_totals")
+
+    def __init__(self) -> None:
+        """Initialize an idle ramp."""
+        self._start: list[int] = []
+        self._delta: list[int] = []
+        self._states: list[DefaultModeState] = []
+        self._steps: list[int] = []
+        self._totals: list[int] = []
+
+    @property
+    def is_active(self) -> bool:
+        """Return True if the ramp was started and not reset since then."""
+        return bool(self._states)
+
+    @property
+    def is_done(self) -> bool:
+        """Return True if all channels reached their target."""
+        return self.is_active and all(state is DefaultModeState.REACHED for state in self._states)
+
+    @property
+    def remaining_steps(self) -> int:
+        """Return the number of steps until all channels reached their target."""
+        return max((total - step for step, total in zip(self._steps, self._totals, strict=True)), default=0)
+
+    def states(self) -> list[DefaultModeState]:
+        """Return the state of all channels in payload order."""
+        return list(self._states) or [DefaultModeState.IDLE]
+
+    def begin(self, values: Sequence[int], targets: Sequence[int], steps: int) -> None:
+        """Start the ramp from the given values to the targets, the longest way takes the given number of steps."""
+        self._start = list(values)
+        self._delta = [target - value for value, target in zip(values, targets, strict=True)]
+        longest = max((abs(delta) for delta in self._delta), default=0)
+        steps = max(1, steps)
+        self._totals = [math.ceil(steps * abs(delta) / longest) if delta else 0 for delta in self._delta]
+        self._steps = [0] * len(self._delta)
+        self._states = [DefaultModeState.RAMPING if delta else DefaultModeState.REACHED for delta in self._delta]
+
+    def advance(self, steps: int = 1) -> list[int]:
+        """Move all channels, which didn't reach their target yet, by the given number of steps and return the values of all channels."""
+        steps = max(0, steps)
+        values = []
+        for i, start in enumerate(self._start):
+            if self._states[i] is DefaultModeState.REACHED:
+                values.append(start + self._delta[i])
+                continue
+            self._steps[i] = min(self._totals[i], self._steps[i] + steps)
+            if self._steps[i] >= self._totals[i]:
+                self._states[i] = DefaultModeState.REACHED
+            values.append(start + round(self._delta[i] * self._steps[i] / self._totals[i]))
+        return values
+
+    def reset(self) -> None:
+        """Stop the ramp."""
+        self._start.clear()
+        self._delta.clear()
+        self._states.clear()
+        self._steps.clear()
+        self._totals.clear()
+
+
+class ChannelStatistics:
+    """
+    Min, max, mean and number of bounces of the channel values within one statistics window.
+
+    The aggregates are updated with every sent frame, so closing a window costs the same
+    regardless of the number of frames within it. The mean is weighted by the time each
+    frame stayed on the lights, until the next frame or the end of the window, so rate
+    limited, suppressed or keyframe-only frames don't bias it. A bounce is counted whenever
+    a channel reverses its direction, the direction of the last frame is kept across windows.
+    """
+
+    __slots__ = (
+        "_bounces",
+        "_count",
+        "_direction",
+        "_duration",
+        "_last",
+        "_lower",
+        "_max",
+        "_min",
+        "_since",
+        "_sum",
+        "_upper",
+        "_weighted",
+        "channels",
+    )
+
+    def __init__(self, channels: Sequence[str]) -> None:
+        """Initialize an empty window for the given channels."""
+        self.channels: tuple[str, ...] = tuple(channels)
+        self._last: list[int | None] = [None] * len(self.channels)
+        self._direction: list[int] = [0] * len(self.channels)
+        self.reset()
+
+    def add(self, values: Sequence[int], lower: Sequence[int | None], upper: Sequence[int | None], now: float) -> None:
+        """Add the values of one frame sent at `now` and the active boundaries they were computed with."""
+        held = self._hold_time(now)
+        self._duration += held
+        self._since = now
+        self._count += 1
+        for i, value in enumerate(values):
+            if self._count > 1:
+                # The previous frame of this window stayed on the lights until now
+                self._weighted[i] += self._last[i] * held
+            self._min[i] = value if self._min[i] is None else min(self._min[i], value)
+            self._max[i] = value if self._max[i] is None else max(self._max[i], value)
+            self._sum[i] += value
+            if lower[i] is not None:
+                self._lower[i] = lower[i] if self._lower[i] is None else min(self._lower[i], lower[i])
+            if upper[i] is not None:
+                self._upper[i] = upper[i] if self._upper[i] is None else max(self._upper[i], upper[i])
+
+            last = self._last[i]
+            if last is not None and value != last:
+                direction = 1 if value > last else -1
+                if self._direction[i] and direction != self._direction[i]:
+                    self._bounces[i] += 1
+                self._direction[i] = direction
+            self._last[i] = value
+
+    def _hold_time(self, now: float) -> float:
+        """Return how long the frame added last has been on the lights at `now`."""
+        return 0.0 if self._since is None else max(0.0, now - self._since)
+
+    def summary(self, channel: str, now: float) -> dict[str, int | float | None] | None:
+        """Return the aggregates of a channel in the window ending at `now`, or None if no frame was added."""
+        if not self._count or channel not in self.channels:
+            return None
+        i = self.channels.index(channel)
+        held = self._hold_time(now)
+        duration = self._duration + held
+        # Without any time passed, all frames were sent at the end of the window and count the same
+        mean = (self._weighted[i] + self._last[i] * held) / duration if duration > 0 else self._sum[i] / self._count
+        return {
+            "min": self._min[i],
+            "max": self._max[i],
+            "mean": round(mean, 1),
+            "bounces": self._bounces[i],
+            "lower_bound": self._lower[i],
+            "upper_bound": self._upper[i],
+            "frames": self._count,
+        }
+
+    def reset(self) -> None:
+        """Start a new window."""
+        size = len(self.channels)
+        self._count: int = 0
+        self._since: float | None = None
+        self._duration: float = 0.0
+        self._min: list[int | None] = [None] * size
+        self._max: list[int | None] = [None] * size
+        self._sum: list[int] = [0] * size
+        self._weighted: list[float] = [0.0] * size
+        self._bounces: list[int] = [0] * size
+        self._lower: list[int | None] = [None] * size
+        self._upper: list[int | None] = [None] * size
@@ -0,0 +1,78 @@
+"""Lookahead frame buffer of Moving Colors, which holds frames computed ahead of their tick."""
+
+from typing import Any
+
+
+class Frame:
+    """One precomputed frame: the channel values and active boundaries, the engine state after it and the configuration it was computed with."""
+
+    __slots__ = ("key", "lower", "state", "upper", "values")
+
+    def __init__(self, channel_count: int) -> None:
+        """Initialize an empty frame."""
+        self.values: list[int] = [0] * channel_count
+        self.lower: list[int | None] = [None] * channel_count
+        self.upper: list[int | None] = [None] * channel_count
+        self.state: Any = None
+        self.key: Any = None
+
+
+class FrameBuffer:
+    """
+    Ring buffer of the next frames of one Moving Colors instance.
+
+    All slots are allocated once and reused, push() hands out the next free slot to be
+    filled and pop() returns the oldest frame. The returned slots are only valid until
+    the next push(), so the values of a popped frame must be copied if they are kept.
+    """
+
+    __slots__ = ("_count", "_head", "_slots")
+
+    def __init__(self, capacity: int, channel_count: int) -> None:
+        """Allocate the slots of the buffer."""
+        self._slots: list[Frame] = [Frame(channel_count) for _ in range(capacity)]
+        self._head: int = 0
+        self._count: int = 0
+
+    @property
+    def capacity(self) -> int:
+        """Return the maximum number of buffered frames."""
+        return len(self._slots)
+
+    def __len__(self) -> int:
+        """Return the number of buffered frames."""
+        return self._count
+
+    def is_full(self) -> bool:
+        """Return True if no more frames can be pushed."""
+        return self._count >= len(self._slots)
+
+    def push(self) -> Frame:
+        """Append a frame and return its slot to be filled by the caller."""
+        if self.is_full():
+            message = "Frame buffer is full"
+            raise IndexError(message)
+        frame = self._slots[(self._head + self._count) % len(self._slots)]
+        self._count += 1
+        return frame
+
+    def pop(self) -> Frame:
+        """Remove and return the oldest frame."""
+        if not self._count:
+            message = "Frame buffer is empty"
+            raise IndexError(message)
+        frame = self._slots[self._head]
+        self._head = (self._head + 1) % len(self._slots)
+        self._count -= 1
+        return frame
+
+    def peek(self, offset: int = 0) -> Frame | None:
+        """Return the frame `offset` positions after the oldest one without removing it, or None."""
+        if not 0 <= offset < self._count:
+            return None
+        return self._slots[(self._head + offset) % len(self._slots)]
+
+    def clear(self) -> None:
+        """Drop all buffered frames."""
+        self._head = 0
+        self._count = 0
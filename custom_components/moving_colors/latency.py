@@ -0,0 +1,79 @@
+"""Response latency of the target lights, which adapts the frame rate of Moving Colors to the lights."""
+
+import math
+from collections.abc import Iterable
+
+# Weight of a new measurement in the moving average of a target
+LATENCY_SMOOTHING = 0.2
+
+# Measurements without a state change within this time are discarded (seconds)
+MAX_LATENCY = 10.0
+
+# Highest factor the trigger interval is stretched by
+MAX_INTERVAL_FACTOR = 10
+
+# The interval must exceed the latency by this factor, so the lights can keep up
+LATENCY_HEADROOM = 1.2
+
+
+class ResponseLatencyTracker:
+    """
+    Round trip time from a light.turn_on call to the state change of each target.
+
+    The time and context of each call are recorded per target and the state change
+    of the target caused by this call completes the measurement. The latencies are
+    smoothed per target, the slowest target determines the interval factor.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker without measurements."""
+        self._sent_at: dict[str, tuple[str, float]] = {}
+        self._latencies: dict[str, float] = {}
+        self._interval_factor: int = 1
+
+    def record_command(self, entity_ids: Iterable[str], context_id: str, now: float) -> None:
+        """Record the context and time of a call to the given targets."""
+        for entity_id in entity_ids:
+            self._sent_at[entity_id] = (context_id, now)
+
+    def record_state_change(self, entity_id: str, context_id: str, now: float) -> float | None:
+        """Complete the measurement of a target on the state change caused by its last call, return the latency or None."""
+        sent = self._sent_at.get(entity_id)
+        if sent is None or sent[0] != context_id:
+            return None
+        del self._sent_at[entity_id]
+        latency = now - sent[1]
+        if not 0 <= latency <= MAX_LATENCY:
+            return None
+        previous = self._latencies.get(entity_id)
+        self._latencies[entity_id] = latency if previous is None else previous + LATENCY_SMOOTHING * (latency - previous)
+        return latency
+
+    def get_latency(self) -> float | None:
+        """Return the smoothed latency of the slowest target in seconds, or None without measurements."""
+        return max(self._latencies.values(), default=None)
+
+    def get_interval_factor(self, interval: float) -> int:
+        """
+        Return by which factor the trigger interval has to be stretched, so the slowest target keeps up.
+
+        The factor rises as soon as the latency requires it, but only falls by one after
+        the latency also fits into the next shorter interval with some margin. This avoids
+        switching back and forth on a latency close to the interval.
+        """
+        latency = self.get_latency()
+        if latency is None or interval <= 0:
+            return self._interval_factor
+
+        required = min(MAX_INTERVAL_FACTOR, max(1, math.ceil(latency * LATENCY_HEADROOM / interval)))
+        if required > self._interval_factor:
+            self._interval_factor = required
+        elif required < self._interval_factor and latency * LATENCY_HEADROOM < (self._interval_factor - 1) * interval * 0.8:
+            self._interval_factor -= 1
+        return self._interval_factor
+
+    def reset(self) -> None:
+        """Drop all measurements, e.g. after the targets were changed."""
+        self._sent_at.clear()
+        self._latencies.clear()
+        self._interval_factor = 1
@@ -0,0 +1,81 @@
+"""Light group index of Moving Colors, which addresses target lights by the group entities covering them."""
+
+import logging
+from collections.abc import Sequence
+
+from homeassistant.const import ATTR_ENTITY_ID, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant, callback
+
+_LIGHT_DOMAIN = "light"
+
+
+class LightGroupIndex:
+    """
+    Light group entities, whose members are all targets of one Moving Colors instance.
+
+    Group entities list their members in the entity_id state attribute, like the light
+    groups of HA and the groups of Zigbee integrations which expose them. One service
+    call to such a group replaces one call per member, which lets the Zigbee network
+    send a single groupcast instead of one unicast per light.
+
+    The groups are collected from the light states on first access and cached until
+    invalidate() is called.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_ids: Sequence[str], logger: logging.Logger) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self.logger = logger
+        self._entity_ids: set[str] = {entity_id for entity_id in entity_ids or [] if entity_id}
+        self._groups: list[tuple[str, frozenset[str]]] | None = None
+
+    @callback
+    def invalidate(self) -> None:
+        """Drop the cached groups, they are collected again on next access."""
+        self._groups = None
+
+    def get_groups(self) -> list[tuple[str, frozenset[str]]]:
+        """Return the (group entity_id, members) of all groups covering only targets, largest group first."""
+        if self._groups is not None:
+            return self._groups
+
+        groups: list[tuple[str, frozenset[str]]] = []
+        if len(self._entity_ids) > 1:
+            for state in self.hass.states.async_all(_LIGHT_DOMAIN):
+                members = state.attributes.get(ATTR_ENTITY_ID)
+                if not isinstance(members, list | tuple) or len(members) < 2:
+                    continue
+                members = frozenset(members)
+                if state.entity_id not in members and members <= self._entity_ids:
+                    groups.append((state.entity_id, members))
+        groups.sort(key=lambda group: (-len(group[1]), group[0]))
+
+        if groups:
+            self.logger.debug("Light groups covering targets: %s", {group_id: sorted(members) for group_id, members in groups})
+        self._groups = groups
+        return groups
+
+    def resolve(self, entity_ids: Sequence[str]) -> list[str]:
+        """
+        Return the entities to address for the given targets.
+
+        Available groups, whose members are all part of the given targets, replace their
+        members. The remaining targets are addressed directly.
+        """
+        groups = self.get_groups()
+        if not groups or len(entity_ids) < 2:
+            return list(entity_ids)
+
+        remaining = set(entity_ids)
+        addresses: list[str] = []
+        for group_id, members in groups:
+            if not members <= remaining:
+                continue
+            state = self.hass.states.get(group_id)
+            if state is None or state.state == STATE_UNAVAILABLE:
+                continue
+            addresses.append(group_id)
+            remaining -= members
+        if not addresses:
+            return list(entity_ids)
+        return addresses + [entity_id for entity_id in entity_ids if entity_id in remaining]
@@ -1,6 +1,7 @@
 """Moving Colors number implementation."""
 
 import logging
+from decimal import Decimal
 from typing import TYPE_CHECKING
 
 import homeassistant.helpers.entity_registry as er
@@ -14,7 +15,7 @@ from homeassistant.helpers.restore_state import RestoreEntity
 if TYPE_CHECKING:
     from . import MovingColorsManager
 
-from .const import DOMAIN, DOMAIN_DATA_MANAGERS, INTERNAL_TO_DEFAULTS_MAP, NUMBER_INTERNAL_TO_EXTERNAL_MAP, MCInternal
+from .const import DOMAIN, DOMAIN_DATA_MANAGERS, INTERNAL_TO_DEFAULTS_MAP, MIN_TRIGGER_INTERVAL, NUMBER_INTERNAL_TO_EXTERNAL_MAP, MCInternal
 
 
 async def async_setup_entry(
@@ -99,9 +100,9 @@ async def async_setup_entry(
             description=NumberEntityDescription(
                 key=MCInternal.TRIGGER_INTERVAL_MANUAL.value,
                 name="Trigger interval",  # default (English) fallback if no translation found
-                native_min_value=0.0,
+                native_min_value=MIN_TRIGGER_INTERVAL,
                 native_max_value=300.0,
-                native_step=1.0,
+                native_step=0.1,
                 native_unit_of_measurement="s",
             ),
         ),
@@ -244,8 +245,12 @@ class MovingColorsNumber(NumberEntity, RestoreEntity):
             return None
 
         # Crucial Step:
-        # Round and cast to integer to remove decimals from the HA UI
-        return str(round(value))
+        # Round to the precision of the step to remove needless decimals from the HA UI,
+        # e.g. integers for color values but tenths of a second for the trigger interval
+        decimals = max(0, -Decimal(str(self.entity_description.native_step or 1)).normalize().as_tuple().exponent)
+        if decimals == 0:
+            return str(round(value))
+        return str(round(value, decimals))
 
     async def async_set_native_value(self, value: float) -> None:
         """Set new value."""
@@ -256,12 +261,10 @@ class MovingColorsNumber(NumberEntity, RestoreEntity):
         """Register callbacks with entity registration at HA."""
         await super().async_added_to_hass()
 
-        # Ensure the mapping dictionary exists
-        if "unique_id_map" not in self.hass.data.setdefault(DOMAIN, {}):
-            self.hass.data[DOMAIN]["unique_id_map"] = {}
-
-        # Store the mapping
-        self.hass.data[DOMAIN]["unique_id_map"][self.unique_id] = self.entity_id
+        # Make the entity known to the internal entity index of the manager
+        manager: MovingColorsManager | None = self.hass.data.get(DOMAIN_DATA_MANAGERS, {}).get(self._config_entry.entry_id)
+        if manager:
+            manager.async_register_internal_entity(MCInternal(self.entity_description.key), self.entity_id)
 
         # Restore last state after Home Assistant restart.
         last_state = await self.async_get_last_state()
@@ -0,0 +1,319 @@
+"""Tick scheduler of Moving Colors, which triggers the frames of all instances on drift-free timelines."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Callable, Coroutine
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_at
+
+from .const import DOMAIN_DATA_SCHEDULER, MIN_TRIGGER_INTERVAL, MissedTickPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper limit of frames, which are replayed after a delay with MissedTickPolicy.CATCH_UP
+MAX_CATCH_UP_TICKS = 10
+
+# Jobs which are due within this many seconds after a wakeup are stepped within this wakeup,
+# so instances started at slightly different times share their wakeups
+TICK_RESOLUTION = 0.02
+
+# Step callback of a job: advances the animation synchronously by the given number of steps
+# and returns the coroutine, which sends the resulting frame, or None if there is nothing to send.
+StepCallback = Callable[[int], Coroutine[Any, Any, None] | None]
+
+# Prefetch callbacks of a job: the first one advances the animation by one frame ahead of the
+# frames sent and returns False if no more frames are needed, the second one stores this frame.
+RequestFrameCallback = Callable[[], bool]
+StoreFrameCallback = Callable[[], None]
+
+
+class MovingColorsTickJob:
+    """
+    Timeline of one Moving Colors instance.
+
+    All ticks are anchored to the monotonic loop time at start, so the time a frame needs
+    or a delayed wakeup does not shift later ticks. Ticks which were missed, because the
+    loop was busy or the previous frame was still being sent, are handled according to the
+    configured MissedTickPolicy. The interval is re-evaluated after every tick.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        step: StepCallback,
+        interval: Callable[[], float],
+        policy: MissedTickPolicy = MissedTickPolicy.SKIP,
+        request_frame: RequestFrameCallback | None = None,
+        store_frame: StoreFrameCallback | None = None,
+    ) -> None:
+        """Initialize the job."""
+        self.logger = logger
+        self._step = step
+        self._interval = interval
+        self._policy = policy
+        self._request_frame = request_frame
+        self._store_frame = store_frame
+
+        self._scheduler: MovingColorsTickScheduler | None = None
+        self.next_due: float = 0.0
+        self._running: bool = False
+        self._pending_steps: int = 0
+
+        # Statistics
+        self._last_lateness: float = 0.0
+        self._missed_ticks: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Return True if the job is added to a scheduler."""
+        return self._scheduler is not None
+
+    def get_last_lateness(self) -> float:
+        """Return how many seconds the last tick fired after its due time."""
+        return self._last_lateness
+
+    def get_missed_ticks(self) -> int:
+        """Return the number of ticks, which could not be executed in time."""
+        return self._missed_ticks
+
+    def set_policy(self, policy: MissedTickPolicy) -> None:
+        """Change the handling of missed ticks, steps already pending are kept."""
+        self._policy = policy
+
+    def get_interval(self) -> float:
+        """Return the current tick interval in seconds."""
+        return max(MIN_TRIGGER_INTERVAL, float(self._interval()))
+
+    @callback
+    def async_tick(self, now: float) -> Coroutine[Any, Any, None] | None:
+        """
+        Advance the timeline to the next due time after `now` and step the animation.
+
+        Returns the coroutine, which sends the frame(s) of this tick.
+        """
+        interval = self.get_interval()
+        due = self.next_due
+
+        # Number of ticks which are due by now, the next tick stays on the timeline
+        lateness = max(0.0, now - due)
+        due_ticks = 1 + int(lateness // interval)
+        self.next_due = due + due_ticks * interval
+        self._last_lateness = lateness
+
+        if lateness >= interval:
+            self.logger.debug("Tick is %.3fs late, %s tick(s) missed (policy: %s).", lateness, due_ticks - 1, self._policy.value)
+
+        if self._running:
+            # The previous frame is still being sent, so none of the due ticks can run now
+            self._missed_ticks += due_ticks
+            if self._policy is not MissedTickPolicy.SKIP:
+                self._pending_steps += due_ticks
+            return None
+
+        self._missed_ticks += due_ticks - 1
+        steps = due_ticks + self._pending_steps
+        self._pending_steps = 0
+
+        if self._policy is MissedTickPolicy.COALESCE:
+            # One frame, which advances by all due steps at once
+            dispatch = self._step(steps)
+            catch_up = 0
+        elif self._policy is MissedTickPolicy.CATCH_UP:
+            # One frame per due step, limited to avoid a burst of light commands
+            dispatch = self._step(1)
+            catch_up = min(steps, MAX_CATCH_UP_TICKS) - 1
+        else:
+            # Only the current frame, missed ones are dropped
+            dispatch = self._step(1)
+            catch_up = 0
+
+        if dispatch is None and catch_up == 0:
+            return None
+
+        self._running = True
+        return self._async_send(dispatch, catch_up)
+
+    async def _async_send(self, dispatch: Coroutine[Any, Any, None] | None, catch_up: int) -> None:
+        try:
+            if dispatch is not None:
+                await dispatch
+            for _ in range(catch_up):
+                if not self.is_running:
+                    break
+                dispatch = self._step(1)
+                if dispatch is not None:
+                    await dispatch
+        finally:
+            self._running = False
+
+    @callback
+    def async_request_frame(self) -> bool:
+        """Advance the animation by one frame ahead, return False if no frame is computed ahead."""
+        return self.is_running and self._request_frame is not None and self._request_frame()
+
+    @callback
+    def async_store_frame(self) -> None:
+        """Store the frame computed by the last async_request_frame()."""
+        if self._store_frame is not None:
+            self._store_frame()
+
+    @callback
+    def async_reset(self, scheduler: "MovingColorsTickScheduler | None", now: float = 0.0) -> None:
+        """Attach the job to a scheduler with the first tick one interval after `now`, or detach it."""
+        self._scheduler = scheduler
+        self._pending_steps = 0
+        if scheduler is not None:
+            self.next_due = now + self.get_interval()
+
+
+class MovingColorsTickScheduler:
+    """
+    Drive the timelines of all Moving Colors instances with one timer.
+
+    The jobs are kept in a heap ordered by their next due time and only the earliest one
+    arms the loop timer. All jobs due at a wakeup, or within TICK_RESOLUTION after it, are
+    stepped within this wakeup and their frames are sent concurrently. Each instance keeps
+    its own dispatcher, so suppression of unchanged frames and rate limits stay per instance.
+
+    After the frames are sent, the lookahead frames of these jobs are refilled in rounds of
+    one frame each: all jobs request their step first and store the frame afterwards, so the
+    batch engine executes the steps of all instances of a round in one operation.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap: list[tuple[float, int, MovingColorsTickJob]] = []
+        self._counter = itertools.count()
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._timer_due: float | None = None
+
+    @callback
+    def async_add_job(self, job: MovingColorsTickJob) -> None:
+        """Start the timeline of a job, its first tick is due one interval from now."""
+        if job.is_running:
+            return
+        job.async_reset(self, self.hass.loop.time())
+        self._push(job)
+        self._arm()
+
+    @callback
+    def async_remove_job(self, job: MovingColorsTickJob) -> None:
+        """Stop the timeline of a job, a frame which is currently sent is not interrupted."""
+        if not job.is_running:
+            return
+        job.async_reset(None)
+        # Entries of removed jobs are dropped lazily, only disarm the timer if nothing is left
+        if not self.job_count:
+            self._heap.clear()
+            self._disarm()
+
+    @property
+    def job_count(self) -> int:
+        """Return the number of scheduled jobs."""
+        return len({id(job) for _, _, job in self._heap if job.is_running})
+
+    def _push(self, job: MovingColorsTickJob) -> None:
+        heapq.heappush(self._heap, (job.next_due, next(self._counter), job))
+
+    @callback
+    def _arm(self) -> None:
+        """Arm the timer for the earliest job, if it isn't armed for that time already."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._disarm()
+            return
+        due = self._heap[0][0]
+        if self._timer_due == due:
+            return
+        self._disarm()
+        self._timer_due = due
+        self._unsub_timer = async_call_at(self.hass, self._handle_timer, due)
+
+    @callback
+    def _disarm(self) -> None:
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._unsub_timer = None
+        self._timer_due = None
+
+    @staticmethod
+    def _is_current(entry: tuple[float, int, MovingColorsTickJob]) -> bool:
+        """Return False for entries of removed or rescheduled jobs."""
+        due, _, job = entry
+        return job.is_running and job.next_due == due
+
+    @callback
+    def _handle_timer(self, _now: datetime) -> None:
+        """Step all jobs due within the tick resolution and send their frames concurrently."""
+        self._unsub_timer = None
+        self._timer_due = None
+        now = self.hass.loop.time()
+
+        sends: list[Coroutine[Any, Any, None]] = []
+        stepped: list[MovingColorsTickJob] = []
+        # Jobs due a little later are stepped early, their timelines stay anchored to their due times
+        while self._heap and self._heap[0][0] <= now + TICK_RESOLUTION:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            job = entry[2]
+            try:
+                send = job.async_tick(now)
+            except Exception:
+                _LOGGER.exception("Error while stepping Moving Colors instance")
+                send = None
+            # The step might have stopped the job
+            if job.is_running:
+                self._push(job)
+                stepped.append(job)
+            if send is not None:
+                sends.append(send)
+
+        self._arm()
+
+        if sends or stepped:
+            self.hass.async_create_task(self._async_dispatch_pass(sends, stepped), "moving_colors dispatch pass")
+
+    async def _async_dispatch_pass(self, sends: list[Coroutine[Any, Any, None]], stepped: list[MovingColorsTickJob]) -> None:
+        """Send the frames of all instances stepped in one wakeup concurrently, then compute their next frames."""
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.error("Error while sending Moving Colors frame: %s", result)
+        self._prefetch_frames(stepped)
+
+    @callback
+    def _prefetch_frames(self, jobs: list[MovingColorsTickJob]) -> None:
+        """Refill the lookahead frames of the given jobs, one frame of all jobs per round."""
+        while jobs:
+            requested: list[MovingColorsTickJob] = []
+            for job in jobs:
+                try:
+                    if job.async_request_frame():
+                        requested.append(job)
+                except Exception:
+                    _LOGGER.exception("Error while computing Moving Colors frame ahead")
+            # The first stored frame executes the steps of all requested jobs at once
+            jobs = []
+            for job in requested:
+                try:
+                    job.async_store_frame()
+                except Exception:
+                    _LOGGER.exception("Error while computing Moving Colors frame ahead")
+                    continue
+                jobs.append(job)
+
+
+@callback
+def async_get_tick_scheduler(hass: HomeAssistant) -> MovingColorsTickScheduler:
+    """Return the scheduler shared by all Moving Colors instances."""
+    if DOMAIN_DATA_SCHEDULER not in hass.data:
+        hass.data[DOMAIN_DATA_SCHEDULER] = MovingColorsTickScheduler(hass)
+    return hass.data[DOMAIN_DATA_SCHEDULER]
@@ -3,8 +3,8 @@
 import homeassistant.helpers.entity_registry as er
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.const import EntityCategory, Platform
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -12,6 +12,11 @@ from homeassistant.helpers.event import async_track_state_change_event
 
 from . import MovingColorsManager
 from .const import DOMAIN, DOMAIN_DATA_MANAGERS, EXTERNAL_SENSOR_DEFINITIONS, SensorEntries
+from .dispatcher import is_command_echo
+
+# Diagnostic counters, the per target counters carry the value of each light as attributes
+_PER_TARGET_SENSORS = (SensorEntries.DROPPED_FRAMES, SensorEntries.COALESCED_FRAMES, SensorEntries.MISSED_DEADLINES)
+_COUNTER_SENSORS = (SensorEntries.SUPPRESSED_FRAMES, SensorEntries.MISSED_TICKS, *_PER_TARGET_SENSORS)
 
 
 async def async_setup_entry(
@@ -44,16 +49,34 @@ async def async_setup_entry(
             MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.CURRENT_GREEN),
             MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.CURRENT_BLUE),
         ]
+        statistics_sensors = [
+            MovingColorsStatisticsSensor(manager, config_entry.entry_id, SensorEntries.RED_STATISTICS, "r"),
+            MovingColorsStatisticsSensor(manager, config_entry.entry_id, SensorEntries.GREEN_STATISTICS, "g"),
+            MovingColorsStatisticsSensor(manager, config_entry.entry_id, SensorEntries.BLUE_STATISTICS, "b"),
+        ]
     else:
         # Brightness: single value sensor
         value_sensors = [
             MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.CURRENT_VALUE),
         ]
+        statistics_sensors = [
+            MovingColorsStatisticsSensor(manager, config_entry.entry_id, SensorEntries.VALUE_STATISTICS, "brightness"),
+        ]
+
+    if manager.has_statistics():
+        # Aggregates per window, which spare the recorder from the per-frame values
+        value_sensors.extend(statistics_sensors)
 
     entities_to_add = [
         *value_sensors,
         MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.CURRENT_MIN_VALUE),
         MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.CURRENT_MAX_VALUE),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.SUPPRESSED_FRAMES),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.DROPPED_FRAMES),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.COALESCED_FRAMES),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.MISSED_DEADLINES),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.TICK_LATENESS),
+        MovingColorsSensor(manager, config_entry.entry_id, SensorEntries.MISSED_TICKS),
     ]
 
     instance_name = manager.sanitized_name
@@ -139,6 +162,17 @@ class MovingColorsSensor(SensorEntity):
         self._attr_state_class = "measurement"
         self._attr_native_unit_of_measurement = None
 
+        # Updated by the manager, which throttles the state writes
+        self._attr_should_poll = False
+
+        # Counters are diagnostic values and only grow
+        if self._sensor_entry_type in _COUNTER_SENSORS:
+            self._attr_state_class = "total_increasing"
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        elif self._sensor_entry_type == SensorEntries.TICK_LATENESS:
+            self._attr_native_unit_of_measurement = "ms"
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
         # Connect with the device (important for UI)
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._entry_id)},
@@ -150,13 +184,11 @@ class MovingColorsSensor(SensorEntity):
     async def async_added_to_hass(self) -> None:
         """Run when this entity has been added to Home Assistant."""
         # Register a Dispatcher listener here to receive updates.
-        # The manager must then send this signal when its data is updated.
-        # The signal name must exactly match what the manager sends.
-        # Use the manager's name (which is unique for each config entry) to create a unique signal.
+        # The manager sends this signal at most once per sensor update interval.
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
-                f"{DOMAIN}_update_{self._manager.name.lower().replace(' ', '_')}",  # Unique signal for this manager
+                self._manager.signal_update,  # Unique signal for this manager
                 self.async_write_ha_state,  # Calls this sensor's method to update its state in HA
             )
         )
@@ -177,6 +209,14 @@ class MovingColorsSensor(SensorEntity):
             value = self._manager.get_current_lower_boundary()
         elif self._sensor_entry_type == SensorEntries.CURRENT_MAX_VALUE:
             value = self._manager.get_current_upper_boundary()
+        elif self._sensor_entry_type == SensorEntries.SUPPRESSED_FRAMES:
+            value = self._manager.get_suppressed_frames()
+        elif self._sensor_entry_type in _PER_TARGET_SENSORS:
+            value = sum(self._get_per_target_values().values())
+        elif self._sensor_entry_type == SensorEntries.TICK_LATENESS:
+            value = self._manager.get_tick_lateness()
+        elif self._sensor_entry_type == SensorEntries.MISSED_TICKS:
+            value = self._manager.get_missed_ticks()
 
         if value is None:
             return None
@@ -190,6 +230,48 @@ class MovingColorsSensor(SensorEntity):
         # Return all other types (strings, etc.) as is
         return value
 
+    @property
+    def extra_state_attributes(self) -> dict[str, int] | None:
+        """Return the counter of each target light."""
+        if self._sensor_entry_type in _PER_TARGET_SENSORS:
+            return self._get_per_target_values()
+        return None
+
+    def _get_per_target_values(self) -> dict[str, int]:
+        if self._sensor_entry_type == SensorEntries.DROPPED_FRAMES:
+            return self._manager.get_dropped_frames()
+        if self._sensor_entry_type == SensorEntries.MISSED_DEADLINES:
+            return self._manager.get_missed_deadlines()
+        return self._manager.get_coalesced_frames()
+
+
+class MovingColorsStatisticsSensor(MovingColorsSensor):
+    """Mean value of one channel within the statistics window, with min, max and bounces as attributes."""
+
+    def __init__(self, manager: MovingColorsManager, entry_id: str, sensor_entry_type: SensorEntries, channel: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(manager, entry_id, sensor_entry_type)
+        self._channel = channel
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this entity has been added to Home Assistant."""
+        # Written once per statistics window
+        self.async_on_remove(async_dispatcher_connect(self.hass, self._manager.signal_statistics, self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the mean value of the channel."""
+        statistics = self._manager.get_channel_statistics(self._channel)
+        return statistics["mean"] if statistics else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, int | None] | None:
+        """Return min, max, bounces and active boundaries of the channel."""
+        statistics = self._manager.get_channel_statistics(self._channel)
+        if not statistics:
+            return None
+        return {key: value for key, value in statistics.items() if key != "mean"}
+
 
 class MovingColorsExternalEntityValueSensor(SensorEntity):
     """Sensor that mirrors the state of a configured external entity."""
@@ -206,7 +288,9 @@ class MovingColorsExternalEntityValueSensor(SensorEntity):
         """Initialize the sensor."""
         self.hass = hass
         self._manager = manager
+        self._config_key = definition["config_key"]
         self._external_entity_id = external_entity_id
+        self._unsub_state_tracker: CALLBACK_TYPE | None = None
         self._attr_translation_key = definition["translation_key"]
         self._attr_has_entity_name = True
 
@@ -249,24 +333,51 @@ class MovingColorsExternalEntityValueSensor(SensorEntity):
     async def async_added_to_hass(self) -> None:
         """Register callbacks and start state tracking."""
         await super().async_added_to_hass()
+        self._track_external_entity()
+
+        # The external entity can be swapped by an options change without a reload
+        self.async_on_remove(async_dispatcher_connect(self.hass, self._manager.signal_external_entity, self._handle_external_entity_swap))
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop tracking the external entity."""
+        if self._unsub_state_tracker:
+            self._unsub_state_tracker()
+            self._unsub_state_tracker = None
+
+    @callback
+    def _track_external_entity(self) -> None:
+        """Take over the state of the external entity and track its state changes."""
+        if self._unsub_state_tracker:
+            self._unsub_state_tracker()
 
         # Get initial state
+        self._current_value = None
         state = self.hass.states.get(self._external_entity_id)
         if state:
             self._update_from_state(state)
 
         # Start tracking state changes of the external entity
-        self.async_on_remove(
-            async_track_state_change_event(
-                self.hass,
-                [self._external_entity_id],
-                self._handle_state_change,
-            )
+        self._unsub_state_tracker = async_track_state_change_event(
+            self.hass,
+            [self._external_entity_id],
+            self._handle_state_change,
         )
 
+    @callback
+    def _handle_external_entity_swap(self, config_key: str, external_entity_id: str) -> None:
+        """Mirror another external entity after the options of the instance were changed."""
+        if config_key != self._config_key or external_entity_id == self._external_entity_id:
+            return
+        self._external_entity_id = external_entity_id
+        self._track_external_entity()
+        self.async_write_ha_state()
+
     @callback
     def _handle_state_change(self, event: Event) -> None:
         """Handle state changes of the tracked entity."""
+        if is_command_echo(event):
+            # Frames of Moving Colors, the configured values didn't change
+            return
         new_state = event.data.get("new_state")
         if new_state is not None:
             self._update_from_state(new_state)
@@ -280,25 +280,23 @@ class MovingColorsSwitch(SwitchEntity, RestoreEntity):
         self._state = True
         self.async_write_ha_state()
         # Notify integration
-        await self.hass.async_create_task(self._notify_integration())
+        self._notify_integration()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Switch the switch off."""
         self._state = False
         self.async_write_ha_state()
         # Notify integration
-        await self.hass.async_create_task(self._notify_integration())
+        self._notify_integration()
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks with entity registration at HA."""
         await super().async_added_to_hass()
 
-        # Ensure the mapping dictionary exists
-        if "unique_id_map" not in self.hass.data.setdefault(DOMAIN, {}):
-            self.hass.data[DOMAIN]["unique_id_map"] = {}
-
-        # Store the mapping
-        self.hass.data[DOMAIN]["unique_id_map"][self.unique_id] = self.entity_id
+        # Make the entity known to the internal entity index of the manager
+        manager: MovingColorsManager | None = self.hass.data.get(DOMAIN_DATA_MANAGERS, {}).get(self._config_entry.entry_id)
+        if manager:
+            manager.async_register_internal_entity(MCInternal(self.entity_description.key), self.entity_id)
 
         # Restore last state after Home Assistant restart.
         last_state = await self.async_get_last_state()
@@ -314,5 +312,6 @@ class MovingColorsSwitch(SwitchEntity, RestoreEntity):
 
         self.async_write_ha_state()
 
-    async def _notify_integration(self) -> None:
-        await self.hass.data[DOMAIN_DATA_MANAGERS][self._config_entry.entry_id].async_refresh()
+    @callback
+    def _notify_integration(self) -> None:
+        self.hass.data[DOMAIN_DATA_MANAGERS][self._config_entry.entry_id].async_request_refresh()
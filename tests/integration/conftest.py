@@ -81,7 +81,7 @@ def setup_logging():
 
 
 # ============================================================================
-# Echte Timer: mock_async_track_time_interval NICHT aktiv
+# Echte Timer: mock_async_call_at NICHT aktiv
 # ============================================================================
 
 
@@ -166,7 +166,7 @@ async def setup_integration(hass: HomeAssistant, mock_config_entry: MockConfigEn
 def time_travel(hass: HomeAssistant, freezer):
     """Fixture zum Zeitsprung für Timer-Tests.
 
-    Funktioniert mit async_track_time_interval und async_call_later Timern.
+    Funktioniert mit async_call_at, async_track_time_interval und async_call_later Timern.
     """
 
     async def _travel(*, seconds: int = 0, minutes: int = 0, hours: int = 0):
@@ -2,10 +2,13 @@
 
 import logging
 
+from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
+from homeassistant.components.number import SERVICE_SET_VALUE
 from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import ATTR_ENTITY_ID, EVENT_HOMEASSISTANT_STARTED, SERVICE_TURN_OFF, SERVICE_TURN_ON
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.moving_colors import async_setup
@@ -13,8 +16,12 @@ from custom_components.moving_colors.const import (
     DEBUG_ENABLED,
     DOMAIN,
     DOMAIN_DATA_MANAGERS,
+    KEYFRAME_MODE,
+    MAX_COMMANDS_PER_SECOND,
     MC_CONF_NAME,
+    RANDOM_SEED,
     TARGET_LIGHT_ENTITY_ID,
+    MCInternal,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,6 +46,22 @@ async def test_setup_entry_success(hass: HomeAssistant, mock_config_entry, mock_
     assert mock_config_entry.entry_id in hass.data[DOMAIN_DATA_MANAGERS]
 
 
+async def test_setup_entry_persists_random_seed(hass: HomeAssistant, mock_config_entry, mock_light) -> None:
+    """Test that a generated random seed is stored and kept across reloads."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    seed = mock_config_entry.data[RANDOM_SEED]
+    assert isinstance(seed, int)
+    assert hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]._random_limits.seed == seed
+
+    assert await hass.config_entries.async_reload(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert mock_config_entry.data[RANDOM_SEED] == seed
+    assert hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]._random_limits.seed == seed
+
+
 async def test_setup_entry_missing_name(hass: HomeAssistant, mock_light) -> None:
     """Test setup fails gracefully when instance name is missing."""
     entry = MockConfigEntry(
@@ -136,6 +159,44 @@ async def test_reload_entry(hass: HomeAssistant, setup_integration, mock_config_
     assert mock_config_entry.state == ConfigEntryState.LOADED
 
 
+async def test_options_update_applied_in_place(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that changing the debug log and the rate limit keeps the running instance."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+
+    hass.config_entries.async_update_entry(mock_config_entry, options={**mock_config_entry.options, DEBUG_ENABLED: True, MAX_COMMANDS_PER_SECOND: 2})
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id] is manager
+    assert manager.is_debug_enabled()
+    assert manager._dispatcher._rate_limit == 2
+
+
+async def test_options_update_of_keyframe_mode_resets_interval_factor(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that switching to keyframe mode in place drops an interval stretched for a slow light."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+    manager._interval_factor = 3
+
+    hass.config_entries.async_update_entry(mock_config_entry, options={**mock_config_entry.options, KEYFRAME_MODE: True})
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id] is manager
+    assert manager.get_effective_trigger_interval() == manager.get_config_trigger_interval()
+
+
+async def test_options_update_of_targets_reloads(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that changing the target lights re-creates the manager."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+    hass.states.async_set("light.second_light", "on", {"brightness": 100, "supported_color_modes": ["brightness"]})
+
+    hass.config_entries.async_update_entry(
+        mock_config_entry, options={**mock_config_entry.options, TARGET_LIGHT_ENTITY_ID: ["light.test_light", "light.second_light"]}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id] is not manager
+    assert mock_config_entry.state == ConfigEntryState.LOADED
+
+
 # ============================================================================
 # Manager: async_start_update_task + async_update_state (Kernlogik)
 # ============================================================================
@@ -144,12 +205,12 @@ async def test_reload_entry(hass: HomeAssistant, setup_integration, mock_config_
 async def test_update_task_starts_when_enabled(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
     """Test that enabling the switch starts the update task."""
     manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
-    assert manager._update_listener is None  # Not running initially (disabled)
+    assert not manager._tick_job.is_running  # Not running initially (disabled)
 
     await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
     await hass.async_block_till_done()
 
-    assert manager._update_listener is not None
+    assert manager._tick_job.is_running
 
 
 async def test_update_task_stops_when_disabled(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
@@ -158,18 +219,18 @@ async def test_update_task_stops_when_disabled(hass: HomeAssistant, setup_integr
 
     await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
     await hass.async_block_till_done()
-    assert manager._update_listener is not None
+    assert manager._tick_job.is_running
 
     await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_OFF, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
     await hass.async_block_till_done()
 
-    assert manager._update_listener is None
+    assert not manager._tick_job.is_running
 
 
 async def test_update_state_advances_brightness(hass: HomeAssistant, setup_integration, mock_config_entry, time_travel) -> None:
     """Test that async_update_state advances brightness values over time."""
     manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
-    initial_values = dict(manager._current_values)
+    initial_values = manager.engine.as_dict()
 
     await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
     await hass.async_block_till_done()
@@ -177,7 +238,7 @@ async def test_update_state_advances_brightness(hass: HomeAssistant, setup_integ
     await time_travel(seconds=manager.get_config_trigger_interval() + 1)
 
     # Values should have changed or task is running
-    assert manager._current_values != initial_values or manager._update_listener is not None
+    assert manager.engine.as_dict() != initial_values or manager._tick_job.is_running
 
 
 async def test_update_state_skipped_when_disabled(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
@@ -187,7 +248,201 @@ async def test_update_state_skipped_when_disabled(hass: HomeAssistant, setup_int
     await manager.async_update_state()
     await hass.async_block_till_done()
 
-    assert manager._update_listener is None
+    assert not manager._tick_job.is_running
+
+
+async def test_update_state_batches_identical_payloads(hass: HomeAssistant, mock_light_services, mock_light) -> None:
+    """Test that all targets with the same payload are addressed by one service call."""
+    hass.states.async_set("light.second_light", "on", {"brightness": 128, "supported_features": 1})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: ["light.test_light", "light.second_light"]},
+        entry_id="test_batched",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
+    await hass.async_block_till_done()
+
+    assert mock_light_services
+    for call in mock_light_services:
+        assert call.data[ATTR_ENTITY_ID] == ["light.test_light", "light.second_light"]
+
+
+async def test_update_state_groups_mixed_targets_by_capability(hass: HomeAssistant, mock_light_services, mock_light) -> None:
+    """Test that mixed targets get one payload per capability class, from the richest color mode."""
+    hass.states.async_set("light.rgbw_light", "on", {"supported_color_modes": ["rgbw"], "rgbw_color": [100, 150, 200, 50]})
+    hass.states.async_set("light.xy_light", "on", {"supported_color_modes": ["xy", "color_temp"]})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: ["light.test_light", "light.rgbw_light", "light.xy_light"]},
+        entry_id="test_mixed",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    assert manager.get_color_mode() == "rgbw"
+
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
+    await hass.async_block_till_done()
+
+    calls = {call.data[ATTR_ENTITY_ID][0]: call.data for call in mock_light_services[:3]}
+    rgbw = calls["light.rgbw_light"]["rgbw_color"]
+    assert rgbw[3] == 0
+    assert calls["light.xy_light"]["rgb_color"] == rgbw[:3]
+    assert calls["light.test_light"]["brightness"] == max(rgbw[:3])
+
+
+async def test_update_state_addresses_light_group_covering_targets(hass: HomeAssistant, mock_light_services, mock_light) -> None:
+    """Test that a light group, whose members are exactly the targets, gets one call instead of its members."""
+    hass.states.async_set("light.second_light", "on", {"brightness": 50})
+    hass.states.async_set("light.both_lights", "on", {"brightness": 90, ATTR_ENTITY_ID: ["light.test_light", "light.second_light"]})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: ["light.test_light", "light.second_light"]},
+        entry_id="test_light_group",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_ENABLED}, blocking=True)
+    await hass.async_block_till_done()
+
+    assert mock_light_services
+    assert all(call.data[ATTR_ENTITY_ID] == ["light.both_lights"] for call in mock_light_services)
+
+    # Without the group the members are addressed again
+    hass.states.async_set("light.both_lights", "unavailable", {ATTR_ENTITY_ID: ["light.test_light", "light.second_light"]})
+    manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    await manager.async_step()
+    await hass.async_block_till_done()
+
+    assert sorted(mock_light_services[-1].data[ATTR_ENTITY_ID]) == ["light.second_light", "light.test_light"]
+
+
+async def test_capability_index_refreshed_on_registry_update(hass: HomeAssistant, mock_light) -> None:
+    """Test that a registry update of a target drops the cached capability classes."""
+    registry = er.async_get(hass)
+    light_entry = registry.async_get_or_create("light", "test", "registry_light", suggested_object_id="registry_light")
+    hass.states.async_set(light_entry.entity_id, "on", {"supported_color_modes": ["brightness"], "brightness": 100})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [light_entry.entity_id]},
+        entry_id="test_registry_capabilities",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    assert manager._capabilities.get(light_entry.entity_id) == "brightness"
+
+    registry.async_update_entity(light_entry.entity_id, capabilities={"supported_color_modes": ["rgb"]})
+    await hass.async_block_till_done()
+
+    assert manager._capabilities.get(light_entry.entity_id) == "rgb"
+    # The richer color mode needs other engine channels and value sensors, so the entry is reloaded
+    reloaded = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    assert reloaded is not manager
+    assert reloaded.get_color_mode() == "rgb"
+
+
+async def test_color_mode_detected_when_target_becomes_available(hass: HomeAssistant) -> None:
+    """Test that a target, which was unavailable at startup, gets its color mode once it reports its state."""
+    hass.states.async_set("light.late_light", "unavailable", {})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: ["light.late_light"]},
+        entry_id="test_late_light",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    assert manager.get_color_mode() == "brightness"
+
+    hass.states.async_set("light.late_light", "on", {"supported_color_modes": ["rgb"], "rgb_color": [100, 150, 200]})
+    await hass.async_block_till_done()
+
+    manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
+    assert manager.get_color_mode() == "rgb"
+    assert manager.get_current_channel_value("g") == 150
+
+    # Unchanged color mode doesn't reload again
+    hass.states.async_set("light.late_light", "unavailable", {})
+    hass.states.async_set("light.late_light", "on", {"supported_color_modes": ["rgb"], "rgb_color": [1, 2, 3]})
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id] is manager
+
+
+# ============================================================================
+# Manager: Config snapshot
+# ============================================================================
+
+
+async def test_config_snapshot_is_cached(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that the config snapshot is reused as long as no tracked entity changes."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+
+    snapshot = manager._get_config_snapshot()
+    assert manager._get_config_snapshot() is snapshot
+    assert manager.get_config_min_value() == snapshot.min_value
+
+
+async def test_config_snapshot_invalidated_on_entity_change(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that changing an internal number entity rebuilds the config snapshot."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+    snapshot = manager._get_config_snapshot()
+
+    await hass.services.async_call(
+        NUMBER_DOMAIN, SERVICE_SET_VALUE, {ATTR_ENTITY_ID: "number.test_moving_colors_minimum_value", "value": 42}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert manager._get_config_snapshot() is not snapshot
+    assert manager.get_config_min_value() == 42
+
+
+# ============================================================================
+# Manager: Internal entity index
+# ============================================================================
+
+
+async def test_internal_entity_index_built_after_setup(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that the internal entity index resolves all internal entities after setup."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+
+    assert manager._internal_entity_ids is not None
+    assert manager.get_internal_entity_id(MCInternal.ENABLED_MANUAL) == SWITCH_ENABLED
+    assert manager.get_internal_entity_id(MCInternal.MIN_VALUE_MANUAL) == "number.test_moving_colors_minimum_value"
+
+
+async def test_internal_entity_index_follows_rename(hass: HomeAssistant, setup_integration, mock_config_entry) -> None:
+    """Test that renaming an internal entity invalidates and rebuilds the index."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+
+    er.async_get(hass).async_update_entity(SWITCH_ENABLED, new_entity_id="switch.renamed_enabled")
+    await hass.async_block_till_done()
+
+    assert manager.get_internal_entity_id(MCInternal.ENABLED_MANUAL) == "switch.renamed_enabled"
 
 
 # ============================================================================
@@ -219,9 +474,9 @@ async def test_detect_color_mode_rgb(hass: HomeAssistant, mock_light) -> None:
 
     manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
     assert manager._color_mode == "rgb"
-    assert "r" in manager._current_values
-    assert "g" in manager._current_values
-    assert "b" in manager._current_values
+    assert "r" in manager.engine.channels
+    assert "g" in manager.engine.channels
+    assert "b" in manager.engine.channels
 
 
 async def test_detect_color_mode_rgbw(hass: HomeAssistant, mock_light) -> None:
@@ -248,8 +503,8 @@ async def test_detect_color_mode_rgbw(hass: HomeAssistant, mock_light) -> None:
 
     manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
     assert manager._color_mode == "rgbw"
-    assert "r" in manager._current_values
-    assert "w" in manager._current_values
+    assert "r" in manager.engine.channels
+    assert "w" in manager.engine.channels
 
 
 async def test_detect_color_mode_brightness_fallback(hass: HomeAssistant, mock_light) -> None:
@@ -270,7 +525,7 @@ async def test_detect_color_mode_brightness_fallback(hass: HomeAssistant, mock_l
 
     manager = hass.data[DOMAIN_DATA_MANAGERS][entry.entry_id]
     assert manager._color_mode == "brightness"
-    assert "brightness" in manager._current_values
+    assert "brightness" in manager.engine.channels
 
 
 # ============================================================================
@@ -5,6 +5,8 @@ from homeassistant.components.number import SERVICE_SET_VALUE
 from homeassistant.const import ATTR_ENTITY_ID, EVENT_HOMEASSISTANT_STARTED
 from homeassistant.core import HomeAssistant
 
+from custom_components.moving_colors.const import DOMAIN_DATA_MANAGERS
+
 
 async def test_number_setup(hass: HomeAssistant, mock_config_entry, mock_light) -> None:
     """Test number platform setup."""
@@ -76,3 +78,34 @@ async def test_number_set_value(hass: HomeAssistant, mock_config_entry, mock_lig
     state = hass.states.get(entity_id)
     assert state is not None
     assert float(state.state) == 200.0
+
+
+async def test_number_trigger_interval_accepts_fractions(hass: HomeAssistant, mock_config_entry, mock_light) -> None:
+    """Test that the trigger interval keeps sub-second values."""
+    mock_config_entry.add_to_hass(hass)
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "number.test_moving_colors_trigger_intervall"
+
+    await hass.services.async_call(
+        NUMBER_DOMAIN,
+        SERVICE_SET_VALUE,
+        {
+            ATTR_ENTITY_ID: entity_id,
+            "value": 0.3,
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state is not None
+    assert state.state == "0.3"
+
+    manager = hass.data[DOMAIN_DATA_MANAGERS][mock_config_entry.entry_id]
+    assert manager.get_config_trigger_interval() == 0.3
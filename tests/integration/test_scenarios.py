@@ -11,7 +11,7 @@ Default values (from MCInternalDefaults):
     START_VALUE      = 125
 
 NOTE: _sync_current_values_to_snapshot() is called on every async_start_update_task().
-It resets _current_values from the physical light state and always sets _count_up_*=True.
+It resets the engine channel values from the physical light state and always counts up.
 Tests must not pre-set internal state before enable_mc() - it will be overwritten.
 Instead, tests control behavior via narrow min/max ranges on the number entities.
 
@@ -19,6 +19,7 @@ Known behavior: After stop+restart, direction always resets to UP (count_up=True
 This may be a bug - tracked in test_direction_resets_after_restart.
 """
 
+import itertools
 import logging
 
 import pytest
@@ -29,13 +30,22 @@ from homeassistant.const import ATTR_ENTITY_ID, EVENT_HOMEASSISTANT_STARTED, SER
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.moving_colors.batch_engine import BatchChannelView
 from custom_components.moving_colors.const import (
+    ADAPTIVE_INTERVAL,
+    BATCH_ENGINE,
     DOMAIN,
+    DOMAIN_DATA_BATCH_ENGINE,
     DOMAIN_DATA_MANAGERS,
+    KEYFRAME_MODE,
+    LOOKAHEAD_FRAMES,
     MC_CONF_NAME,
+    SENSOR_UPDATE_INTERVAL,
+    STATISTICS_WINDOW,
     TARGET_LIGHT_ENTITY_ID,
     MCInternalDefaults,
 )
+from custom_components.moving_colors.dispatcher import create_command_context
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,6 +66,12 @@ NUMBER_MIN = "number.mc_test_minimum_value"
 NUMBER_MAX = "number.mc_test_maximum_value"
 NUMBER_STEPPING = "number.mc_test_step_value"
 NUMBER_INTERVAL = "number.mc_test_trigger_interval"
+SWITCH_DEFAULT_MODE = "switch.mc_test_activate_default_mode"
+NUMBER_DEFAULT_VALUE = "number.mc_test_default_value"
+NUMBER_STEPS_TO_DEFAULT = "number.mc_test_steps_to_default_value"
+SENSOR_CURRENT_VALUE = "sensor.mc_test_current_color_value"
+SENSOR_VALUE_STATISTICS = "sensor.mc_test_color_value_statistics"
+SENSOR_MIN_BOUNDARY = "sensor.mc_test_current_minimum_value"
 
 
 # ============================================================================
@@ -178,10 +194,10 @@ async def test_brightness_changes_after_enable(hass: HomeAssistant, mc_entry: Mo
     manager = get_manager(hass, mc_entry)
     await enable_mc(hass)
 
-    value_after_enable = manager._current_values["brightness"]
+    value_after_enable = manager.engine.value("brightness")
     await time_travel(seconds=INTERVAL + 1)
 
-    assert manager._current_values["brightness"] != value_after_enable, f"Brightness should have changed after {INTERVAL}s tick"
+    assert manager.engine.value("brightness") != value_after_enable, f"Brightness should have changed after {INTERVAL}s tick"
 
 
 async def test_brightness_stays_within_default_bounds(hass: HomeAssistant, mc_entry: MockConfigEntry, time_travel) -> None:
@@ -196,7 +212,7 @@ async def test_brightness_stays_within_default_bounds(hass: HomeAssistant, mc_en
 
     for _ in range(30):
         await time_travel(seconds=INTERVAL + 1)
-        brightness = manager._current_values["brightness"]
+        brightness = manager.engine.value("brightness")
         assert MIN_VALUE <= brightness <= MAX_VALUE, f"Brightness {brightness} outside default bounds [{MIN_VALUE}, {MAX_VALUE}]"
 
 
@@ -219,7 +235,7 @@ async def test_brightness_reverses_direction_at_max(hass: HomeAssistant, mc_entr
     bounced_at_max = False
     for _ in range(200):
         await time_travel(seconds=INTERVAL + 1)
-        count_up = manager._count_up_brightness
+        count_up = manager.engine.is_counting_up("brightness")
         if count_up:
             seen_count_up_true = True
         if seen_count_up_true and not count_up:
@@ -228,9 +244,9 @@ async def test_brightness_reverses_direction_at_max(hass: HomeAssistant, mc_entr
 
     assert bounced_at_max, (
         f"Expected brightness to hit max=255 and reverse direction within 200 ticks. "
-        f"brightness={manager._current_values['brightness']}, count_up={manager._count_up_brightness}"
+        f"brightness={manager.engine.value('brightness')}, count_up={manager.engine.is_counting_up('brightness')}"
     )
-    assert manager._current_values["brightness"] == MAX_VALUE
+    assert manager.engine.value("brightness") == MAX_VALUE
 
 
 async def test_brightness_reverses_direction_at_min(hass: HomeAssistant, mc_entry: MockConfigEntry, time_travel) -> None:
@@ -249,13 +265,13 @@ async def test_brightness_reverses_direction_at_min(hass: HomeAssistant, mc_entr
     bounced_at_min = False
     for _ in range(60):
         await time_travel(seconds=INTERVAL + 1)
-        if manager._count_up_brightness and manager._current_values["brightness"] == MIN_VALUE:
+        if manager.engine.is_counting_up("brightness") and manager.engine.value("brightness") == MIN_VALUE:
             bounced_at_min = True
             break
 
     assert bounced_at_min, (
         f"Expected brightness to hit min=0 and reverse direction within 60 ticks. "
-        f"brightness={manager._current_values['brightness']}, count_up={manager._count_up_brightness}"
+        f"brightness={manager.engine.value('brightness')}, count_up={manager.engine.is_counting_up('brightness')}"
     )
 
 
@@ -271,13 +287,13 @@ async def test_brightness_stops_when_disabled(hass: HomeAssistant, mc_entry: Moc
     await time_travel(seconds=INTERVAL + 1)
 
     await disable_mc(hass)
-    value_after_disable = dict(manager._current_values)
+    value_after_disable = manager.engine.as_dict()
 
     await time_travel(seconds=INTERVAL + 1)
     await time_travel(seconds=INTERVAL + 1)
 
-    assert manager._current_values == value_after_disable, "Values should not change after disable"
-    assert manager._update_listener is None
+    assert manager.engine.as_dict() == value_after_disable, "Values should not change after disable"
+    assert not manager._tick_job.is_running
 
 
 async def test_direction_preserved_after_restart(hass: HomeAssistant, mc_entry: MockConfigEntry, time_travel) -> None:
@@ -285,7 +301,7 @@ async def test_direction_preserved_after_restart(hass: HomeAssistant, mc_entry:
 
     When start_from_current_position is disabled (default in test env because
     internal entities are not yet initialized), _sync_current_values_to_snapshot
-    is NOT called, so _count_up_brightness keeps its last value.
+    is NOT called, so the brightness direction of the engine keeps its last value.
 
     Given: Moving Colors runs until it goes DOWN (count_up=False)
     When:  It is disabled and re-enabled
@@ -300,14 +316,14 @@ async def test_direction_preserved_after_restart(hass: HomeAssistant, mc_entry:
     # After 10 ticks count_up remains False (still descending from 128).
     for _ in range(10):
         await time_travel(seconds=INTERVAL + 1)
-    assert not manager._count_up_brightness, "Should be going DOWN before restart"
+    assert not manager.engine.is_counting_up("brightness"), "Should be going DOWN before restart"
 
     # Restart
     await disable_mc(hass)
     await enable_mc(hass)
 
     # Without _sync, direction is preserved from before stop
-    assert not manager._count_up_brightness, "Direction should be preserved after restart when start_from_current_position is disabled"
+    assert not manager.engine.is_counting_up("brightness"), "Direction should be preserved after restart when start_from_current_position is disabled"
 
 
 async def test_brightness_restarts_after_reenable(hass: HomeAssistant, mc_entry: MockConfigEntry, time_travel) -> None:
@@ -325,11 +341,11 @@ async def test_brightness_restarts_after_reenable(hass: HomeAssistant, mc_entry:
     # After re-enable, _sync resets brightness to light state (128).
     # We just need to verify the timer is running and a tick produces a change.
     await enable_mc(hass)
-    value_after_reenable = dict(manager._current_values)
+    value_after_reenable = manager.engine.as_dict()
 
     await time_travel(seconds=INTERVAL + 1)
 
-    assert manager._current_values != value_after_reenable, "Values should change after re-enable + tick"
+    assert manager.engine.as_dict() != value_after_reenable, "Values should change after re-enable + tick"
 
 
 # ============================================================================
@@ -351,7 +367,7 @@ async def test_custom_min_max_respected(hass: HomeAssistant, mc_entry: MockConfi
 
     for _ in range(30):
         await time_travel(seconds=INTERVAL + 1)
-        brightness = manager._current_values["brightness"]
+        brightness = manager.engine.value("brightness")
         assert 100 <= brightness <= 150, f"Brightness {brightness} outside custom bounds [100, 150]"
 
 
@@ -371,14 +387,36 @@ async def test_custom_stepping_affects_speed(hass: HomeAssistant, mc_entry: Mock
     # After enable, _sync sets brightness=128 (from mock_light).
     # _direction_from_position: 128 > 127.5 → count_up=False → first tick subtracts 20 → 108.
     # abs() ensures the test passes regardless of direction.
-    value_after_start = manager._current_values["brightness"]
+    value_after_start = manager.engine.value("brightness")
     await time_travel(seconds=INTERVAL + 1)
-    value_after_tick = manager._current_values["brightness"]
+    value_after_tick = manager.engine.value("brightness")
 
     change = abs(value_after_tick - value_after_start)
     assert change >= 20, f"With stepping=20, value should change by ~20 per tick, got change={change} ({value_after_start} → {value_after_tick})"
 
 
+async def test_unchanged_frame_corrects_manual_change(
+    hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services, mock_light, time_travel
+) -> None:
+    """Scenario: A light changed outside of Moving Colors gets the unchanged frame again.
+
+    Given: stepping=0, so every frame is identical and suppressed after the first one
+    When:  The light is changed manually
+    Then:  The next tick sends the frame again
+    """
+    await set_number(hass, NUMBER_STEPPING, 0)
+    await enable_mc(hass)
+    await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == 1
+
+    hass.states.async_set(mock_light, "on", {"brightness": 50, "supported_features": 1})
+    await hass.async_block_till_done()
+    await time_travel(seconds=INTERVAL)
+
+    assert len(mock_light_services) == 2
+    assert mock_light_services[1].data["brightness"] == mock_light_services[0].data["brightness"]
+
+
 # ============================================================================
 # Scenario 3: Random limits
 # ============================================================================
@@ -389,7 +427,7 @@ async def test_random_limits_new_min_after_hitting_max(hass: HomeAssistant, mc_e
 
     Given: Random limits enabled, narrow range max=15, min=0
     When:  Moving Colors hits the max boundary
-    Then:  _active_min["brightness"] gets a new random value between 0 and 15
+    Then:  the lower bound of "brightness" gets a new random value between 0 and 15
     """
     manager = get_manager(hass, mc_entry)
 
@@ -405,7 +443,7 @@ async def test_random_limits_new_min_after_hitting_max(hass: HomeAssistant, mc_e
         await time_travel(seconds=INTERVAL + 1)
 
     # After hitting max, a new random min should have been generated
-    new_min = manager._active_min.get("brightness")
+    new_min = manager.engine.lower_bound("brightness")
     assert new_min is not None
     assert 0 <= new_min <= 15, f"New random min {new_min} should be within [0, 15]"
 
@@ -415,7 +453,7 @@ async def test_without_random_limits_boundaries_stay_fixed(hass: HomeAssistant,
 
     Given: Random limits disabled (default), narrow range max=15, min=0
     When:  Moving Colors bounces at max
-    Then:  _active_min stays at 0 (not randomized)
+    Then:  the lower bound stays at 0 (not randomized)
     """
     manager = get_manager(hass, mc_entry)
     # Random limits default is False - no need to explicitly disable
@@ -427,8 +465,8 @@ async def test_without_random_limits_boundaries_stay_fixed(hass: HomeAssistant,
     for _ in range(12):
         await time_travel(seconds=INTERVAL + 1)
 
-    assert manager._active_min.get("brightness") == 0, "Without random limits, active_min should stay at configured min=0"
-    assert manager._active_max.get("brightness") == 15, "Without random limits, active_max should stay at configured max=15"
+    assert manager.engine.lower_bound("brightness") == 0, "Without random limits, active_min should stay at configured min=0"
+    assert manager.engine.upper_bound("brightness") == 15, "Without random limits, active_max should stay at configured max=15"
 
 
 # ============================================================================
@@ -445,7 +483,7 @@ async def test_rgb_color_mode_detected(hass: HomeAssistant, mc_entry_rgb: MockCo
     """
     manager = get_manager(hass, mc_entry_rgb)
     assert manager._color_mode == "rgb"
-    assert set(manager._current_values.keys()) == {"r", "g", "b"}
+    assert set(manager.engine.channels) == {"r", "g", "b"}
 
 
 async def test_rgb_channels_change_after_tick(hass: HomeAssistant, mc_entry_rgb: MockConfigEntry, time_travel) -> None:
@@ -457,11 +495,11 @@ async def test_rgb_channels_change_after_tick(hass: HomeAssistant, mc_entry_rgb:
     """
     manager = get_manager(hass, mc_entry_rgb)
     await enable_mc(hass)
-    initial_values = dict(manager._current_values)
+    initial_values = manager.engine.as_dict()
 
     await time_travel(seconds=INTERVAL + 1)
 
-    assert manager._current_values != initial_values, "RGB channel values should change after one tick"
+    assert manager.engine.as_dict() != initial_values, "RGB channel values should change after one tick"
 
 
 async def test_rgb_channels_stay_within_bounds(hass: HomeAssistant, mc_entry_rgb: MockConfigEntry, time_travel) -> None:
@@ -477,7 +515,7 @@ async def test_rgb_channels_stay_within_bounds(hass: HomeAssistant, mc_entry_rgb
     for _ in range(30):
         await time_travel(seconds=INTERVAL + 1)
         for channel in ("r", "g", "b"):
-            val = manager._current_values[channel]
+            val = manager.engine.value(channel)
             assert 0 <= val <= 255, f"RGB channel '{channel}' value {val} outside [0, 255]"
 
 
@@ -494,9 +532,9 @@ async def test_rgb_channels_move_independently(hass: HomeAssistant, mc_entry_rgb
     directions_differ = False
     for _ in range(30):
         await time_travel(seconds=INTERVAL + 1)
-        r_up = getattr(manager, "_count_up_r", True)
-        g_up = getattr(manager, "_count_up_g", True)
-        b_up = getattr(manager, "_count_up_b", True)
+        r_up = manager.engine.is_counting_up("r")
+        g_up = manager.engine.is_counting_up("g")
+        b_up = manager.engine.is_counting_up("b")
         if not (r_up == g_up == b_up):
             directions_differ = True
             break
@@ -518,7 +556,7 @@ async def test_rgbw_color_mode_detected(hass: HomeAssistant, mc_entry_rgbw: Mock
     """
     manager = get_manager(hass, mc_entry_rgbw)
     assert manager._color_mode == "rgbw"
-    assert set(manager._current_values.keys()) == {"r", "g", "b", "w"}
+    assert set(manager.engine.channels) == {"r", "g", "b", "w"}
 
 
 async def test_rgbw_white_channel_always_zero(hass: HomeAssistant, mc_entry_rgbw: MockConfigEntry, time_travel) -> None:
@@ -533,7 +571,7 @@ async def test_rgbw_white_channel_always_zero(hass: HomeAssistant, mc_entry_rgbw
 
     for _ in range(10):
         await time_travel(seconds=INTERVAL + 1)
-        assert manager._current_values["w"] == 0, f"White channel should always be 0, got {manager._current_values['w']}"
+        assert manager.engine.value("w") == 0, f"White channel should always be 0, got {manager.engine.value('w')}"
 
 
 async def test_rgbw_rgb_channels_change_while_w_stays_zero(hass: HomeAssistant, mc_entry_rgbw: MockConfigEntry, time_travel) -> None:
@@ -545,10 +583,493 @@ async def test_rgbw_rgb_channels_change_while_w_stays_zero(hass: HomeAssistant,
     """
     manager = get_manager(hass, mc_entry_rgbw)
     await enable_mc(hass)
-    initial_rgb = {c: manager._current_values[c] for c in ("r", "g", "b")}
+    initial_rgb = {c: manager.engine.value(c) for c in ("r", "g", "b")}
 
     await time_travel(seconds=INTERVAL + 1)
 
-    current_rgb = {c: manager._current_values[c] for c in ("r", "g", "b")}
+    current_rgb = {c: manager.engine.value(c) for c in ("r", "g", "b")}
     assert current_rgb != initial_rgb, "RGB channels should change in RGBW mode"
-    assert manager._current_values["w"] == 0
+    assert manager.engine.value("w") == 0
+
+
+# ============================================================================
+# Scenario 5b: Default mode - way back to the default value
+# ============================================================================
+
+
+async def test_default_mode_ramps_to_default_value(hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services, time_travel) -> None:
+    """Scenario: With default mode, disabling moves the light to the default value and stops there.
+
+    Given: Default mode enabled, default value 100, 4 steps to default value
+    When:  Moving Colors is disabled after some ticks
+    Then:  The brightness reaches 100 within 4 frames, the updates stop and the light keeps the value
+    """
+    manager = get_manager(hass, mc_entry)
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_DEFAULT_MODE}, blocking=True)
+    await set_number(hass, NUMBER_DEFAULT_VALUE, 100)
+    await set_number(hass, NUMBER_STEPS_TO_DEFAULT, 4)
+    await enable_mc(hass)
+    await time_travel(seconds=INTERVAL)
+    start = manager.get_current_value()
+
+    mock_light_services.clear()
+    await disable_mc(hass)
+    assert manager._tick_job.is_running
+    for _ in range(5):
+        await time_travel(seconds=INTERVAL)
+
+    brightness = [call.data["brightness"] for call in mock_light_services if call.service == SERVICE_TURN_ON]
+    assert len(brightness) == 4
+    assert brightness[-1] == 100
+    assert brightness[0] == start + round((100 - start) / 4)
+    assert not manager._tick_job.is_running
+    assert manager.get_current_value() == 100
+    # The light is not restored to its state before the start
+    assert all(call.service == SERVICE_TURN_ON for call in mock_light_services)
+
+
+async def test_default_mode_cancelled_when_enabled_again(hass: HomeAssistant, mc_entry: MockConfigEntry, time_travel) -> None:
+    """Scenario: Enabling again on the way to the default value continues the animation from there."""
+    manager = get_manager(hass, mc_entry)
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_DEFAULT_MODE}, blocking=True)
+    await set_number(hass, NUMBER_STEPS_TO_DEFAULT, 10)
+    await enable_mc(hass)
+    # Move away from the default value
+    await time_travel(seconds=INTERVAL)
+    await disable_mc(hass)
+    assert manager._default_ramp.is_active
+
+    await enable_mc(hass)
+    assert not manager._default_ramp.is_active
+    assert manager._tick_job.is_running
+
+
+# ============================================================================
+# Scenario 6: Keyframe mode - one command per boundary
+# ============================================================================
+
+
+async def test_keyframe_mode_sends_one_command_per_boundary(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: Keyframe mode sends the next boundary together with a transition.
+
+    Given: Keyframe mode enabled, brightness light at 128, default min=0, max=255, stepping=3
+    When:  Moving Colors is enabled and runs for some ticks
+    Then:  Only one command with brightness=0 and transition=43 ticks is sent,
+           the next command follows after the transition has elapsed
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], KEYFRAME_MODE: True},
+        entry_id="mc_test_keyframe_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+
+    await enable_mc(hass)
+
+    # 128 > 127.5 → moving down, ceil(128 / 3) = 43 steps to the min boundary
+    assert len(mock_light_services) == 1
+    assert mock_light_services[0].data["brightness"] == MIN_VALUE
+    assert mock_light_services[0].data["transition"] == 43 * INTERVAL
+    assert manager.engine.is_counting_up("brightness")
+
+    for _ in range(10):
+        await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == 1, "No commands should be sent while the light is fading"
+
+    for _ in range(33):
+        await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == 2
+    assert mock_light_services[1].data["brightness"] == MAX_VALUE
+    assert mock_light_services[1].data["transition"] == 85 * INTERVAL
+
+
+# ============================================================================
+# Scenario 7: Batch engine - channels stepped in the shared numpy engine
+# ============================================================================
+
+
+async def test_batch_engine_steps_like_regular_engine(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: The batch engine produces the same frames as the regular engine.
+
+    Given: Batch engine enabled, brightness light at 128, default min=0, max=255, stepping=3
+    When:  Moving Colors is enabled and runs for some ticks
+    Then:  The brightness moves down by 3 per tick and the rows are released on unload
+    """
+    pytest.importorskip("numpy")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], BATCH_ENGINE: True},
+        entry_id="mc_test_batch_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+    assert isinstance(manager.engine, BatchChannelView)
+
+    await enable_mc(hass)
+    for _ in range(3):
+        await time_travel(seconds=INTERVAL)
+
+    brightness = [call.data["brightness"] for call in mock_light_services]
+    assert brightness[0] == 128 - STEPPING
+    assert all(previous - current == STEPPING for previous, current in itertools.pairwise(brightness))
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN_DATA_BATCH_ENGINE].row_count == 0
+
+
+# ============================================================================
+# Scenario 8: Lookahead frames - frames computed ahead of their tick
+# ============================================================================
+
+
+async def test_lookahead_frames_send_same_sequence(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: Buffered frames are sent in the same order as computed ones and follow config changes.
+
+    Given: 4 lookahead frames, brightness light at 128, default min=0, max=255, stepping=3
+    When:  Moving Colors runs for some ticks and the stepping is changed
+    Then:  The brightness moves down by 3 per tick, the sensors show the sent frame
+           and the next frame after the change uses the new stepping
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], LOOKAHEAD_FRAMES: 4},
+        entry_id="mc_test_lookahead_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+
+    await enable_mc(hass)
+    for _ in range(3):
+        await time_travel(seconds=INTERVAL)
+
+    brightness = [call.data["brightness"] for call in mock_light_services]
+    assert brightness[0] == 128 - STEPPING
+    assert all(previous - current == STEPPING for previous, current in itertools.pairwise(brightness))
+
+    # The engine runs ahead, the manager reports the frame sent last
+    assert len(manager._frames) == 4
+    assert manager.get_current_value() == brightness[-1]
+    assert manager.engine.value("brightness") == brightness[-1] - 4 * STEPPING
+
+    await set_number(hass, NUMBER_STEPPING, 10)
+    await time_travel(seconds=INTERVAL)
+    assert mock_light_services[-1].data["brightness"] == brightness[-1] - 10
+
+    # Frames are dropped on stop, a restart continues at the frame sent last
+    await disable_mc(hass)
+    assert len(manager._frames) == 0
+    assert manager.engine.value("brightness") == brightness[-1] - 10
+
+
+async def test_lookahead_frames_with_batch_engine(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: Frames computed ahead in the batch engine are sent in the same order.
+
+    Given: Batch engine and 4 lookahead frames, brightness light at 128, stepping=3
+    When:  Moving Colors runs for some ticks
+    Then:  The brightness moves down by 3 per tick and the buffer is refilled after each tick
+    """
+    pytest.importorskip("numpy")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], BATCH_ENGINE: True, LOOKAHEAD_FRAMES: 4},
+        entry_id="mc_test_batch_lookahead_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+
+    await enable_mc(hass)
+    for _ in range(6):
+        await time_travel(seconds=INTERVAL)
+
+    brightness = [call.data["brightness"] for call in mock_light_services]
+    assert brightness[0] == 128 - STEPPING
+    assert all(previous - current == STEPPING for previous, current in itertools.pairwise(brightness))
+    assert len(manager._frames) == 4
+    assert manager.get_current_value() == brightness[-1]
+
+
+async def test_lookahead_frames_report_boundaries_of_sent_frame(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: With lookahead, the boundary sensors show the boundaries of the frame sent last.
+
+    Given: 4 lookahead frames, random limits, brightness light at 128, stepping=25
+    When:  Moving Colors sends two frames and the engine bounces ahead of them
+    Then:  The reported boundaries are the ones of the sent frame, not of the engine position
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], LOOKAHEAD_FRAMES: 4},
+        entry_id="mc_test_lookahead_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_RANDOM_LIMITS}, blocking=True)
+    await set_number(hass, NUMBER_STEPPING, 25)
+    await enable_mc(hass)
+    for _ in range(2):
+        await time_travel(seconds=INTERVAL)
+
+    assert manager.get_current_value() == mock_light_services[-1].data["brightness"]
+    reported = manager.get_current_lower_boundary(), manager.get_current_upper_boundary()
+    # The engine bounced at the lower boundary ahead of the sent frame and drew a new upper one
+    assert (manager.engine.lower_bound("brightness"), manager.engine.upper_bound("brightness")) != reported
+
+    # A stop sets the engine back to the frame sent last
+    await disable_mc(hass)
+    assert (manager.engine.lower_bound("brightness"), manager.engine.upper_bound("brightness")) == reported
+
+
+# ============================================================================
+# Scenario 9: Adaptive interval - frame rate follows the response latency
+# ============================================================================
+
+
+async def test_adaptive_interval_keeps_speed_for_slow_light(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: A slow light gets fewer commands, the animation keeps its speed.
+
+    Given: Adaptive interval enabled, brightness light at 128, default interval and stepping=3
+    When:  The light takes 2.5 intervals to report the state of a command
+    Then:  Commands are only sent every 3rd interval and advance by 3 steps each
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], ADAPTIVE_INTERVAL: True},
+        entry_id="mc_test_adaptive_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    manager = get_manager(hass, entry)
+
+    await enable_mc(hass)
+    assert manager.get_effective_trigger_interval() == INTERVAL
+    brightness = mock_light_services[-1].data["brightness"]
+
+    # A manual change of the light is no response to a command
+    context = create_command_context()
+    manager._latency.record_command([mock_light], context.id, hass.loop.time() - 2.5 * INTERVAL)
+    hass.states.async_set(mock_light, "on", {"brightness": brightness, "supported_features": 1})
+    await hass.async_block_till_done()
+    assert manager._latency.get_latency() is None
+
+    # The state change of the light arrives 2.5 intervals after its command
+    hass.states.async_set(mock_light, "on", {"brightness": brightness, "supported_features": 1}, context=context, force_update=True)
+    await hass.async_block_till_done()
+
+    await time_travel(seconds=INTERVAL)
+    assert mock_light_services[-1].data["brightness"] == brightness - 3 * STEPPING
+    assert manager.get_effective_trigger_interval() == 3 * INTERVAL
+    sent = len(mock_light_services)
+
+    await time_travel(seconds=INTERVAL)
+    await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == sent
+
+    await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == sent + 1
+    assert mock_light_services[-1].data["brightness"] == brightness - 6 * STEPPING
+
+
+# ============================================================================
+# Scenario 10: Sensor updates - throttled independently of the frames
+# ============================================================================
+
+
+async def test_sensor_updates_are_coalesced(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: The value sensor is written at most once per sensor update interval.
+
+    Given: Sensor update interval of 2.5 intervals, brightness light at 128
+    When:  Moving Colors runs for several ticks
+    Then:  The sensor shows the first frame until the interval passed and then the frame sent last
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], SENSOR_UPDATE_INTERVAL: 2.5 * INTERVAL},
+        entry_id="mc_test_sensor_update_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await enable_mc(hass)
+    first = hass.states.get(SENSOR_CURRENT_VALUE).state
+    assert int(first) == mock_light_services[0].data["brightness"]
+
+    await time_travel(seconds=INTERVAL)
+    await time_travel(seconds=INTERVAL)
+    assert hass.states.get(SENSOR_CURRENT_VALUE).state == first
+    latest = mock_light_services[-1].data["brightness"]
+
+    # The pending update shows the frame sent last before it
+    await time_travel(seconds=INTERVAL)
+    assert int(hass.states.get(SENSOR_CURRENT_VALUE).state) == latest
+
+
+# ============================================================================
+# Scenario 11: Statistics - aggregates written once per window
+# ============================================================================
+
+
+async def test_statistics_sensor_aggregates_window(hass: HomeAssistant, mock_light: str, mock_light_services, time_travel) -> None:
+    """Scenario: The statistics sensor reports the aggregates of the frames sent within its window.
+
+    Given: Statistics window of 6 intervals, brightness light at 128, min value 113, max value 140
+    When:  Moving Colors runs for one window
+    Then:  The sensor shows the mean of the frames sent within the window, min/max/bounces
+           as attributes and the active boundaries instead of placeholder values
+    """
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={MC_CONF_NAME: INSTANCE_NAME},
+        options={TARGET_LIGHT_ENTITY_ID: [mock_light], STATISTICS_WINDOW: 6 * INTERVAL, SENSOR_UPDATE_INTERVAL: 0},
+        entry_id="mc_test_statistics_entry",
+        title=INSTANCE_NAME,
+        version=1,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(SENSOR_VALUE_STATISTICS).state == "unknown"
+
+    await set_number(hass, NUMBER_MIN, 113)
+    await set_number(hass, NUMBER_MAX, 140)
+    await enable_mc(hass)
+    assert int(hass.states.get(SENSOR_MIN_BOUNDARY).state) == 113
+
+    for _ in range(6):
+        await time_travel(seconds=INTERVAL)
+
+    state = hass.states.get(SENSOR_VALUE_STATISTICS)
+    sent = [call.data["brightness"] for call in mock_light_services][: state.attributes["frames"]]
+    assert sent[:6] == [125, 122, 119, 116, 113, 116]
+    assert float(state.state) == round(sum(sent) / len(sent), 1)
+    assert state.attributes["min"] == min(sent)
+    assert state.attributes["max"] == max(sent)
+    assert state.attributes["bounces"] == 1
+    assert state.attributes["lower_bound"] == 113
+    assert state.attributes["upper_bound"] == 140
+
+
+# ============================================================================
+# Scenario 12: Control changes - coalesced into one re-evaluation
+# ============================================================================
+
+
+async def test_enable_sends_one_frame(hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services) -> None:
+    """Scenario: Enabling starts the loop with exactly one frame."""
+    await enable_mc(hass)
+
+    assert len(mock_light_services) == 1
+
+
+async def test_control_changes_are_coalesced(hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services) -> None:
+    """Scenario: A burst of control changes sends at most one immediate frame.
+
+    Given: Moving Colors is running
+    When:  Several switches are toggled right after each other, then a refresh without changes is requested
+    Then:  The burst sends one frame, the refresh without changes none
+    """
+    manager = get_manager(hass, mc_entry)
+    await enable_mc(hass)
+    sent = len(mock_light_services)
+
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_RANDOM_LIMITS}, blocking=True)
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: SWITCH_DEFAULT_MODE}, blocking=True)
+    await hass.services.async_call(SWITCH_DOMAIN, SERVICE_TURN_OFF, {ATTR_ENTITY_ID: SWITCH_RANDOM_LIMITS}, blocking=True)
+    await hass.async_block_till_done()
+
+    assert len(mock_light_services) == sent + 1
+    assert manager.is_default_mode_enabled()
+
+    manager.async_request_refresh()
+    await hass.async_block_till_done()
+
+    assert len(mock_light_services) == sent + 1
+
+
+# ============================================================================
+# Scenario 13: Options changes - live options applied to the running instance
+# ============================================================================
+
+
+async def test_lookahead_frames_option_applied_in_place(hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services, time_travel) -> None:
+    """Scenario: Changing the lookahead frames through the options resizes the buffer without a reload.
+
+    Given: Moving Colors is running without lookahead frames
+    When:  Only the lookahead frames option is changed to 4
+    Then:  The manager is kept, its buffer holds 4 frames and the brightness keeps moving by 3 per tick
+    """
+    manager = get_manager(hass, mc_entry)
+    await enable_mc(hass)
+    await time_travel(seconds=INTERVAL)
+    assert manager._frames.capacity == 0
+
+    hass.config_entries.async_update_entry(mc_entry, options={**mc_entry.options, LOOKAHEAD_FRAMES: 4})
+    await hass.async_block_till_done()
+
+    assert get_manager(hass, mc_entry) is manager
+    assert manager._frames.capacity == 4
+
+    for _ in range(2):
+        await time_travel(seconds=INTERVAL)
+    assert len(manager._frames) == 4
+    brightness = [call.data["brightness"] for call in mock_light_services]
+    assert all(previous - current == STEPPING for previous, current in itertools.pairwise(brightness))
+
+
+async def test_keyframe_mode_option_applied_in_place(hass: HomeAssistant, mc_entry: MockConfigEntry, mock_light_services, time_travel) -> None:
+    """Scenario: Switching to keyframe mode through the options takes effect without a reload.
+
+    Given: Moving Colors is running without keyframe mode
+    When:  Only the keyframe mode option is enabled
+    Then:  The manager is kept and the next command is a keyframe with a transition
+    """
+    manager = get_manager(hass, mc_entry)
+    await enable_mc(hass)
+    await time_travel(seconds=INTERVAL)
+    assert "transition" not in mock_light_services[-1].data
+
+    hass.config_entries.async_update_entry(mc_entry, options={**mc_entry.options, KEYFRAME_MODE: True})
+    await hass.async_block_till_done()
+
+    assert get_manager(hass, mc_entry) is manager
+    assert manager._keyframe_mode
+    assert manager._frames.capacity == 0
+
+    sent = len(mock_light_services)
+    await time_travel(seconds=INTERVAL)
+    assert len(mock_light_services) == sent + 1
+    assert mock_light_services[-1].data["transition"] > INTERVAL
@@ -2,17 +2,19 @@
 
 import homeassistant.helpers.entity_registry as er
 import pytest
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EntityCategory
 from homeassistant.core import HomeAssistant, State
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.moving_colors.const import (
     DEBUG_ENABLED,
     DOMAIN,
+    DOMAIN_DATA_MANAGERS,
     MC_CONF_NAME,
     TARGET_LIGHT_ENTITY_ID,
     MCConfig,
 )
+from custom_components.moving_colors.dispatcher import create_command_context
 
 from .conftest import assert_entity_exists
 
@@ -20,6 +22,10 @@ INSTANCE_NAME = "Test Moving Colors"
 SENSOR_CURRENT_VALUE = "sensor.test_moving_colors_current_color_value"
 SENSOR_MIN_VALUE = "sensor.test_moving_colors_current_minimum_value"
 SENSOR_MAX_VALUE = "sensor.test_moving_colors_current_maximum_value"
+SENSOR_SUPPRESSED_FRAMES = "sensor.test_moving_colors_suppressed_frames"
+SENSOR_DROPPED_FRAMES = "sensor.test_moving_colors_dropped_frames"
+SENSOR_COALESCED_FRAMES = "sensor.test_moving_colors_coalesced_frames"
+SENSOR_MISSED_DEADLINES = "sensor.test_moving_colors_missed_deadlines"
 
 
 # ============================================================================
@@ -43,6 +49,24 @@ async def test_sensor_initial_states_are_numeric(hass: HomeAssistant, setup_inte
             float(state.state)  # Raises ValueError if not numeric
 
 
+async def test_suppressed_frames_sensor_is_diagnostic(hass: HomeAssistant, setup_integration) -> None:
+    """Test that the suppressed frames counter is created as diagnostic sensor."""
+    assert_entity_exists(hass, SENSOR_SUPPRESSED_FRAMES)
+    assert hass.states.get(SENSOR_SUPPRESSED_FRAMES).state == "0"
+
+    entity = er.async_get(hass).async_get(SENSOR_SUPPRESSED_FRAMES)
+    assert entity.entity_category == EntityCategory.DIAGNOSTIC
+
+
+async def test_rate_limit_sensors_are_diagnostic(hass: HomeAssistant, setup_integration) -> None:
+    """Test that the dropped and coalesced frame and missed deadline counters are created as diagnostic sensors."""
+    registry = er.async_get(hass)
+    for entity_id in (SENSOR_DROPPED_FRAMES, SENSOR_COALESCED_FRAMES, SENSOR_MISSED_DEADLINES):
+        assert_entity_exists(hass, entity_id)
+        assert hass.states.get(entity_id).state == "0"
+        assert registry.async_get(entity_id).entity_category == EntityCategory.DIAGNOSTIC
+
+
 async def test_sensor_device_info(hass: HomeAssistant, setup_integration) -> None:
     """Test that sensors are associated with the correct device."""
     registry = er.async_get(hass)
@@ -127,6 +151,50 @@ async def test_external_sensor_tracks_state_changes(
     assert float(state.state) == 200.0
 
 
+async def test_external_sensor_ignores_command_echoes(
+    hass: HomeAssistant,
+    config_entry_with_external_sensor: MockConfigEntry,
+) -> None:
+    """Test that state changes caused by the light commands of Moving Colors don't update the external sensor."""
+    registry = er.async_get(hass)
+    unique_id = f"{config_entry_with_external_sensor.entry_id}_{MCConfig.START_VALUE_ENTITY.value}_source_value"
+    entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+
+    hass.states.async_set("input_number.mc_start_value", "50", {"unit_of_measurement": "%"}, context=create_command_context())
+    await hass.async_block_till_done()
+
+    assert float(hass.states.get(entity_id).state) == 100.0
+
+
+async def test_external_sensor_follows_swapped_entity(
+    hass: HomeAssistant,
+    config_entry_with_external_sensor: MockConfigEntry,
+) -> None:
+    """Test that swapping the external entity in the options re-subscribes the sensor without a reload."""
+    manager = hass.data[DOMAIN_DATA_MANAGERS][config_entry_with_external_sensor.entry_id]
+    registry = er.async_get(hass)
+    unique_id = f"{config_entry_with_external_sensor.entry_id}_{MCConfig.START_VALUE_ENTITY.value}_source_value"
+    entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+    hass.states.async_set("input_number.mc_other_start_value", "30", {"unit_of_measurement": "%"})
+
+    hass.config_entries.async_update_entry(
+        config_entry_with_external_sensor,
+        options={**config_entry_with_external_sensor.options, MCConfig.START_VALUE_ENTITY.value: "input_number.mc_other_start_value"},
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN_DATA_MANAGERS][config_entry_with_external_sensor.entry_id] is manager
+    assert float(hass.states.get(entity_id).state) == 30.0
+    assert manager.get_config_start_value() == 30
+
+    # Only the new entity is mirrored
+    hass.states.async_set("input_number.mc_start_value", "200", {"unit_of_measurement": "%"})
+    hass.states.async_set("input_number.mc_other_start_value", "40", {"unit_of_measurement": "%"})
+    await hass.async_block_till_done()
+
+    assert float(hass.states.get(entity_id).state) == 40.0
+
+
 async def test_external_sensor_handles_unavailable(
     hass: HomeAssistant,
     config_entry_with_external_sensor: MockConfigEntry,
@@ -7,8 +7,8 @@ import pytest
 
 
 @pytest.fixture(autouse=True)
-def mock_async_track_time_interval() -> Generator[MagicMock]:
-    """Mock async_track_time_interval to prevent real timers in unit tests."""
-    with patch("custom_components.moving_colors.async_track_time_interval") as mock:
+def mock_async_call_at() -> Generator[MagicMock]:
+    """Mock async_call_at of the tick scheduler to prevent real timers in unit tests."""
+    with patch("custom_components.moving_colors.scheduler.async_call_at") as mock:
         mock.return_value = MagicMock()
         yield mock
@@ -0,0 +1,141 @@
+"""Unit tests for the Moving Colors batch channel engine."""
+
+import pytest
+
+from custom_components.moving_colors.batch_engine import BatchChannelEngine
+from custom_components.moving_colors.engine import ChannelEngine, RandomLimits
+
+pytest.importorskip("numpy")
+
+
+def test_batch_steps_match_channel_engine():
+    batch = BatchChannelEngine(capacity=2)
+    views = [
+        batch.create_view("rgb", [10, 120, 250]),
+        batch.create_view("rgbw", [0, 40, 90, 30], held="w"),
+        batch.create_view(("brightness",), [77]),
+    ]
+    engines = [
+        ChannelEngine("rgb", [10, 120, 250]),
+        ChannelEngine("rgbw", [0, 40, 90, 30], held="w"),
+        ChannelEngine(("brightness",), [77]),
+    ]
+
+    # Active boundaries left over from random limits
+    views[0].set_channel("g", 150, 120, 230, False)
+    engines[0].set_channel("g", 150, 120, 230, False)
+
+    for i in range(200):
+        steps = 1 + i % 4
+        for view in views:
+            view.step(7, 5, 240, use_random=False, steps=steps)
+        for engine in engines:
+            engine.step(7, 5, 240, use_random=False, steps=steps)
+
+        for view, engine in zip(views, engines, strict=True):
+            assert view.values() == engine.values()
+            for channel in engine.channels:
+                assert view.lower_bound(channel) == engine.lower_bound(channel)
+                assert view.upper_bound(channel) == engine.upper_bound(channel)
+                assert view.is_counting_up(channel) == engine.is_counting_up(channel)
+            assert view.steps_to_next_boundary(7) == engine.steps_to_next_boundary(7)
+
+    # Grown beyond the initial capacity
+    assert batch.row_count == 7
+
+
+def test_zero_stepping_matches_channel_engine():
+    batch = BatchChannelEngine()
+    view = batch.create_view("rgb", [200, 10, 100])
+    engine = ChannelEngine("rgb", [200, 10, 100])
+    for target in (view, engine):
+        target.set_channel("r", 200, 0, 150, True)
+        target.set_channel("g", 10, 50, 255, True)
+
+    for _ in range(3):
+        view.step(0, 0, 255, use_random=False)
+        engine.step(0, 0, 255, use_random=False)
+        assert view.values() == engine.values()
+        for channel in engine.channels:
+            assert view.is_counting_up(channel) == engine.is_counting_up(channel)
+            assert view.lower_bound(channel) == engine.lower_bound(channel)
+            assert view.upper_bound(channel) == engine.upper_bound(channel)
+
+
+def test_steps_are_executed_on_read():
+    batch = BatchChannelEngine()
+    view_a = batch.create_view(("brightness",), [10])
+    view_b = batch.create_view(("brightness",), [20])
+
+    view_a.step(5, 0, 255, use_random=False)
+    view_b.step(5, 0, 255, use_random=False)
+    assert int(batch.values[view_a.rows[0]]) == 10
+
+    # The first read executes the pending steps of all views
+    assert view_a.value("brightness") == 15
+    assert int(batch.values[view_b.rows[0]]) == 25
+
+    # A second step before a read keeps the order
+    view_a.step(5, 0, 255, use_random=False)
+    view_a.step(5, 0, 255, use_random=False)
+    assert view_a.value("brightness") == 25
+
+
+def test_read_without_own_step_keeps_other_steps_recorded():
+    batch = BatchChannelEngine()
+    view_a = batch.create_view(("brightness",), [10])
+    view_b = batch.create_view(("brightness",), [20])
+
+    view_a.step(5, 0, 255, use_random=False)
+    # Reading an instance without a pending step doesn't execute the steps of the others
+    view_b.snapshot()
+    assert view_b.value("brightness") == 20
+    assert int(batch.values[view_a.rows[0]]) == 10
+
+    view_b.step(5, 0, 255, use_random=False)
+    assert view_a.value("brightness") == 15
+    assert int(batch.values[view_b.rows[0]]) == 25
+
+
+def test_random_boundaries_stay_in_range():
+    batch = BatchChannelEngine()
+    views = [batch.create_view("rgb", [100, 100, 100]) for _ in range(20)]
+
+    for _ in range(300):
+        for view in views:
+            view.step(9, 10, 200, use_random=True)
+        for view in views:
+            for channel in "rgb":
+                lower = view.lower_bound(channel)
+                upper = view.upper_bound(channel)
+                value = view.value(channel)
+                assert 10 <= lower <= upper <= 200
+                assert lower <= value <= upper
+
+
+def test_released_rows_are_reused():
+    batch = BatchChannelEngine(capacity=4)
+    view = batch.create_view("rgb", [1, 2, 3])
+    rows = set(view.rows.tolist())
+    view.step(1, 0, 255, use_random=False)
+
+    view.release()
+    assert batch.row_count == 0
+
+    other = batch.create_view("rgb", [4, 5, 6])
+    assert set(other.rows.tolist()) == rows
+    assert other.values() == [4, 5, 6]
+    assert other.lower_bound("r") is None
+
+
+def test_seeded_random_limits_match_channel_engine():
+    batch = BatchChannelEngine()
+    view = batch.create_view("rgb", [0, 100, 200], random_limits=RandomLimits(99))
+    engine = ChannelEngine("rgb", [0, 100, 200], random_limits=RandomLimits(99))
+
+    for _ in range(500):
+        view.step(11, 3, 250, use_random=True)
+        engine.step(11, 3, 250, use_random=True)
+        assert view.values() == engine.values()
+        assert [view.lower_bound(c) for c in "rgb"] == [engine.lower_bound(c) for c in "rgb"]
+        assert [view.upper_bound(c) for c in "rgb"] == [engine.upper_bound(c) for c in "rgb"]
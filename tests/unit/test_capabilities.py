@@ -0,0 +1,41 @@
+"""Unit tests for the Moving Colors capability classes and payloads."""
+
+import pytest
+
+from custom_components.moving_colors.capabilities import build_payload, capability_class
+
+
+@pytest.mark.parametrize(
+    ("modes", "expected"),
+    [
+        (["rgbw"], "rgbw"),
+        (["rgbw", "rgb"], "rgbw"),
+        (["xy", "color_temp"], "rgb"),
+        (["hs"], "rgb"),
+        (["rgbww"], "rgb"),
+        (["brightness"], "brightness"),
+        (["onoff"], "brightness"),
+        ([], "brightness"),
+        (None, "brightness"),
+    ],
+)
+def test_capability_class(modes, expected):
+    assert capability_class(modes) == expected
+
+
+def test_payloads_of_rgbw_engine():
+    values = [10, 200, 30, 0]
+    assert build_payload("rgbw", "rgbw", values) == {"brightness_pct": 100, "rgbw_color": [10, 200, 30, 0]}
+    assert build_payload("rgbw", "rgb", values) == {"brightness_pct": 100, "rgb_color": [10, 200, 30]}
+    assert build_payload("rgbw", "brightness", values) == {"brightness": 200}
+
+
+def test_payloads_of_rgb_engine():
+    values = [10, 20, 30]
+    assert build_payload("rgb", "rgbw", values) == {"brightness_pct": 100, "rgbw_color": [10, 20, 30, 0]}
+    assert build_payload("rgb", "rgb", values) == {"brightness_pct": 100, "rgb_color": [10, 20, 30]}
+
+
+def test_brightness_engine_sends_brightness_to_all_classes():
+    for capability in ("rgbw", "rgb", "brightness"):
+        assert build_payload("brightness", capability, [42]) == {"brightness": 42}
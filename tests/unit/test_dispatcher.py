@@ -0,0 +1,236 @@
+"""Unit tests for the Moving Colors dispatch stage."""
+
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.core import Context
+
+from custom_components.moving_colors.dispatcher import (
+    MovingColorsDispatcher,
+    TokenBucket,
+    create_command_context,
+    group_targets_by_payload,
+    is_command_echo,
+    payload_key,
+)
+
+
+def test_payload_key_ignores_key_order_and_list_identity():
+    assert payload_key({"rgb_color": [1, 2, 3], "brightness_pct": 100}) == payload_key({"brightness_pct": 100, "rgb_color": [1, 2, 3]})
+    assert payload_key({"rgb_color": [1, 2, 3]}) != payload_key({"rgb_color": [3, 2, 1]})
+
+
+def test_identical_payloads_are_grouped():
+    payloads = {
+        "light.a": {"brightness": 10},
+        "light.b": {"brightness": 10},
+        "light.c": {"brightness": 10},
+    }
+
+    groups = group_targets_by_payload(payloads)
+
+    assert groups == [({"brightness": 10}, ["light.a", "light.b", "light.c"])]
+
+
+def test_different_payloads_are_split():
+    payloads = {
+        "light.a": {"brightness_pct": 100, "rgb_color": [1, 2, 3]},
+        "light.b": {"brightness": 10},
+        "light.c": {"brightness_pct": 100, "rgb_color": [1, 2, 3]},
+    }
+
+    groups = group_targets_by_payload(payloads)
+
+    assert len(groups) == 2
+    assert groups[0][1] == ["light.a", "light.c"]
+    assert groups[1][1] == ["light.b"]
+
+
+def _make_dispatcher(delays: dict[str, float], finished: list | None = None) -> tuple[MovingColorsDispatcher, list]:
+    """Create a dispatcher, whose light.turn_on calls take the given time per target and are recorded in `finished` when done."""
+    calls = []
+
+    async def async_call(domain, service, data, blocking=False, context=None):
+        calls.append(data)
+        await asyncio.sleep(max(delays.get(entity_id, 0) for entity_id in data["entity_id"]))
+        if finished is not None:
+            finished.extend(data["entity_id"])
+
+    hass = MagicMock()
+    hass.services.async_call = async_call
+    hass.async_create_task = asyncio.ensure_future
+    return MovingColorsDispatcher(hass, logging.getLogger(__name__)), calls
+
+
+async def test_different_payloads_are_sent_concurrently():
+    finished = []
+    dispatcher, calls = _make_dispatcher({"light.a": 0.02, "light.b": 0.01}, finished)
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 20}})
+
+    # Sent one after another, the call to light.a would have finished first
+    assert len(calls) == 2
+    assert finished == ["light.b", "light.a"]
+    assert dispatcher.get_missed_deadlines() == {}
+
+
+async def test_slow_target_misses_deadline():
+    finished = []
+    dispatcher, calls = _make_dispatcher({"light.slow": 1.0}, finished)
+
+    await dispatcher.async_dispatch({"light.fast": {"brightness": 10}, "light.slow": {"brightness": 20}}, deadline=0.05)
+
+    # The frame is done while the call to the slow light keeps running
+    assert len(calls) == 2
+    assert finished == ["light.fast"]
+    assert dispatcher.get_missed_deadlines() == {"light.slow": 1}
+    dispatcher._in_flight["light.slow"].cancel()
+
+
+async def test_unexpected_error_forces_next_frame(caplog):
+    dispatcher, _ = _make_dispatcher({})
+    failing_call = AsyncMock(side_effect=RuntimeError("platform error"))
+    dispatcher.hass.services.async_call = failing_call
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+    await asyncio.sleep(0)
+    failing_call.side_effect = None
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+
+    assert failing_call.await_count == 2
+    assert dispatcher.get_suppressed_frames() == 0
+    assert "Unexpected error while updating ['light.a']" in caplog.text
+
+
+async def test_unchanged_payload_is_suppressed():
+    dispatcher, calls = _make_dispatcher({})
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 10}})
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 20}})
+
+    assert len(calls) == 2
+    assert calls[1]["entity_id"] == ["light.b"]
+    assert dispatcher.get_suppressed_frames() == 1
+
+
+async def test_reset_forces_next_frame():
+    dispatcher, calls = _make_dispatcher({})
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+    dispatcher.reset()
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+
+    assert len(calls) == 2
+    assert dispatcher.get_suppressed_frames() == 0
+
+
+async def test_invalidated_target_gets_unchanged_frame():
+    dispatcher, calls = _make_dispatcher({})
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 10}})
+    dispatcher.invalidate("light.a")
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 10}})
+
+    assert len(calls) == 2
+    assert calls[1]["entity_id"] == ["light.a"]
+    assert dispatcher.get_suppressed_frames() == 1
+
+
+async def test_light_group_is_addressed_instead_of_members():
+    dispatcher, calls = _make_dispatcher({})
+    light_groups = MagicMock()
+    light_groups.resolve = lambda entity_ids: ["light.group"] if set(entity_ids) == {"light.a", "light.b"} else list(entity_ids)
+    dispatcher._light_groups = light_groups
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 10}})
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 20}})
+
+    assert calls[0]["entity_id"] == ["light.group"]
+    assert calls[1]["entity_id"] == ["light.b"]
+    assert dispatcher.get_suppressed_frames() == 1
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(2.0, now=0.0)
+
+    assert bucket.try_take(0.0)
+    assert not bucket.try_take(0.2)
+    assert abs(bucket.wait_time(0.2) - 0.3) < 1e-9
+    assert bucket.try_take(0.5)
+
+
+async def test_rate_limit_keeps_only_newest_frame():
+    dispatcher, calls = _make_dispatcher({})
+    dispatcher._rate_limit = 1.0
+    clock = {"now": 10.0}
+    dispatcher.hass.loop.time = lambda: clock["now"]
+
+    with patch("custom_components.moving_colors.dispatcher.async_call_later") as mock_call_later:
+        await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+        clock["now"] = 10.2
+        await dispatcher.async_dispatch({"light.a": {"brightness": 20}})
+        clock["now"] = 10.4
+        await dispatcher.async_dispatch({"light.a": {"brightness": 30}})
+
+        assert [call["brightness"] for call in calls] == [10]
+        assert dispatcher.get_dropped_frames() == {"light.a": 1}
+        _, delay, flush = mock_call_later.call_args.args
+        assert abs(delay - 0.6) < 1e-9
+
+        clock["now"] = 11.0
+        await flush(None)
+
+    assert [call["brightness"] for call in calls] == [10, 30]
+    assert dispatcher.get_coalesced_frames() == {"light.a": 1}
+
+
+async def test_reset_drops_held_back_frames():
+    dispatcher, calls = _make_dispatcher({})
+    dispatcher._rate_limit = 1.0
+    dispatcher.hass.loop.time = lambda: 10.0
+
+    with patch("custom_components.moving_colors.dispatcher.async_call_later") as mock_call_later:
+        await dispatcher.async_dispatch({"light.a": {"brightness": 10}})
+        await dispatcher.async_dispatch({"light.a": {"brightness": 20}})
+        dispatcher.reset()
+
+    mock_call_later.return_value.assert_called_once()
+    assert len(calls) == 1
+
+
+async def test_target_with_call_in_flight_gets_only_newest_frame():
+    dispatcher, calls = _make_dispatcher({"light.slow": 0.1})
+
+    for brightness in (10, 20, 30):
+        await dispatcher.async_dispatch({"light.slow": {"brightness": brightness}, "light.fast": {"brightness": brightness + 1}}, deadline=0.01)
+
+    # The fast light got every frame, the slow one still waits for its first call
+    assert [(call["entity_id"], call["brightness"]) for call in calls] == [
+        (["light.slow"], 10),
+        (["light.fast"], 11),
+        (["light.fast"], 21),
+        (["light.fast"], 31),
+    ]
+    assert dispatcher.get_dropped_frames() == {"light.slow": 1}
+
+    await asyncio.sleep(0.15)
+
+    assert calls[-1] == {"brightness": 30, "entity_id": ["light.slow"]}
+    assert dispatcher.get_coalesced_frames() == {"light.slow": 1}
+
+
+async def test_commands_carry_echo_context():
+    hass = MagicMock()
+    hass.services.async_call = AsyncMock()
+    hass.async_create_task = asyncio.ensure_future
+    dispatcher = MovingColorsDispatcher(hass, logging.getLogger(__name__))
+
+    await dispatcher.async_dispatch({"light.a": {"brightness": 10}, "light.b": {"brightness": 20}})
+
+    contexts = [call.kwargs["context"] for call in hass.services.async_call.call_args_list]
+    assert len(contexts) == 2
+    assert contexts[0].id != contexts[1].id
+    assert all(is_command_echo(MagicMock(context=context)) for context in contexts)
+    assert not is_command_echo(MagicMock(context=Context()))
+    assert is_command_echo(MagicMock(context=create_command_context()))
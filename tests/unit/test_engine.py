@@ -0,0 +1,253 @@
+"""Unit tests for the Moving Colors channel state engine."""
+
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.moving_colors.const import DefaultModeState
+from custom_components.moving_colors.engine import ChannelEngine, ChannelStatistics, DefaultModeRamp, RandomLimits, triangle_position
+
+
+def test_uninitialized_channel_uses_absolute_limits():
+    engine = ChannelEngine(("brightness",), [10])
+    assert engine.lower_bound("brightness") is None
+
+    engine.step(3, 0, 255, use_random=False)
+
+    assert engine.value("brightness") == 13
+    assert engine.lower_bound("brightness") == 0
+    assert engine.upper_bound("brightness") == 255
+    assert engine.is_counting_up("brightness")
+
+
+def test_bounce_at_upper_boundary():
+    engine = ChannelEngine(("brightness",))
+    engine.set_channel("brightness", 14, 0, 15, True)
+
+    engine.step(3, 0, 15, use_random=False)
+    assert engine.value("brightness") == 15
+    assert not engine.is_counting_up("brightness")
+
+    engine.step(3, 0, 15, use_random=False)
+    assert engine.value("brightness") == 12
+
+
+def test_bounce_draws_random_boundary():
+    engine = ChannelEngine(("brightness",))
+    engine.set_channel("brightness", 2, 0, 100, False)
+
+    with patch.object(RandomLimits, "randint", return_value=42) as randint:
+        engine.step(3, 0, 255, use_random=True)
+
+    randint.assert_called_once_with("brightness", 0, 255)
+    assert engine.value("brightness") == 0
+    assert engine.upper_bound("brightness") == 42
+    assert engine.is_counting_up("brightness")
+
+
+def test_held_channel_stays_zero():
+    engine = ChannelEngine("rgbw", [10, 20, 30, 40], held="w")
+
+    engine.step(5, 0, 255, use_random=False)
+
+    assert engine.as_dict() == {"r": 15, "g": 25, "b": 35, "w": 0}
+    assert engine.values() == [15, 25, 35, 0]
+
+
+def test_step_updates_in_place():
+    engine = ChannelEngine("rgb", [10, 20, 30])
+    values = engine._values
+
+    engine.step(1, 0, 255, use_random=False)
+
+    assert engine._values is values
+
+
+def test_steps_to_next_boundary():
+    engine = ChannelEngine("rgb")
+    engine.set_channel("r", 100, 0, 255, True)
+    engine.set_channel("g", 100, 0, 255, False)
+    engine.set_channel("b", 250, 0, 255, True)
+
+    assert engine.steps_to_next_boundary(3) == 2
+    assert engine.steps_to_next_boundary(0) == 1
+
+
+def test_unknown_channel():
+    engine = ChannelEngine(("brightness",))
+    assert engine.value("r") is None
+    assert engine.upper_bound("r") is None
+
+
+def _reference_step(state: tuple[int, bool, int, int], abs_min: int, abs_max: int, stepping: int) -> tuple[int, bool, int, int]:
+    """One step without random limits, moving and bouncing like the lights do."""
+    value, count_up, lower, upper = state
+    if count_up:
+        value += stepping
+        if value >= upper:
+            return upper, False, abs_min, upper
+        return value, True, lower, upper
+    value -= stepping
+    if value <= lower:
+        return lower, True, lower, abs_max
+    return value, False, lower, upper
+
+
+@pytest.mark.parametrize(
+    ("state", "abs_min", "abs_max", "stepping"),
+    [
+        ((128, True, 0, 255), 0, 255, 3),
+        ((128, False, 0, 255), 0, 255, 3),
+        ((10, True, 0, 50), 0, 255, 7),
+        ((200, False, 120, 255), 5, 240, 4),
+        ((0, True, 0, 255), 0, 255, 1),
+        ((30, True, 30, 30), 30, 30, 5),
+        ((200, True, 0, 150), 0, 255, 0),
+        ((100, False, 0, 150), 0, 255, 0),
+    ],
+)
+def test_triangle_position_matches_single_steps(state, abs_min, abs_max, stepping):
+    expected = state
+    for steps in range(1, 400):
+        expected = _reference_step(expected, abs_min, abs_max, stepping)
+        assert triangle_position(state, abs_min, abs_max, stepping, steps) == expected
+
+
+def test_zero_stepping_moves_value_into_boundaries():
+    engine = ChannelEngine("rgb", [200, 10, 100])
+    # Values beyond their active boundaries, e.g. after the limits were narrowed
+    engine.set_channel("r", 200, 0, 150, True)
+    engine.set_channel("g", 10, 50, 255, True)
+    engine.set_channel("b", 100, 0, 255, False)
+
+    engine.step(0, 0, 255, use_random=False)
+
+    assert engine.values() == [150, 50, 100]
+    assert not engine.is_counting_up("r")
+    engine.step(0, 0, 255, use_random=False, steps=5)
+    assert engine.values() == [150, 50, 100]
+
+
+def test_skipped_steps_keep_the_phase():
+    single = ChannelEngine("rgb", [10, 100, 250])
+    skipping = ChannelEngine("rgb", [10, 100, 250])
+
+    for _ in range(30):
+        single.step(3, 0, 255, use_random=False)
+    for _ in range(10):
+        skipping.step(3, 0, 255, use_random=False, steps=3)
+
+    assert skipping.values() == single.values()
+    assert skipping.tick == 30
+
+
+def test_seek_sets_position_directly():
+    engine = ChannelEngine(("brightness",), [100])
+    engine.step(5, 0, 255, use_random=False, steps=40)
+    assert engine.value("brightness") == 210  # 100 -> 255 in 31 steps, 9 steps back down
+
+    engine.seek(1000, 5, 0, 255)
+    assert engine.tick == 1000
+
+    # Seek back to the start
+    engine.seek(0, 5, 0, 255)
+    assert engine.value("brightness") == 100
+    assert engine.is_counting_up("brightness")
+
+
+def test_changed_limits_start_new_anchor():
+    engine = ChannelEngine(("brightness",), [100])
+    engine.step(5, 0, 255, use_random=False, steps=10)
+    assert engine.value("brightness") == 150
+
+    engine.step(5, 0, 160, use_random=False, steps=3)
+
+    # The current upper boundary stays active until the bounce, the new max applies afterwards
+    assert engine.tick == 3
+    assert engine.value("brightness") == 165
+
+
+def _random_run(seed: int | None) -> list[int]:
+    engine = ChannelEngine("rgb", [0, 100, 200], random_limits=RandomLimits(seed, block_size=4))
+    values = []
+    for _ in range(500):
+        engine.step(7, 0, 255, use_random=True)
+        values.extend(engine.values())
+    return values
+
+
+def test_seeded_random_limits_are_reproducible():
+    assert _random_run(1234) == _random_run(1234)
+    assert _random_run(1234) != _random_run(4321)
+
+
+def test_random_limits_are_generated_in_blocks():
+    limits = RandomLimits(7, block_size=4)
+    with patch.object(limits, "next_block", wraps=limits.next_block) as next_block:
+        drawn = [limits.randint("r", 10, 20) for _ in range(9)]
+
+    assert next_block.call_count == 3
+    assert all(10 <= value <= 20 for value in drawn)
+    # Channels have their own streams
+    assert RandomLimits(7).next_block("r") != RandomLimits(7).next_block("g")
+
+
+def test_default_mode_ramp_reaches_targets():
+    ramp = DefaultModeRamp()
+    assert ramp.states() == [DefaultModeState.IDLE]
+
+    ramp.begin([0, 200, 50, 0], [100, 100, 100, 0], steps=4)
+    assert ramp.states() == [DefaultModeState.RAMPING, DefaultModeState.RAMPING, DefaultModeState.RAMPING, DefaultModeState.REACHED]
+
+    assert ramp.advance() == [25, 175, 75, 0]
+    assert ramp.remaining_steps == 3
+    assert not ramp.is_done
+
+    # The channel with the shorter way reaches its target first and keeps it
+    assert ramp.advance() == [50, 150, 100, 0]
+    assert ramp.states() == [DefaultModeState.RAMPING, DefaultModeState.RAMPING, DefaultModeState.REACHED, DefaultModeState.REACHED]
+    assert ramp.remaining_steps == 2
+    assert ramp.advance() == [75, 125, 100, 0]
+
+    assert ramp.advance(5) == [100, 100, 100, 0]
+    assert ramp.is_done
+    assert ramp.remaining_steps == 0
+
+    ramp.reset()
+    assert not ramp.is_active
+
+
+def test_channel_statistics_aggregate_window():
+    statistics = ChannelStatistics(("r", "g"))
+    assert statistics.summary("r", 0.0) is None
+
+    for second, (r, g) in enumerate(((10, 100), (20, 90), (30, 90), (20, 100), (10, 110))):
+        statistics.add([r, g], [0, 50], [40, 200], float(second))
+
+    assert statistics.summary("r", 5.0) == {"min": 10, "max": 30, "mean": 18.0, "bounces": 1, "lower_bound": 0, "upper_bound": 40, "frames": 5}
+    assert statistics.summary("g", 5.0)["bounces"] == 1
+    assert statistics.summary("b", 5.0) is None
+
+    # The direction is kept across windows, so the next bounce is still detected
+    statistics.reset()
+    assert statistics.summary("r", 5.0) is None
+    statistics.add([20, 120], [5, 60], [35, 190], 5.0)
+    assert statistics.summary("r", 6.0)["bounces"] == 1
+    assert statistics.summary("g", 6.0)["bounces"] == 0
+
+
+def test_channel_statistics_mean_is_weighted_by_time_on_the_lights():
+    statistics = ChannelStatistics(("brightness",))
+    # One keyframe held for 9 seconds, then two frames shortly after each other
+    statistics.add([0], [0], [255], 0.0)
+    statistics.add([100], [0], [255], 9.0)
+    statistics.add([200], [0], [255], 9.5)
+
+    assert statistics.summary("brightness", 10.0)["mean"] == 15.0
+    assert statistics.summary("brightness", 10.0)["frames"] == 3
+
+    # Without any time passed, all frames count the same
+    statistics.reset()
+    statistics.add([10], [0], [255], 20.0)
+    statistics.add([20], [0], [255], 20.0)
+    assert statistics.summary("brightness", 20.0)["mean"] == 15.0
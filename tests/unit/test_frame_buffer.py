@@ -0,0 +1,64 @@
+"""Unit tests for the Moving Colors lookahead frame buffer."""
+
+import pytest
+
+from custom_components.moving_colors.frame_buffer import FrameBuffer
+
+
+def _push(buffer: FrameBuffer, value: int) -> None:
+    frame = buffer.push()
+    frame.values[:] = [value, value]
+    frame.key = value
+
+
+def test_frames_are_popped_in_order_across_wrap():
+    buffer = FrameBuffer(3, 2)
+    for value in range(3):
+        _push(buffer, value)
+    assert buffer.is_full()
+    assert buffer.pop().key == 0
+
+    _push(buffer, 3)
+    assert [buffer.pop().key for _ in range(3)] == [1, 2, 3]
+    assert len(buffer) == 0
+
+
+def test_slots_are_reused():
+    buffer = FrameBuffer(2, 2)
+    first = buffer.push()
+    buffer.push()
+    buffer.pop()
+    buffer.pop()
+
+    assert buffer.push() is first
+
+
+def test_peek_looks_ahead_without_removing():
+    buffer = FrameBuffer(4, 2)
+    for value in (10, 20):
+        _push(buffer, value)
+
+    assert buffer.peek().key == 10
+    assert buffer.peek(1).key == 20
+    assert buffer.peek(2) is None
+    assert len(buffer) == 2
+
+
+def test_full_and_empty_buffer_raise():
+    buffer = FrameBuffer(1, 2)
+    with pytest.raises(IndexError):
+        buffer.pop()
+
+    _push(buffer, 1)
+    with pytest.raises(IndexError):
+        buffer.push()
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert not buffer.is_full()
+
+
+def test_zero_capacity_is_always_full():
+    buffer = FrameBuffer(0, 2)
+    assert buffer.is_full()
+    assert buffer.peek() is None
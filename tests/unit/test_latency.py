@@ -0,0 +1,67 @@
+"""Unit tests for the Moving Colors response latency tracker."""
+
+from custom_components.moving_colors.latency import MAX_INTERVAL_FACTOR, ResponseLatencyTracker
+
+
+def _measure(tracker: ResponseLatencyTracker, entity_id: str, latency: float, now: float = 0.0) -> float | None:
+    tracker.record_command([entity_id], "ctx", now)
+    return tracker.record_state_change(entity_id, "ctx", now + latency)
+
+
+def test_state_change_completes_measurement():
+    tracker = ResponseLatencyTracker()
+
+    assert tracker.record_state_change("light.a", "ctx", 100.0) is None
+    assert _measure(tracker, "light.a", 0.3) == 0.3
+    assert tracker.get_latency() == 0.3
+
+    # Only the first state change after a command counts
+    assert tracker.record_state_change("light.a", "ctx", 5.0) is None
+
+
+def test_state_change_of_other_context_is_ignored():
+    tracker = ResponseLatencyTracker()
+    tracker.record_command(["light.a"], "ctx", 0.0)
+
+    # A change by another call or by hand doesn't complete the measurement
+    assert tracker.record_state_change("light.a", "other", 0.5) is None
+    assert tracker.record_state_change("light.a", "ctx", 0.2) == 0.2
+
+
+def test_latency_is_smoothed_and_slowest_target_counts():
+    tracker = ResponseLatencyTracker()
+    _measure(tracker, "light.a", 1.0)
+    _measure(tracker, "light.a", 2.0)
+    _measure(tracker, "light.b", 0.1)
+
+    assert abs(tracker.get_latency() - 1.2) < 1e-9
+
+
+def test_stale_command_is_ignored():
+    tracker = ResponseLatencyTracker()
+
+    assert _measure(tracker, "light.a", 60.0) is None
+    assert tracker.get_latency() is None
+
+
+def test_interval_factor_rises_fast_and_falls_slowly():
+    tracker = ResponseLatencyTracker()
+    assert tracker.get_interval_factor(1.0) == 1
+
+    _measure(tracker, "light.a", 2.5)
+    assert tracker.get_interval_factor(1.0) == 3
+
+    # Within the margin of the shorter interval the factor stays
+    tracker._latencies["light.a"] = 1.5
+    assert tracker.get_interval_factor(1.0) == 3
+
+    tracker._latencies["light.a"] = 0.1
+    assert tracker.get_interval_factor(1.0) == 2
+    assert tracker.get_interval_factor(1.0) == 1
+
+
+def test_interval_factor_is_limited():
+    tracker = ResponseLatencyTracker()
+    _measure(tracker, "light.a", 9.0)
+
+    assert tracker.get_interval_factor(0.1) == MAX_INTERVAL_FACTOR
@@ -0,0 +1,70 @@
+"""Unit tests for the Moving Colors light group index."""
+
+import logging
+from unittest.mock import MagicMock
+
+from homeassistant.core import State
+
+from custom_components.moving_colors.light_groups import LightGroupIndex
+
+
+def _make_index(targets: list[str], states: list[State]) -> tuple[LightGroupIndex, MagicMock]:
+    """Create an index on a fake state machine with the given light states."""
+    by_id = {state.entity_id: state for state in states}
+    hass = MagicMock()
+    hass.states.async_all = lambda _domain: list(by_id.values())
+    hass.states.get = by_id.get
+    return LightGroupIndex(hass, targets, logging.getLogger(__name__)), hass
+
+
+def _group(entity_id: str, members: list[str], state: str = "on") -> State:
+    return State(entity_id, state, {"entity_id": members})
+
+
+def test_group_covering_all_targets_replaces_members():
+    index, _ = _make_index(["light.a", "light.b", "light.c"], [_group("light.all", ["light.a", "light.b", "light.c"]), State("light.a", "on")])
+
+    assert index.resolve(["light.a", "light.b", "light.c"]) == ["light.all"]
+
+
+def test_partial_group_is_combined_with_remaining_members():
+    index, _ = _make_index(["light.a", "light.b", "light.c"], [_group("light.ab", ["light.a", "light.b"])])
+
+    assert index.resolve(["light.a", "light.b", "light.c"]) == ["light.ab", "light.c"]
+    # Only a part of the group gets this payload
+    assert index.resolve(["light.a", "light.c"]) == ["light.a", "light.c"]
+
+
+def test_groups_with_foreign_members_are_ignored():
+    index, _ = _make_index(["light.a", "light.b"], [_group("light.house", ["light.a", "light.b", "light.kitchen"])])
+
+    assert index.get_groups() == []
+    assert index.resolve(["light.a", "light.b"]) == ["light.a", "light.b"]
+
+
+def test_largest_group_wins():
+    index, _ = _make_index(
+        ["light.a", "light.b", "light.c"],
+        [_group("light.ab", ["light.a", "light.b"]), _group("light.abc", ["light.a", "light.b", "light.c"])],
+    )
+
+    assert index.resolve(["light.a", "light.b", "light.c"]) == ["light.abc"]
+
+
+def test_unavailable_group_falls_back_to_members():
+    index, _ = _make_index(["light.a", "light.b"], [_group("light.ab", ["light.a", "light.b"], state="unavailable")])
+
+    assert index.resolve(["light.a", "light.b"]) == ["light.a", "light.b"]
+
+
+def test_groups_are_cached_until_invalidated():
+    index, hass = _make_index(["light.a", "light.b"], [])
+    assert index.get_groups() == []
+
+    group = _group("light.ab", ["light.a", "light.b"])
+    hass.states.async_all = lambda _domain: [group]
+    hass.states.get = {"light.ab": group}.get
+    assert index.get_groups() == []
+
+    index.invalidate()
+    assert index.resolve(["light.a", "light.b"]) == ["light.ab"]
@@ -0,0 +1,196 @@
+"""Unit tests for the Moving Colors tick scheduler."""
+
+import asyncio
+import logging
+from unittest.mock import MagicMock
+
+from custom_components.moving_colors.const import MissedTickPolicy
+from custom_components.moving_colors.scheduler import MAX_CATCH_UP_TICKS, TICK_RESOLUTION, MovingColorsTickJob, MovingColorsTickScheduler
+
+
+class _Recorder:
+    """Step callback, which records the steps and the frames sent."""
+
+    def __init__(self) -> None:
+        self.steps: list[int] = []
+        self.sent: int = 0
+
+    def step(self, steps: int):
+        self.steps.append(steps)
+        return self._send()
+
+    async def _send(self) -> None:
+        self.sent += 1
+
+
+def _make_scheduler() -> tuple[MovingColorsTickScheduler, dict, list]:
+    """Create a scheduler on a fake loop clock, which records the created dispatch passes."""
+    clock = {"now": 100.0}
+    passes: list = []
+
+    def create_task(coro, name=None):
+        passes.append(coro)
+        return asyncio.ensure_future(coro)
+
+    hass = MagicMock()
+    hass.loop.time = lambda: clock["now"]
+    hass.async_create_task = create_task
+    return MovingColorsTickScheduler(hass), clock, passes
+
+
+def _make_job(policy: MissedTickPolicy = MissedTickPolicy.SKIP, interval: float = 1.0) -> tuple[MovingColorsTickJob, _Recorder]:
+    recorder = _Recorder()
+    return MovingColorsTickJob(logging.getLogger(__name__), recorder.step, lambda: interval, policy), recorder
+
+
+async def _fire_at(mock_async_call_at: MagicMock, clock: dict, now: float) -> None:
+    """Fire the armed timer at the given loop time."""
+    _, handler, _ = mock_async_call_at.call_args.args
+    clock["now"] = now
+    handler(None)
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _due(mock_async_call_at: MagicMock) -> float:
+    return mock_async_call_at.call_args.args[2]
+
+
+async def test_ticks_stay_on_timeline(mock_async_call_at):
+    scheduler, clock, _ = _make_scheduler()
+    job, recorder = _make_job()
+    scheduler.async_add_job(job)
+    assert _due(mock_async_call_at) == 101.0
+
+    # A late wakeup doesn't shift the following ticks
+    await _fire_at(mock_async_call_at, clock, 101.4)
+    assert _due(mock_async_call_at) == 102.0
+    assert abs(job.get_last_lateness() - 0.4) < 1e-9
+    assert recorder.steps == [1]
+    assert recorder.sent == 1
+    assert job.get_missed_ticks() == 0
+
+
+async def test_skip_policy_drops_missed_ticks(mock_async_call_at):
+    scheduler, clock, _ = _make_scheduler()
+    job, recorder = _make_job(MissedTickPolicy.SKIP)
+    scheduler.async_add_job(job)
+
+    await _fire_at(mock_async_call_at, clock, 103.5)
+
+    assert recorder.steps == [1]
+    assert job.get_missed_ticks() == 2
+    assert _due(mock_async_call_at) == 104.0
+
+
+async def test_coalesce_policy_advances_all_missed_steps(mock_async_call_at):
+    scheduler, clock, _ = _make_scheduler()
+    job, recorder = _make_job(MissedTickPolicy.COALESCE)
+    scheduler.async_add_job(job)
+
+    await _fire_at(mock_async_call_at, clock, 103.5)
+
+    assert recorder.steps == [3]
+
+
+async def test_catch_up_policy_replays_missed_ticks(mock_async_call_at):
+    scheduler, clock, _ = _make_scheduler()
+    job, recorder = _make_job(MissedTickPolicy.CATCH_UP)
+    scheduler.async_add_job(job)
+
+    await _fire_at(mock_async_call_at, clock, 103.5)
+    assert recorder.steps == [1, 1, 1]
+
+    await _fire_at(mock_async_call_at, clock, 150.0)
+    assert len(recorder.steps) == 3 + MAX_CATCH_UP_TICKS
+
+
+async def test_due_jobs_share_one_wakeup_and_dispatch_pass(mock_async_call_at):
+    scheduler, clock, passes = _make_scheduler()
+    job_a, recorder_a = _make_job(interval=1.0)
+    job_b, recorder_b = _make_job(interval=1.0)
+    job_c, recorder_c = _make_job(interval=5.0)
+    for job in (job_a, job_b, job_c):
+        scheduler.async_add_job(job)
+
+    # Only one timer for the earliest due time
+    assert mock_async_call_at.call_count == 1
+    assert scheduler.job_count == 3
+
+    await _fire_at(mock_async_call_at, clock, 101.0)
+
+    assert recorder_a.sent == 1
+    assert recorder_b.sent == 1
+    assert recorder_c.sent == 0
+    assert len(passes) == 1
+    assert _due(mock_async_call_at) == 102.0
+
+
+async def test_jobs_due_within_tick_resolution_share_one_wakeup(mock_async_call_at):
+    scheduler, clock, passes = _make_scheduler()
+    job_a, recorder_a = _make_job(interval=1.0)
+    scheduler.async_add_job(job_a)
+    # Second instance started a few milliseconds later
+    clock["now"] = 100.0 + TICK_RESOLUTION / 2
+    job_b, recorder_b = _make_job(interval=1.0)
+    scheduler.async_add_job(job_b)
+
+    await _fire_at(mock_async_call_at, clock, 101.0)
+
+    assert recorder_a.sent == 1
+    assert recorder_b.sent == 1
+    assert len(passes) == 1
+    # The early step doesn't shift the timeline of the later job
+    assert job_b.next_due == 102.0 + TICK_RESOLUTION / 2
+    assert job_b.get_last_lateness() == 0.0
+
+    await _fire_at(mock_async_call_at, clock, 102.0)
+
+    assert recorder_a.sent == 2
+    assert recorder_b.sent == 2
+    assert len(passes) == 2
+
+
+async def test_frames_are_prefetched_in_rounds_after_dispatch_pass(mock_async_call_at):
+    scheduler, clock, _ = _make_scheduler()
+    calls: list[str] = []
+    buffered = {"a": 0, "b": 0}
+
+    def make_prefetch(name: str, capacity: int):
+        def request_frame() -> bool:
+            if buffered[name] >= capacity:
+                return False
+            calls.append(f"request {name}")
+            return True
+
+        def store_frame() -> None:
+            calls.append(f"store {name}")
+            buffered[name] += 1
+
+        return request_frame, store_frame
+
+    for name, capacity in (("a", 2), ("b", 1)):
+        recorder = _Recorder()
+        job = MovingColorsTickJob(logging.getLogger(__name__), recorder.step, lambda: 1.0, MissedTickPolicy.SKIP, *make_prefetch(name, capacity))
+        scheduler.async_add_job(job)
+
+    await _fire_at(mock_async_call_at, clock, 101.0)
+    # The frames are computed ahead once all sends of the pass are done
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    # All jobs request their step before the first frame is stored
+    assert calls == ["request a", "request b", "store a", "store b", "request a", "store a"]
+
+
+async def test_remove_last_job_disarms_timer(mock_async_call_at):
+    scheduler, _, _ = _make_scheduler()
+    job, _ = _make_job()
+    scheduler.async_add_job(job)
+    assert job.is_running
+
+    scheduler.async_remove_job(job)
+
+    assert not job.is_running
+    assert scheduler.job_count == 0
+    mock_async_call_at.return_value.assert_called_once()